@@ -1,4 +1,4 @@
-from typing import ClassVar
+from typing import Any, ClassVar
 from uuid import UUID
 
 from ninja import ModelSchema, Schema
@@ -6,9 +6,18 @@ from ninja import ModelSchema, Schema
 from apps.campaign.models import Campaign
 
 
+class AdImageVariant(Schema):
+    size: str
+    format: str
+    width: int
+    height: int
+    url: str
+
+
 class Advertisment(ModelSchema):
     advertiser_id: UUID
     ad_id: UUID
+    ad_image_variants: list[AdImageVariant]
 
     class Meta:
         model = Campaign
@@ -18,6 +27,15 @@ class Advertisment(ModelSchema):
             Campaign.ad_image.field.name,
         )
 
+    @staticmethod
+    def resolve_ad_image_variants(obj: Campaign) -> list[dict[str, Any]]:
+        storage = Campaign.ad_image.field.storage
+
+        return [
+            {**variant, "url": storage.url(variant["name"])}
+            for variant in obj.ad_image_variants
+        ]
+
 
 class ClickIn(Schema):
     client_id: UUID
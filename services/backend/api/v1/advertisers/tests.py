@@ -8,6 +8,13 @@ from apps.client.models import Client as ClientModel
 from apps.mlscore.models import Mlscore
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class TestMlscoreEndpoint(TestCase):
     def setUp(self):
         self.client = Client()
@@ -120,6 +127,124 @@ class TestMlscoreEndpoint(TestCase):
         self.assertEqual(response.status_code, status.BAD_REQUEST)
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class TestBulkMlscoreEndpoint(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.advertiser = Advertiser.objects.create(name="Test Advertiser")
+        self.client_1 = ClientModel.objects.create(
+            login="client_1",
+            age=14,
+            location="test_location",
+            gender=ClientModel.GenderChoices.FEMALE,
+        )
+        self.client_2 = ClientModel.objects.create(
+            login="client_2",
+            age=20,
+            location="test_location",
+            gender=ClientModel.GenderChoices.MALE,
+        )
+
+        self.url = "/ml-scores/bulk"
+
+    def test_bulk_create_or_update_success(self):
+        Mlscore.objects.create(
+            advertiser=self.advertiser, client=self.client_1, score=10
+        )
+        data = [
+            {
+                "advertiser_id": str(self.advertiser.id),
+                "client_id": str(self.client_1.id),
+                "score": 20,
+            },
+            {
+                "advertiser_id": str(self.advertiser.id),
+                "client_id": str(self.client_2.id),
+                "score": 30,
+            },
+            {
+                "advertiser_id": str(self.advertiser.id),
+                "client_id": str(self.client_1.id),
+                "score": 40,
+            },
+        ]
+        response = self.client.post(
+            self.url, json.dumps(data), content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(Mlscore.objects.count(), 2)
+        self.assertEqual(
+            Mlscore.objects.get(client=self.client_1).score,
+            40,
+        )
+        self.assertEqual(
+            Mlscore.get_cached_scores(self.client_1.id, [self.advertiser.id]),
+            {self.advertiser.id: 40},
+        )
+        self.assertEqual(
+            Mlscore.get_cached_scores(self.client_2.id, [self.advertiser.id]),
+            {self.advertiser.id: 30},
+        )
+
+    def test_bulk_non_existing_client(self):
+        data = [
+            {
+                "advertiser_id": str(self.advertiser.id),
+                "client_id": str(self.client_1.id),
+                "score": 20,
+            },
+            {
+                "advertiser_id": str(self.advertiser.id),
+                "client_id": str(uuid.uuid4()),
+                "score": 30,
+            },
+        ]
+        response = self.client.post(
+            self.url, json.dumps(data), content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+        self.assertIn("client", response.json()["detail"])
+        self.assertEqual(Mlscore.objects.count(), 0)
+
+    def test_bulk_invalid_score(self):
+        data = [
+            {
+                "advertiser_id": str(self.advertiser.id),
+                "client_id": str(self.client_1.id),
+                "score": -1,
+            },
+        ]
+        response = self.client.post(
+            self.url, json.dumps(data), content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    def test_bulk_empty_request(self):
+        response = self.client.post(
+            self.url, json.dumps([]), content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(len(response.json()), 0)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class TestBulkAdvertisersEndpoint(TestCase):
     def setUp(self):
         self.client = Client()
@@ -187,6 +312,13 @@ class TestBulkAdvertisersEndpoint(TestCase):
         self.assertEqual(len(response.json()), 0)
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class TestGetAdvertiserEndpoint(TestCase):
     def setUp(self):
         self.client = Client()
@@ -1,15 +1,20 @@
-from collections import defaultdict
 from http import HTTPStatus as status
 from uuid import UUID
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404
 from ninja import Router
+from ninja.decorators import decorate_view
 
+from api.v1 import ingest
 from api.v1 import schemas as global_schemas
 from api.v1.advertisers import schemas
+from api.v1.conditional import versioned
 from apps.advertiser.models import Advertiser
+from apps.client.models import Client
 from apps.mlscore.models import Mlscore
 
 router = Router(tags=["advertisers"])
@@ -34,6 +39,88 @@ def create_or_update_mlscore(
     return status.OK, mlscore_instance
 
 
+def validate_mlscore_relations(mlscores: list[Mlscore]) -> None:
+    errors: dict[str, list[str]] = {}
+
+    for chunk in ingest.chunked(mlscores, settings.BULK_BATCH_SIZE):
+        advertiser_ids = {mlscore.advertiser_id for mlscore in chunk}
+        client_ids = {mlscore.client_id for mlscore in chunk}
+
+        advertiser_ids -= set(
+            Advertiser.objects.filter(id__in=advertiser_ids).values_list(
+                Advertiser.id.field.name, flat=True
+            )
+        )
+        client_ids -= set(
+            Client.objects.filter(id__in=client_ids).values_list(
+                Client.id.field.name, flat=True
+            )
+        )
+
+        errors.setdefault(Mlscore.advertiser.field.name, []).extend(
+            f"Advertiser {advertiser_id} does not exist."
+            for advertiser_id in advertiser_ids
+        )
+        errors.setdefault(Mlscore.client.field.name, []).extend(
+            f"Client {client_id} does not exist." for client_id in client_ids
+        )
+
+    errors = {
+        field: messages for field, messages in errors.items() if messages
+    }
+    if errors:
+        raise ValidationError(errors)
+
+
+@router.post(
+    "/ml-scores/bulk",
+    response={
+        status.OK: list[schemas.Mlscore],
+        status.BAD_REQUEST: global_schemas.BadRequestError,
+    },
+    description=(
+        "Creates or updates ML scores in bulk. If the same "
+        "(client, advertiser) pair is passed several times, "
+        "the last score wins."
+    ),
+)
+def bulk_create_or_update_mlscores(
+    request: HttpRequest, data: list[schemas.Mlscore]
+) -> tuple[status, list[Mlscore]]:
+    latest_mlscores: dict[tuple[UUID, UUID], Mlscore] = {}
+
+    for item in data:
+        mlscore = Mlscore(
+            advertiser_id=item.advertiser,
+            client_id=item.client,
+            score=item.score,
+        )
+        mlscore.validate(
+            validate_unique=False,
+            validate_constraints=False,
+            include=[Mlscore.score.field],
+        )
+        latest_mlscores.pop((item.client, item.advertiser), None)
+        latest_mlscores[(item.client, item.advertiser)] = mlscore
+
+    mlscores = list(latest_mlscores.values())
+
+    validate_mlscore_relations(mlscores)
+
+    for chunk in ingest.chunked(mlscores, settings.BULK_BATCH_SIZE):
+        with transaction.atomic():
+            Mlscore.objects.bulk_upsert(
+                chunk,
+                unique_fields=(
+                    Mlscore.advertiser.field.name,
+                    Mlscore.client.field.name,
+                ),
+            )
+        Mlscore.setup_cache_many(chunk)
+
+    return status.OK, mlscores
+
+
 @router.post(
     "/advertisers/bulk",
     response={
@@ -44,31 +131,23 @@ def create_or_update_mlscore(
 def bulk_create_or_update(
     request: HttpRequest, data: list[schemas.Advertiser]
 ) -> tuple[status, list[Advertiser]]:
-    latest_advertisers: dict[UUID, schemas.Advertiser] = defaultdict(
-        lambda: None
-    )
+    latest_advertisers: dict[UUID, schemas.Advertiser] = {}
 
-    for item in reversed(data):
-        if latest_advertisers[item.advertiser_id] is None:
-            Advertiser(
-                id=item.advertiser_id, **item.dict(exclude={"client_id"})
-            ).validate(
-                validate_unique=False,
-                validate_constraints=False,
-            )
-            latest_advertisers[item.advertiser_id] = item
+    for item in data:
+        latest_advertisers.pop(item.advertiser_id, None)
+        latest_advertisers[item.advertiser_id] = item
 
-    unique_advertisers = reversed(list(latest_advertisers.values()))
+    advertisers = []
 
-    result = []
+    for item in latest_advertisers.values():
+        advertiser = Advertiser(
+            id=item.advertiser_id, **item.dict(exclude={"advertiser_id"})
+        )
+        advertiser.validate(validate_unique=False, validate_constraints=False)
+        advertisers.append(advertiser)
 
     with transaction.atomic():
-        for advertiser in unique_advertisers:
-            advertiser_instance, _ = Advertiser.objects.update_or_create(
-                id=advertiser.advertiser_id,
-                defaults={**dict(advertiser)},
-            )
-            result.append(advertiser_instance)
+        result = Advertiser.objects.bulk_upsert(advertisers)
 
     return status.CREATED, result
 
@@ -77,10 +156,16 @@ def bulk_create_or_update(
     "/advertisers/{advertiser_id}",
     response={
         status.OK: schemas.Advertiser,
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(
+        lambda advertiser_id: [Advertiser.get_version_cache_key(advertiser_id)]
+    )
+)
 def get_advertiser(
     request: HttpRequest, advertiser_id: UUID
 ) -> tuple[status, Advertiser]:
@@ -0,0 +1,29 @@
+import base64
+import binascii
+import json
+from uuid import UUID
+
+
+def encode_cursor(end_date: int, campaign_id: UUID) -> str:
+    return (
+        base64.urlsafe_b64encode(
+            json.dumps([end_date, str(campaign_id)]).encode()
+        )
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor: str) -> tuple[int, UUID]:
+    try:
+        end_date, campaign_id = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        return int(end_date), UUID(campaign_id)
+    except (binascii.Error, TypeError, ValueError):
+        err = "Invalid cursor."
+        raise ValueError(err) from None
+
+
+def split_fields(fields: str) -> list[str]:
+    return [field.strip() for field in fields.split(",") if field.strip()]
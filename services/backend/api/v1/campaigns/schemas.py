@@ -5,6 +5,7 @@ from ninja import ModelSchema, Schema
 from pydantic import field_validator
 from pydantic.types import NonNegativeInt, PositiveInt
 
+from api.v1.campaigns.cursors import decode_cursor, split_fields
 from apps.campaign.models import Campaign
 
 
@@ -40,6 +41,17 @@ class CampaignOut(ModelSchema):
         )
 
 
+class CampaignPartialOut(ModelSchema):
+    campaign_id: UUID = None
+    advertiser_id: UUID = None
+    targeting: CampaignTargeting = None
+
+    class Meta:
+        model = Campaign
+        fields: ClassVar[tuple[str]] = CampaignOut.Meta.fields
+        fields_optional = "__all__"
+
+
 class CampaignCreateIn(ModelSchema):
     targeting: CampaignTargeting = None
 
@@ -107,3 +119,46 @@ class CampaignUpdateIn(ModelSchema):
 class CampaignListFilters(Schema):
     page: PositiveInt = 1
     size: NonNegativeInt = 100
+    cursor: str | None = None
+    fields: str | None = None
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, value: str | None) -> str | None:
+        if value is not None:
+            decode_cursor(value)
+        return value
+
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, value: str | None) -> str | None:
+        if value is None:
+            return value
+
+        unknown = set(split_fields(value)) - set(
+            CampaignPartialOut.model_fields
+        )
+        if unknown:
+            err = f"Unknown fields: {', '.join(sorted(unknown))}."
+            raise ValueError(err)
+
+        return value
+
+
+class AdImageUploadIn(Schema):
+    filename: str
+
+
+class AdImageUploadOut(Schema):
+    upload_url: str
+    object_key: str
+    expires_in: int
+
+
+class AdImageFinalizeIn(Schema):
+    object_key: str
+
+
+class AdImageFinalizeOut(Schema):
+    task_id: UUID
+    object_key: str
@@ -0,0 +1,295 @@
+from http import HTTPStatus as status
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import Client, TestCase, override_settings
+
+from apps.advertiser.models import Advertiser
+from apps.campaign.models import Campaign
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class ListCampaignsTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        # Versions are bumped once the changes are committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.advertiser = Advertiser.objects.create(name="Test Advertiser")
+            self.campaigns = [
+                Campaign.objects.create(
+                    advertiser=self.advertiser,
+                    impressions_limit=10,
+                    clicks_limit=5,
+                    cost_per_impression=1,
+                    cost_per_click=2,
+                    ad_title=f"title {i}",
+                    ad_text="text",
+                    start_date=0,
+                    end_date=i // 2,
+                )
+                for i in range(5)
+            ]
+        self.expected_ids = [
+            str(campaign.id)
+            for campaign in sorted(
+                self.campaigns,
+                key=lambda c: (c.end_date, c.id),
+                reverse=True,
+            )
+        ]
+        self.url = f"/advertisers/{self.advertiser.id}/campaigns"
+
+    def test_list_campaigns_full_payload(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertNotIn("X-Next-Cursor", response)
+        self.assertEqual(
+            [item["campaign_id"] for item in response.json()],
+            self.expected_ids,
+        )
+        self.assertEqual(
+            set(response.json()[0]),
+            {
+                "campaign_id",
+                "advertiser_id",
+                "targeting",
+                "ad_title",
+                "ad_text",
+                "ad_image",
+                "impressions_limit",
+                "clicks_limit",
+                "cost_per_impression",
+                "cost_per_click",
+                "start_date",
+                "end_date",
+            },
+        )
+
+    def test_list_campaigns_empty_page(self):
+        response = self.client.get(self.url, {"size": 0})
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json(), [])
+        self.assertNotIn("X-Next-Cursor", response)
+
+    def test_list_campaigns_cursor_walks_all_pages(self):
+        ids, params = [], {"size": 2}
+
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.OK)
+            ids.extend(item["campaign_id"] for item in response.json())
+
+            if "X-Next-Cursor" not in response:
+                break
+            self.assertIn('rel="next"', response["Link"])
+            params["cursor"] = response["X-Next-Cursor"]
+
+        self.assertEqual(ids, self.expected_ids)
+
+    def test_list_campaigns_page_is_still_supported(self):
+        response = self.client.get(self.url, {"size": 2, "page": 2})
+
+        self.assertEqual(
+            [item["campaign_id"] for item in response.json()],
+            self.expected_ids[2:4],
+        )
+
+    def test_list_campaigns_sparse_fields(self):
+        response = self.client.get(
+            self.url, {"fields": "ad_title,targeting", "size": 1}
+        )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "campaign_id": self.expected_ids[0],
+                    "ad_title": "title 4",
+                    "targeting": {
+                        "gender": None,
+                        "age_from": None,
+                        "age_to": None,
+                        "location": None,
+                    },
+                }
+            ],
+        )
+
+    def test_list_campaigns_unknown_field(self):
+        response = self.client.get(self.url, {"fields": "ad_title,secret"})
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    def test_list_campaigns_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    def test_get_campaign_not_modified_until_updated(self):
+        campaign = self.campaigns[0]
+        url = f"{self.url}/{campaign.id}"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.NOT_MODIFIED)
+
+        campaign.ad_title = "new title"
+        with self.captureOnCommitCallbacks(execute=True):
+            campaign.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["ad_title"], "new title")
+
+    def test_get_campaign_version_bumped_on_commit(self):
+        campaign = self.campaigns[0]
+        url = f"{self.url}/{campaign.id}"
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            campaign.ad_title = "new title"
+            campaign.save()
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.NOT_MODIFIED)
+
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.OK)
+
+    def test_list_campaigns_etag_depends_on_query_and_campaigns(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.NOT_MODIFIED,
+        )
+        self.assertEqual(
+            self.client.get(
+                self.url, {"size": 1}, HTTP_IF_NONE_MATCH=etag
+            ).status_code,
+            status.OK,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaigns[0].delete()
+
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.OK,
+        )
+
+    def test_list_campaigns_matches_campaign_schema(self):
+        campaign = self.campaigns[4]
+        campaign.gender = "MALE"
+        campaign.age_from = 18
+        campaign.save()
+
+        listed = self.client.get(self.url, {"size": 1}).json()[0]
+        detail = self.client.get(f"{self.url}/{campaign.id}").json()
+
+        self.assertEqual(listed, detail)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    },
+    STORAGES={
+        "default": {
+            "BACKEND": "django.core.files.storage.InMemoryStorage",
+        },
+    },
+)
+class AdImageUploadTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.advertiser = Advertiser.objects.create(name="Test Advertiser")
+        self.campaign = Campaign.objects.create(
+            advertiser=self.advertiser,
+            impressions_limit=10,
+            clicks_limit=5,
+            cost_per_impression=1,
+            cost_per_click=2,
+            ad_title="title",
+            ad_text="text",
+            start_date=0,
+            end_date=10,
+        )
+        self.url = (
+            f"/advertisers/{self.advertiser.id}/campaigns/"
+            f"{self.campaign.id}/ad_image"
+        )
+
+    @mock.patch(
+        "api.v1.campaigns.views.get_upload_url",
+        return_value="http://minio/upload",
+    )
+    def test_create_upload_url(self, get_upload_url):
+        response = self.client.post(
+            f"{self.url}/upload_url",
+            data={"filename": "banner.PNG"},
+            content_type="application/json",
+        )
+
+        object_key = response.json()["object_key"]
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["upload_url"], "http://minio/upload")
+        self.assertTrue(object_key.startswith(f"uploads/{self.campaign.id}/"))
+        self.assertTrue(object_key.endswith(".png"))
+        get_upload_url.assert_called_once_with(object_key)
+
+    def test_create_upload_url_unsupported_storage(self):
+        response = self.client.post(
+            f"{self.url}/upload_url",
+            data={"filename": "banner.png"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, status.NOT_IMPLEMENTED)
+
+    @mock.patch("api.v1.campaigns.views.finalize_ad_image_upload_task")
+    def test_finalize_upload(self, task):
+        object_key = f"uploads/{self.campaign.id}/upload.png"
+        Campaign.ad_image.field.storage.save(object_key, ContentFile(b"png"))
+        task.delay.return_value.id = "00000000-0000-0000-0000-000000000000"
+
+        response = self.client.post(
+            f"{self.url}/finalize",
+            data={"object_key": object_key},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, status.ACCEPTED)
+        task.delay.assert_called_once_with(str(self.campaign.id), object_key)
+
+    @mock.patch("api.v1.campaigns.views.finalize_ad_image_upload_task")
+    def test_finalize_upload_unknown_key(self, task):
+        for object_key in (
+            f"uploads/{self.campaign.id}/missing.png",
+            "uploads/other/upload.png",
+            f"uploads/{self.campaign.id}/../upload.png",
+        ):
+            with self.subTest(object_key=object_key):
+                response = self.client.post(
+                    f"{self.url}/finalize",
+                    data={"object_key": object_key},
+                    content_type="application/json",
+                )
+
+                self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+        task.delay.assert_not_called()
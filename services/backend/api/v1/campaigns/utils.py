@@ -1,7 +1,60 @@
+from collections.abc import Callable, Iterable
+from operator import attrgetter
+from typing import Any
+from uuid import UUID
+
 from api.v1.campaigns import schemas
+from apps.campaign.images import UPLOADS_DIRECTORY
 from apps.campaign.models import Campaign
 
+CAMPAIGN_FIELD_COLUMNS = {
+    "campaign_id": (Campaign.id.field.name,),
+    "advertiser_id": (Campaign.advertiser.field.attname,),
+    "targeting": (
+        Campaign.gender.field.name,
+        Campaign.age_from.field.name,
+        Campaign.age_to.field.name,
+        Campaign.location.field.name,
+    ),
+}
+
+CAMPAIGN_FIELDS = tuple(schemas.CampaignPartialOut.model_fields)
+
+# Mirrors CampaignOut serialization without building schema objects.
+CAMPAIGN_FIELD_GETTERS: dict[str, Callable[[Campaign], Any]] = {
+    "campaign_id": attrgetter(Campaign.id.field.name),
+    "advertiser_id": attrgetter(Campaign.advertiser.field.attname),
+    "targeting": lambda campaign: {
+        field: getattr(campaign, field)
+        for field in CAMPAIGN_FIELD_COLUMNS["targeting"]
+    },
+    "ad_image": lambda campaign: (
+        campaign.ad_image.url if campaign.ad_image else None
+    ),
+}
+
 
 def normalize_campaign(campaign: Campaign) -> schemas.CampaignOut:
     campaign.targeting = schemas.CampaignTargeting.from_orm(campaign)
     return schemas.CampaignOut.from_orm(campaign)
+
+
+def get_campaign_columns(fields: Iterable[str]) -> list[str]:
+    return [
+        column
+        for field in ("campaign_id", Campaign.end_date.field.name, *fields)
+        for column in CAMPAIGN_FIELD_COLUMNS.get(field, (field,))
+    ]
+
+
+def campaign_to_dict(
+    campaign: Campaign, fields: Iterable[str] = CAMPAIGN_FIELDS
+) -> dict[str, Any]:
+    return {
+        field: CAMPAIGN_FIELD_GETTERS.get(field, attrgetter(field))(campaign)
+        for field in dict.fromkeys(("campaign_id", *fields))
+    }
+
+
+def get_ad_image_upload_prefix(campaign_id: UUID) -> str:
+    return f"{UPLOADS_DIRECTORY}/{campaign_id}/"
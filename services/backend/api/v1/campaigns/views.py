@@ -1,17 +1,33 @@
 from http import HTTPStatus as status
-from uuid import UUID
+from pathlib import PurePosixPath
+from uuid import UUID, uuid4
 
-from django.http import HttpRequest
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from ninja import File, Query, Router
+from ninja.decorators import decorate_view
 from ninja.errors import HttpError
 from ninja.files import UploadedFile
 from PIL import Image
 
 from api.v1 import schemas as global_schemas
 from api.v1.campaigns import schemas, utils
+from api.v1.campaigns.cursors import (
+    decode_cursor,
+    encode_cursor,
+    split_fields,
+)
+from api.v1.conditional import versioned
+from api.v1.renderers import render_response
 from apps.advertiser.models import Advertiser
+from apps.campaign.images import get_upload_url
 from apps.campaign.models import Campaign
+from apps.campaign.tasks import (
+    finalize_ad_image_upload_task,
+    process_ad_image_task,
+)
 from config.errors import ForbiddenError
 
 router = Router(tags=["campaigns"])
@@ -42,37 +58,96 @@ def create_campaign(
 @router.get(
     "/{advertiser_id}/campaigns",
     response={
-        status.OK: list[schemas.CampaignOut],
+        status.OK: list[schemas.CampaignPartialOut],
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
+    description=(
+        "Lists campaigns ordered by end_date descending. "
+        "Pass the X-Next-Cursor response header as cursor to get the next "
+        "page, page is kept for backward compatibility. "
+        "fields limits the response to a comma-separated list of fields, "
+        "campaign_id is always included."
+    ),
+)
+@decorate_view(
+    versioned(
+        lambda advertiser_id: [
+            Advertiser.get_version_cache_key(advertiser_id, "campaigns")
+        ]
+    )
 )
 def list_campaigns(
     request: HttpRequest,
     advertiser_id: UUID,
     filters: Query[schemas.CampaignListFilters],
-) -> tuple[status, list[schemas.CampaignOut]]:
+) -> HttpResponse:
     advertaiser = get_object_or_404(Advertiser, id=advertiser_id)
     campaigns = Campaign.objects.filter(advertiser=advertaiser).order_by(
-        "-end_date"
+        "-end_date", "-id"
     )
-    paginated_campaigns = campaigns[
-        (filters.page - 1) * filters.size : filters.page * filters.size
-    ]
 
-    return status.OK, [
-        utils.normalize_campaign(campaign) for campaign in paginated_campaigns
-    ]
+    if filters.cursor:
+        end_date, campaign_id = decode_cursor(filters.cursor)
+        campaigns = campaigns.filter(
+            Q(end_date__lt=end_date) | Q(end_date=end_date, id__lt=campaign_id)
+        )
+        offset = 0
+    else:
+        offset = (filters.page - 1) * filters.size
+
+    fields = utils.CAMPAIGN_FIELDS
+    if filters.fields:
+        fields = split_fields(filters.fields)
+        campaigns = campaigns.only(*utils.get_campaign_columns(fields))
+
+    # One extra row tells whether there is a next page.
+    paginated_campaigns = (
+        list(campaigns[offset : offset + filters.size + 1])
+        if filters.size
+        else []
+    )
+    next_cursor = None
+
+    if len(paginated_campaigns) > filters.size:
+        paginated_campaigns.pop()
+        last = paginated_campaigns[-1]
+        next_cursor = encode_cursor(last.end_date, last.id)
+
+    response = render_response(
+        request,
+        [
+            utils.campaign_to_dict(campaign, fields)
+            for campaign in paginated_campaigns
+        ],
+    )
+
+    if next_cursor:
+        query = request.GET.copy()
+        query.pop("page", None)
+        query["cursor"] = next_cursor
+
+        response["X-Next-Cursor"] = next_cursor
+        response["Link"] = f'<{request.path}?{query.urlencode()}>; rel="next"'
+
+    return response
 
 
 @router.get(
     "/{advertiser_id}/campaigns/{campaign_id}",
     response={
         status.OK: schemas.CampaignOut,
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(
+        lambda campaign_id, **_: [Campaign.get_version_cache_key(campaign_id)]
+    )
+)
 def get_campaign(
     request: HttpRequest, advertiser_id: UUID, campaign_id: UUID
 ) -> tuple[status, schemas.CampaignOut]:
@@ -141,9 +216,6 @@ def delete_campaign(
         advertiser_id=advertiser_id,
     )
 
-    if campaign.ad_image:
-        campaign.ad_image.delete()
-
     campaign.delete()
 
     return status.NO_CONTENT, None
@@ -158,7 +230,8 @@ def delete_campaign(
     },
     description=(
         "Uploads image to ad_image field. "
-        "If image already exists then image will be overridden."
+        "If image already exists then image will be overridden. "
+        "Resized WebP/AVIF variants are generated in the background."
     ),
 )
 def upload_ad_image(
@@ -172,7 +245,7 @@ def upload_ad_image(
         id=campaign_id,
         advertiser_id=advertiser_id,
     )
-    if ad_image.size >= 10 * 1024 * 1024:
+    if ad_image.size >= settings.AD_IMAGE_MAX_SIZE:
         raise HttpError(status.BAD_REQUEST, "File can't be bigger than 10MB.")
     try:
         Image.open(ad_image).verify()
@@ -180,14 +253,98 @@ def upload_ad_image(
         raise HttpError(
             status.BAD_REQUEST, "File must be a valid image."
         ) from None
-    if campaign.ad_image:
-        campaign.ad_image.delete(save=True)
-    campaign.ad_image = ad_image
-    campaign.save()
+    campaign.attach_ad_image(ad_image)
+    if not campaign.ad_image_variants:
+        process_ad_image_task.delay(campaign.ad_image.name)
 
     return status.OK, campaign
 
 
+@router.post(
+    "/{advertiser_id}/campaigns/{campaign_id}/ad_image/upload_url",
+    response={
+        status.OK: schemas.AdImageUploadOut,
+        status.BAD_REQUEST: global_schemas.BadRequestError,
+        status.NOT_FOUND: global_schemas.NotFoundError,
+        status.NOT_IMPLEMENTED: global_schemas.BadRequestError,
+    },
+    description=(
+        "Issues a presigned URL to PUT the image straight into object "
+        "storage. Call the finalize endpoint with the returned object_key "
+        "once the upload is done."
+    ),
+)
+def create_ad_image_upload_url(
+    request: HttpRequest,
+    advertiser_id: UUID,
+    campaign_id: UUID,
+    upload: schemas.AdImageUploadIn,
+) -> tuple[status, schemas.AdImageUploadOut]:
+    campaign = get_object_or_404(
+        Campaign,
+        id=campaign_id,
+        advertiser_id=advertiser_id,
+    )
+    object_key = (
+        f"{utils.get_ad_image_upload_prefix(campaign.id)}{uuid4().hex}"
+        f"{PurePosixPath(upload.filename).suffix.lower()}"
+    )
+
+    upload_url = get_upload_url(object_key)
+    if upload_url is None:
+        raise HttpError(
+            status.NOT_IMPLEMENTED,
+            "Direct uploads are not supported by the configured storage.",
+        )
+
+    return status.OK, schemas.AdImageUploadOut(
+        upload_url=upload_url,
+        object_key=object_key,
+        expires_in=settings.AD_IMAGE_UPLOAD_URL_EXPIRES,
+    )
+
+
+@router.post(
+    "/{advertiser_id}/campaigns/{campaign_id}/ad_image/finalize",
+    response={
+        status.ACCEPTED: schemas.AdImageFinalizeOut,
+        status.BAD_REQUEST: global_schemas.BadRequestError,
+        status.NOT_FOUND: global_schemas.NotFoundError,
+    },
+    description=(
+        "Verifies the uploaded image in the background and attaches it to "
+        "ad_image, overriding the existing one. Invalid uploads and images "
+        "of 10MB or more are discarded."
+    ),
+)
+def finalize_ad_image_upload(
+    request: HttpRequest,
+    advertiser_id: UUID,
+    campaign_id: UUID,
+    upload: schemas.AdImageFinalizeIn,
+) -> tuple[status, schemas.AdImageFinalizeOut]:
+    campaign = get_object_or_404(
+        Campaign,
+        id=campaign_id,
+        advertiser_id=advertiser_id,
+    )
+    prefix = utils.get_ad_image_upload_prefix(campaign.id)
+    if (
+        not upload.object_key.startswith(prefix)
+        or "/" in upload.object_key.removeprefix(prefix)
+        or not Campaign.ad_image.field.storage.exists(upload.object_key)
+    ):
+        raise HttpError(status.BAD_REQUEST, "Unknown object_key.")
+
+    task = finalize_ad_image_upload_task.delay(
+        str(campaign.id), upload.object_key
+    )
+
+    return status.ACCEPTED, schemas.AdImageFinalizeOut(
+        task_id=task.id, object_key=upload.object_key
+    )
+
+
 @router.delete(
     "/{advertiser_id}/campaigns/{campaign_id}/ad_image",
     response={
@@ -209,6 +366,6 @@ def delete_ad_image(
         advertiser_id=advertiser_id,
     )
     if campaign.ad_image:
-        campaign.ad_image.delete(save=True)
+        campaign.delete_ad_image()
 
     return status.NO_CONTENT, None
@@ -1,10 +1,23 @@
 from http import HTTPStatus as status
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+import gzip
 import json
+import msgpack
+from unittest import mock
 from uuid import uuid4
+from api.v1 import ingest
 from apps.client.models import Client
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class ClientTests(TestCase):
     def setUp(self):
         self.client_1 = Client.objects.create(
@@ -15,6 +28,7 @@ class ClientTests(TestCase):
         )
 
         self.bulk_url = "/clients/bulk"
+        self.import_url = "/clients/import"
         self.get_url = "/clients"
 
     def test_bulk_create_or_update(self):
@@ -153,3 +167,233 @@ class ClientTests(TestCase):
         response = self.client.get(f"{self.get_url}/invalid_uuid")
 
         self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    @override_settings(BULK_BATCH_SIZE=2)
+    def test_bulk_create_or_update_queries_per_batch(self):
+        client_data = [
+            {
+                "client_id": str(uuid4()),
+                "login": f"user{i}",
+                "age": 20,
+                "location": "City1",
+                "gender": "MALE",
+            }
+            for i in range(5)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.bulk_url,
+                data=json.dumps(client_data),
+                content_type="application/json",
+            )
+        inserts = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith(
+                f'INSERT INTO "{Client._meta.db_table}"'
+            )
+        ]
+
+        self.assertEqual(response.status_code, status.CREATED)
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Client.objects.count(), 7)
+
+    @override_settings(BULK_BATCH_SIZE=2)
+    def test_import_ndjson(self):
+        client_3_id = str(uuid4())
+        lines = [
+            {
+                "client_id": client_3_id,
+                "login": "newuser",
+                "age": 21,
+                "location": "City1",
+                "gender": "FEMALE",
+            },
+            {
+                "client_id": str(self.client_1.id),
+                "login": "updateduser",
+                "age": 26,
+                "location": "City1",
+                "gender": "MALE",
+            },
+            {
+                "client_id": "invalid_uuid",
+                "login": "baduser",
+                "age": 150,
+                "location": "City4",
+                "gender": "UNKNOWN",
+            },
+        ]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n\n"
+
+        response = self.client.post(
+            self.import_url,
+            data=body.encode(),
+            content_type="application/x-ndjson",
+        )
+        self.client_1.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["received"], 3)
+        self.assertEqual(response.json()["upserted"], 2)
+        self.assertEqual(response.json()["rejected"], 1)
+        self.assertEqual(len(response.json()["chunks"]), 2)
+        self.assertEqual(response.json()["chunks"][1]["errors"][0]["line"], 3)
+        self.assertEqual(Client.objects.count(), 3)
+        self.assertEqual(self.client_1.login, "updateduser")
+
+    def test_import_gzip_ndjson(self):
+        client_id = str(uuid4())
+        line = {
+            "client_id": client_id,
+            "login": "gzipuser",
+            "age": 30,
+            "location": "City2",
+            "gender": "MALE",
+        }
+
+        response = self.client.post(
+            self.import_url,
+            data=gzip.compress(json.dumps(line).encode()),
+            content_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["upserted"], 1)
+        self.assertEqual(Client.objects.get(id=client_id).login, "gzipuser")
+
+    def test_import_invalid_gzip(self):
+        response = self.client.post(
+            self.import_url,
+            data=b"not gzip",
+            content_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    @override_settings(BULK_BATCH_SIZE=2)
+    def test_import_caps_reported_errors(self):
+        body = b"{}\n" * 5
+
+        with mock.patch.object(ingest, "MAX_REPORTED_ERRORS", 3):
+            response = self.client.post(
+                self.import_url,
+                data=body,
+                content_type="application/x-ndjson",
+            )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["rejected"], 5)
+        self.assertEqual(response.json()["unreported"], 2)
+        self.assertEqual(
+            sum(len(chunk["errors"]) for chunk in response.json()["chunks"]),
+            3,
+        )
+
+    @override_settings(BULK_BATCH_SIZE=1)
+    def test_import_reports_committed_chunks_on_failure(self):
+        client_id = str(uuid4())
+        line = {
+            "client_id": client_id,
+            "login": "firstuser",
+            "age": 30,
+            "location": "City2",
+            "gender": "MALE",
+        }
+        body = gzip.compress((json.dumps(line) + "\n").encode() * 2000)
+
+        response = self.client.post(
+            self.import_url,
+            data=body[: len(body) // 2],
+            content_type="application/x-ndjson",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+        self.assertGreater(response.json()["upserted"], 0)
+        self.assertEqual(
+            response.json()["detail"],
+            "Request body is not a valid gzip stream.",
+        )
+        self.assertEqual(Client.objects.get(id=client_id).login, "firstuser")
+
+    def test_import_unsupported_encoding(self):
+        response = self.client.post(
+            self.import_url,
+            data=b"",
+            content_type="application/x-ndjson",
+            headers={"Content-Encoding": "br"},
+        )
+
+        self.assertEqual(response.status_code, status.UNSUPPORTED_MEDIA_TYPE)
+
+    def test_bulk_create_msgpack(self):
+        client_id = str(uuid4())
+        data = [
+            {
+                "client_id": client_id,
+                "login": "msgpackuser",
+                "age": 22,
+                "location": "City3",
+                "gender": "FEMALE",
+            }
+        ]
+
+        response = self.client.post(
+            self.bulk_url,
+            data=msgpack.packb(data),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+
+        self.assertEqual(response.status_code, status.CREATED)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), data)
+
+    def test_bulk_create_invalid_msgpack(self):
+        response = self.client.post(
+            self.bulk_url,
+            data=b"\xc1",
+            content_type="application/msgpack",
+        )
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+
+    def test_import_msgpack(self):
+        client_id = str(uuid4())
+        records = [
+            {
+                "client_id": client_id,
+                "login": "msgpackuser",
+                "age": 22,
+                "location": "City3",
+                "gender": "FEMALE",
+            },
+            {"client_id": "invalid_uuid"},
+        ]
+
+        response = self.client.post(
+            self.import_url,
+            data=gzip.compress(
+                b"".join(msgpack.packb(record) for record in records)
+            ),
+            content_type="application/msgpack",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["upserted"], 1)
+        self.assertEqual(response.json()["chunks"][0]["errors"][0]["line"], 2)
+        self.assertEqual(Client.objects.get(id=client_id).login, "msgpackuser")
+
+    def test_import_truncated_msgpack(self):
+        response = self.client.post(
+            self.import_url,
+            data=msgpack.packb({"client_id": str(uuid4())})[:-3],
+            content_type="application/msgpack",
+        )
+
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
@@ -1,14 +1,22 @@
-from collections import defaultdict
 from http import HTTPStatus as status
+from typing import Any
 from uuid import UUID
 
+import pydantic
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404
 from ninja import Router
+from ninja.decorators import decorate_view
+from ninja.errors import HttpError
 
+from api.v1 import ingest
 from api.v1 import schemas as global_schemas
 from api.v1.clients import schemas
+from api.v1.conditional import versioned
+from api.v1.renderers import MSGPACK_CONTENT_TYPES
 from apps.client.models import Client
 
 router = Router(tags=["clients"])
@@ -24,39 +32,133 @@ router = Router(tags=["clients"])
 def bulk_create_or_update(
     request: HttpRequest, data: list[schemas.Client]
 ) -> tuple[status, list[Client]]:
-    latest_clients = defaultdict(lambda: None)
+    latest_clients: dict[UUID, Client] = {}
 
-    for item in reversed(data):
-        Client(id=item.client_id, **item.dict(exclude={"client_id"})).validate(
-            validate_unique=False,
-            validate_constraints=False,
-        )
-        if latest_clients[item.client_id] is None:
-            latest_clients[item.client_id] = item
+    for item in data:
+        client = Client(id=item.client_id, **item.dict(exclude={"client_id"}))
+        client.validate(validate_unique=False, validate_constraints=False)
+        latest_clients.pop(item.client_id, None)
+        latest_clients[item.client_id] = client
 
-    unique_clients = reversed(list(latest_clients.values()))
+    with transaction.atomic():
+        result = Client.objects.bulk_upsert(latest_clients.values())
 
-    result = []
+    return status.CREATED, result
 
-    with transaction.atomic():
-        for client in unique_clients:
-            client_instance, _ = Client.objects.update_or_create(
-                id=client.client_id,
-                defaults={**dict(client)},
+
+def parse_client_record(record: Any) -> Client:
+    item = (
+        schemas.Client.model_validate_json(record)
+        if isinstance(record, bytes)
+        else schemas.Client.model_validate(record)
+    )
+    client = Client(id=item.client_id, **item.dict(exclude={"client_id"}))
+    client.validate(validate_unique=False, validate_constraints=False)
+
+    return client
+
+
+@router.post(
+    "/import",
+    response={
+        status.OK: global_schemas.ImportSummary,
+        status.BAD_REQUEST: global_schemas.ImportSummary,
+        status.UNSUPPORTED_MEDIA_TYPE: global_schemas.ImportSummary,
+    },
+    description=(
+        "Streams clients as NDJSON (one client object per line) or as a "
+        "sequence of MessagePack maps, optionally compressed with "
+        "`Content-Encoding: gzip`, and upserts "
+        "them in chunks. Every chunk is committed on its own, invalid "
+        "records are skipped and reported in the chunk summary. If the stream "
+        "turns out to be malformed midway, the summary of the committed "
+        "chunks is returned with the error."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                content_type: {
+                    "schema": schemas.Client.json_schema(),
+                }
+                for content_type in (
+                    ingest.NDJSON_CONTENT_TYPE,
+                    *MSGPACK_CONTENT_TYPES,
+                )
+            },
+            "required": True,
+        },
+    },
+)
+def import_clients(
+    request: HttpRequest,
+) -> tuple[status, global_schemas.ImportSummary]:
+    summary = global_schemas.ImportSummary()
+    records = ingest.iter_records(request)
+
+    try:
+        for number, chunk in enumerate(
+            ingest.chunked(records, settings.BULK_BATCH_SIZE), 1
+        ):
+            latest_clients: dict[UUID, Client] = {}
+            errors = []
+            rejected = 0
+
+            for line_number, record in chunk:
+                try:
+                    client = parse_client_record(record)
+                except (pydantic.ValidationError, ValidationError) as e:
+                    rejected += 1
+                    if (
+                        summary.rejected + rejected
+                        > ingest.MAX_REPORTED_ERRORS
+                    ):
+                        continue
+
+                    errors.append(
+                        global_schemas.ImportLineError(
+                            line=line_number, detail=ingest.format_error(e)
+                        )
+                    )
+                    continue
+
+                latest_clients.pop(client.id, None)
+                latest_clients[client.id] = client
+
+            with transaction.atomic():
+                Client.objects.bulk_upsert(latest_clients.values())
+
+            summary.received += len(chunk)
+            summary.upserted += len(latest_clients)
+            summary.rejected += rejected
+            summary.unreported += rejected - len(errors)
+            summary.chunks.append(
+                global_schemas.ImportChunk(
+                    chunk=number,
+                    received=len(chunk),
+                    upserted=len(latest_clients),
+                    errors=errors,
+                )
             )
-            result.append(client_instance)
+    except HttpError as e:
+        # Committed chunks stay, report them along with the failure.
+        summary.detail = e.message
+        return e.status_code, summary
 
-    return status.CREATED, result
+    return status.OK, summary
 
 
 @router.get(
     "/{client_id}",
     response={
         status.OK: schemas.Client,
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(lambda client_id: [Client.get_version_cache_key(client_id)])
+)
 def get_client(
     request: HttpRequest, client_id: UUID
 ) -> tuple[status, schemas.Client]:
@@ -0,0 +1,85 @@
+import hashlib
+from collections.abc import Callable
+from functools import wraps
+from http import HTTPStatus as status
+from typing import Any
+from uuid import UUID
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from api.v1.renderers import renderer
+from apps.core.cache import init_versions
+
+CURRENT_DATE_CACHE_KEY = "current_date"
+
+
+def make_etag(request: HttpRequest, versions: list[int | None]) -> str:
+    return quote_etag(
+        hashlib.blake2b(
+            repr(
+                (
+                    request.get_full_path(),
+                    renderer.get_content_type(request),
+                    versions,
+                )
+            ).encode(),
+            digest_size=16,
+        ).hexdigest()
+    )
+
+
+def versioned(
+    get_keys: Callable[..., list[str]], vary_on_date: bool = False
+) -> Callable[[Callable[..., HttpResponse]], Callable[..., HttpResponse]]:
+    def decorator(
+        run: Callable[..., HttpResponse],
+    ) -> Callable[..., HttpResponse]:
+        @wraps(run)
+        def wrapper(
+            request: HttpRequest, *args: Any, **kwargs: Any
+        ) -> HttpResponse:
+            try:
+                keys = get_keys(
+                    **{
+                        name: UUID(str(value))
+                        if name.endswith("_id")
+                        else value
+                        for name, value in kwargs.items()
+                    }
+                )
+            except ValueError:
+                return run(request, *args, **kwargs)
+
+            # Versions are read before the view runs, so the ETag never
+            # claims a newer version than the body was built from.
+            values = cache.get_many(
+                [*keys, CURRENT_DATE_CACHE_KEY] if vary_on_date else keys
+            )
+            versions = [values.get(key) for key in keys]
+            if vary_on_date:
+                versions.append(values.get(CURRENT_DATE_CACHE_KEY, 0))
+
+            etag = (
+                make_etag(request, versions) if None not in versions else None
+            )
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = run(request, *args, **kwargs)
+
+            if response.status_code not in {status.OK, status.NOT_MODIFIED}:
+                return response
+
+            if etag:
+                response.headers.setdefault("ETag", etag)
+            else:
+                init_versions(keys)
+
+            return response
+
+        return wrapper
+
+    return decorator
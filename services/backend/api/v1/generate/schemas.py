@@ -2,6 +2,7 @@ from typing import Any, Literal
 from uuid import UUID
 
 from ninja import Schema
+from pydantic.types import NonNegativeInt
 
 
 class GenerateAdTextIn(Schema):
@@ -9,6 +10,11 @@ class GenerateAdTextIn(Schema):
     ad_title: str
 
 
+class GenerateAdTextResultFilters(Schema):
+    # Seconds to wait for the result, capped by the server.
+    wait: NonNegativeInt = 0
+
+
 class Promise(Schema):
     task_id: UUID
     status: Literal[
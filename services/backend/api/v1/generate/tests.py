@@ -0,0 +1,257 @@
+import threading
+from http import HTTPStatus as status
+from unittest import mock
+
+import celery.states
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.campaign import events
+from apps.campaign.tasks import generate_ad_text_task
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class GenerateAdTextTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.statuses = {}
+
+        apply_async = mock.patch.object(generate_ad_text_task, "apply_async")
+        self.apply_async = apply_async.start()
+        self.addCleanup(apply_async.stop)
+
+        get_task_meta = mock.patch.object(
+            events, "get_task_meta", side_effect=self.get_task_meta
+        )
+        get_task_meta.start()
+        self.addCleanup(get_task_meta.stop)
+
+    def get_task_meta(self, task_id: str) -> dict:
+        task_status = self.statuses.get(task_id, celery.states.PENDING)
+        return {
+            "status": task_status,
+            "result": "Ad text"
+            if task_status == celery.states.SUCCESS
+            else None,
+        }
+
+    def generate(self, ad_title: str = "Title") -> dict:
+        response = self.client.post(
+            "/generate/ad_text",
+            data={"advertiser_name": "Advertiser", "ad_title": ad_title},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.OK)
+
+        return response.json()
+
+    def test_identical_prompts_share_task(self) -> None:
+        first = self.generate()
+        second = self.generate()
+
+        self.assertEqual(first["task_id"], second["task_id"])
+        self.apply_async.assert_called_once_with(
+            ("Advertiser", "Title"), task_id=first["task_id"]
+        )
+
+    def test_different_prompts_get_own_tasks(self) -> None:
+        self.assertNotEqual(
+            self.generate()["task_id"], self.generate("Other")["task_id"]
+        )
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_recent_result_is_returned(self) -> None:
+        task_id = self.generate()["task_id"]
+        self.statuses[task_id] = celery.states.SUCCESS
+
+        promise = self.generate()
+
+        self.assertEqual(promise["task_id"], task_id)
+        self.assertEqual(promise["status"], celery.states.SUCCESS)
+        self.assertEqual(promise["result"], "Ad text")
+        self.apply_async.assert_called_once()
+
+    def test_failed_task_is_replaced(self) -> None:
+        task_id = self.generate()["task_id"]
+        self.statuses[task_id] = celery.states.FAILURE
+
+        self.assertNotEqual(self.generate()["task_id"], task_id)
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    @mock.patch(
+        "apps.campaign.tasks.YandexAIAdTextGenerator.generate_ad_text",
+        return_value=None,
+    )
+    def test_empty_result_is_not_cached(
+        self, generate_ad_text: mock.MagicMock
+    ) -> None:
+        task_id = self.generate()["task_id"]
+
+        generate_ad_text_task("Advertiser", "Title")
+
+        self.assertNotEqual(self.generate()["task_id"], task_id)
+
+    def test_result_of_unknown_task(self) -> None:
+        response = self.client.get(
+            "/generate/ad_text/00000000-0000-0000-0000-000000000000/result"
+        )
+
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+
+    @mock.patch.object(events, "listen")
+    def test_result_long_poll(self, listen: mock.MagicMock) -> None:
+        task_id = self.generate()["task_id"]
+        listen.return_value = iter(
+            [
+                ("partial", "Ad"),
+                ("result", {"status": "SUCCESS", "result": "Ad text"}),
+            ]
+        )
+
+        response = self.client.get(
+            f"/generate/ad_text/{task_id}/result", {"wait": 60}
+        )
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.json()["result"], "Ad text")
+        listen.assert_called_once_with(task_id, 30)
+
+    @mock.patch.object(events, "waiters", threading.BoundedSemaphore(0))
+    @mock.patch.object(events, "listen")
+    def test_result_long_poll_when_busy(self, listen: mock.MagicMock) -> None:
+        task_id = self.generate()["task_id"]
+        self.statuses[task_id] = celery.states.STARTED
+
+        response = self.client.get(
+            f"/generate/ad_text/{task_id}/result", {"wait": 60}
+        )
+
+        self.assertEqual(response.status_code, status.ACCEPTED)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(response.json()["status"], celery.states.STARTED)
+        listen.assert_not_called()
+
+    @mock.patch.object(events, "listen")
+    def test_result_without_wait_does_not_listen(
+        self, listen: mock.MagicMock
+    ) -> None:
+        task_id = self.generate()["task_id"]
+        self.statuses[task_id] = celery.states.STARTED
+
+        response = self.client.get(f"/generate/ad_text/{task_id}/result")
+
+        self.assertEqual(response.json()["status"], celery.states.STARTED)
+        listen.assert_not_called()
+
+    @mock.patch.object(events, "listen")
+    def test_events_stream(self, listen: mock.MagicMock) -> None:
+        task_id = self.generate()["task_id"]
+        listen.return_value = iter(
+            [
+                ("partial", "Ad"),
+                ("result", {"status": "SUCCESS", "result": "Ad text"}),
+            ]
+        )
+
+        response = self.client.get(f"/generate/ad_text/{task_id}/events")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            b'event: partial\ndata: {"text":"Ad"}\n\n'
+            b"event: result\ndata: "
+            b'{"task_id":"%s","status":"SUCCESS","result":"Ad text"}\n\n'
+            % task_id.encode(),
+        )
+
+    @mock.patch.object(events, "waiters", threading.BoundedSemaphore(0))
+    @mock.patch.object(events, "listen")
+    def test_events_stream_when_busy(self, listen: mock.MagicMock) -> None:
+        task_id = self.generate()["task_id"]
+        self.statuses[task_id] = celery.states.STARTED
+
+        response = self.client.get(f"/generate/ad_text/{task_id}/events")
+
+        self.assertEqual(
+            b"".join(response.streaming_content), b"retry: 1000\n\n"
+        )
+
+        self.statuses[task_id] = celery.states.SUCCESS
+
+        response = self.client.get(f"/generate/ad_text/{task_id}/events")
+
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            b"event: result\ndata: "
+            b'{"task_id":"%s","status":"SUCCESS","result":"Ad text"}\n\n'
+            % task_id.encode(),
+        )
+        listen.assert_not_called()
+
+
+class ListenTest(TestCase):
+    def setUp(self) -> None:
+        current_app = mock.patch.object(events, "current_app")
+        self.backend = current_app.start().backend
+        self.addCleanup(current_app.stop)
+
+        self.backend.get_key_for_task.side_effect = lambda task_id, key="": (
+            f"celery-task-meta-{task_id}{key}".encode()
+        )
+        self.backend.get_task_meta.return_value = {
+            "status": celery.states.PENDING,
+            "result": None,
+        }
+        self.backend.decode_result.side_effect = lambda data: {
+            "status": data.decode(),
+            "result": None,
+        }
+        self.pubsub = self.backend.client.pubsub.return_value
+
+    def message(self, channel: str, data: bytes) -> dict:
+        return {"channel": channel.encode(), "data": data}
+
+    def test_streams_partials_until_result(self) -> None:
+        self.pubsub.get_message.side_effect = [
+            self.message("celery-task-meta-1-partial", b"Ad"),
+            None,
+            self.message("celery-task-meta-1", b"STARTED"),
+            self.message("celery-task-meta-1", b"SUCCESS"),
+        ]
+
+        self.assertEqual(
+            list(events.listen("1", 10)),
+            [
+                ("partial", "Ad"),
+                ("result", {"status": "SUCCESS", "result": None}),
+            ],
+        )
+        self.pubsub.subscribe.assert_called_once_with(
+            b"celery-task-meta-1", b"celery-task-meta-1-partial"
+        )
+        self.pubsub.close.assert_called_once()
+
+    def test_ready_task_is_returned_immediately(self) -> None:
+        self.backend.get_task_meta.return_value = {
+            "status": celery.states.SUCCESS,
+            "result": "Ad text",
+        }
+
+        self.assertEqual(
+            list(events.listen("1", 10)),
+            [("result", {"status": "SUCCESS", "result": "Ad text"})],
+        )
+        self.pubsub.get_message.assert_not_called()
+
+    @mock.patch.object(events.time, "monotonic", side_effect=[0, 0, 11])
+    def test_stops_after_timeout(self, monotonic: mock.MagicMock) -> None:
+        self.pubsub.get_message.return_value = None
+
+        self.assertEqual(list(events.listen("1", 10)), [])
+        self.pubsub.close.assert_called_once()
@@ -1,17 +1,40 @@
+from collections.abc import Iterator
 from http import HTTPStatus as status
+from typing import Any
 from uuid import UUID
 
 import celery.states
-from celery.result import AsyncResult
-from django.http import Http404, HttpRequest
-from ninja import Router
+import orjson
+from django.conf import settings
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from ninja import Query, Router
 
 from api.v1 import schemas as global_schemas
 from api.v1.generate import schemas
-from apps.campaign.tasks import generate_ad_text_task
+from apps.campaign import events
+from apps.campaign.tasks import enqueue_ad_text_generation
 
 router = Router(tags=["generate"])
 
+# Seconds a client should wait before asking again when all waiter slots
+# are taken.
+RETRY_AFTER = 1
+
+
+def get_promise(task_id: UUID | str, meta: dict[str, Any]) -> schemas.Promise:
+    result = meta["result"]
+    if meta["status"] != celery.states.SUCCESS:
+        result = None
+
+    return schemas.Promise(
+        task_id=task_id, status=meta["status"], result=result
+    )
+
 
 @router.post(
     "/ad_text",
@@ -23,38 +46,118 @@ router = Router(tags=["generate"])
 def generate_ad_text(
     request: HttpRequest, prompt: schemas.GenerateAdTextIn
 ) -> tuple[status, schemas.Promise]:
-    task = generate_ad_text_task.delay(prompt.advertiser_name, prompt.ad_title)
-    task_result = AsyncResult(task.id)
-
-    return status.OK, schemas.Promise(
-        task_id=task.id,
-        status=task_result.status,
-        result=task_result.result,
+    task_id, meta = enqueue_ad_text_generation(
+        prompt.advertiser_name, prompt.ad_title
     )
 
+    return status.OK, get_promise(task_id, meta)
+
 
 @router.get(
     "/ad_text/{task_id}/result",
     response={
         status.OK: schemas.Promise,
+        status.ACCEPTED: schemas.Promise,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
 def get_generate_ad_text_result(
-    request: HttpRequest, task_id: UUID
+    request: HttpRequest,
+    response: HttpResponse,
+    task_id: UUID,
+    filters: Query[schemas.GenerateAdTextResultFilters],
 ) -> tuple[status, schemas.Promise]:
-    task_result = AsyncResult(str(task_id))
+    meta = events.get_task_meta(str(task_id))
+    busy = False
 
-    if task_result.status == celery.states.PENDING:
+    # Long-poll, the response is sent as soon as the task is ready.
+    if filters.wait and meta["status"] not in celery.states.READY_STATES:
+        if events.waiters.acquire(blocking=False):
+            try:
+                for event, data in events.listen(
+                    str(task_id),
+                    min(filters.wait, settings.AD_TEXT_RESULT_MAX_WAIT),
+                ):
+                    if event == "result":
+                        meta = data
+            finally:
+                events.waiters.release()
+        else:
+            busy = True
+
+    if meta["status"] == celery.states.PENDING:
         raise Http404
 
-    result = task_result.result
-    if task_result.status != celery.states.SUCCESS:
-        result = None
+    if busy:
+        response["Retry-After"] = str(RETRY_AFTER)
+        return status.ACCEPTED, get_promise(task_id, meta)
+
+    return status.OK, get_promise(task_id, meta)
+
+
+def format_event(event: str, data: Any) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (event.encode(), orjson.dumps(data))
 
-    return status.OK, schemas.Promise(
-        task_id=task_result.task_id,
-        status=task_result.status,
-        result=result,
+
+def format_result(task_id: str, meta: dict[str, Any]) -> bytes:
+    return format_event(
+        "result", get_promise(task_id, meta).model_dump(mode="json")
     )
+
+
+def stream_ad_text_events(task_id: str) -> Iterator[bytes]:
+    # With no free slot the stream ends at once, asking EventSource to
+    # reconnect later unless the result is already there.
+    if not events.waiters.acquire(blocking=False):
+        meta = events.get_task_meta(task_id)
+        if meta["status"] in celery.states.READY_STATES:
+            yield format_result(task_id, meta)
+        else:
+            yield b"retry: %d\n\n" % (RETRY_AFTER * 1000)
+        return
+
+    try:
+        for event, data in events.listen(
+            task_id, settings.AD_TEXT_RESULT_MAX_WAIT
+        ):
+            if event == "partial":
+                yield format_event("partial", {"text": data})
+            else:
+                yield format_result(task_id, data)
+    finally:
+        events.waiters.release()
+
+
+@router.get(
+    "/ad_text/{task_id}/events",
+    response={
+        status.OK: None,
+        status.BAD_REQUEST: global_schemas.BadRequestError,
+    },
+    openapi_extra={
+        "responses": {
+            status.OK: {
+                "description": (
+                    "Server-sent events: `partial` with the text generated "
+                    "so far and a final `result` with the promise. The "
+                    "stream closes without a result after a timeout, or "
+                    "right away with a `retry` delay when the server is "
+                    "busy."
+                ),
+                "content": {"text/event-stream": {}},
+            }
+        }
+    },
+)
+def get_generate_ad_text_events(
+    request: HttpRequest, task_id: UUID
+) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        stream_ad_text_events(str(task_id)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+
+    return response
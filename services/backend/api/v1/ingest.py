@@ -0,0 +1,99 @@
+import gzip
+import zlib
+from collections.abc import Iterable, Iterator
+from http import HTTPStatus as status
+from itertools import islice
+from typing import IO, Any, TypeVar
+
+import msgpack
+import pydantic
+from django.core.exceptions import ValidationError
+from django.http import HttpRequest
+from ninja.errors import HttpError
+
+from api.v1.renderers import MSGPACK_CONTENT_TYPES
+
+T = TypeVar("T")
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+SUPPORTED_CONTENT_ENCODINGS = ("identity", "gzip")
+
+# Errors reported per import, the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+
+def open_body(request: HttpRequest) -> IO[bytes]:
+    encoding = request.headers.get("Content-Encoding", "identity").lower()
+
+    if encoding not in SUPPORTED_CONTENT_ENCODINGS:
+        raise HttpError(
+            status.UNSUPPORTED_MEDIA_TYPE,
+            f"Content-Encoding must be one of: "
+            f"{', '.join(SUPPORTED_CONTENT_ENCODINGS)}.",
+        )
+
+    if encoding == "gzip":
+        return gzip.GzipFile(fileobj=request, mode="rb")
+
+    return request
+
+
+def iter_ndjson_lines(request: HttpRequest) -> Iterator[tuple[int, bytes]]:
+    stream = open_body(request)
+
+    try:
+        for number, line in enumerate(stream, 1):
+            stripped = line.strip()
+            if stripped:
+                yield number, stripped
+    except (OSError, EOFError, zlib.error):
+        raise HttpError(
+            status.BAD_REQUEST, "Request body is not a valid gzip stream."
+        ) from None
+
+
+def iter_msgpack_objects(request: HttpRequest) -> Iterator[tuple[int, Any]]:
+    unpacker = msgpack.Unpacker(open_body(request), raw=False)
+
+    try:
+        yield from enumerate(unpacker, 1)
+        # Iteration stops silently on a truncated trailing object, reading
+        # past it raises instead.
+        unpacker.read_bytes(1)
+    except (OSError, EOFError, zlib.error):
+        raise HttpError(
+            status.BAD_REQUEST, "Request body is not a valid gzip stream."
+        ) from None
+    except ValueError:
+        raise HttpError(
+            status.BAD_REQUEST,
+            "Request body is not a valid MessagePack stream.",
+        ) from None
+
+
+def iter_records(request: HttpRequest) -> Iterator[tuple[int, Any]]:
+    if request.content_type in MSGPACK_CONTENT_TYPES:
+        return iter_msgpack_objects(request)
+
+    return iter_ndjson_lines(request)
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(iterable)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def format_error(exc: Exception) -> Any:
+    if isinstance(exc, pydantic.ValidationError):
+        return exc.errors(
+            include_url=False, include_context=False, include_input=False
+        )
+    if isinstance(exc, ValidationError) and hasattr(exc, "error_dict"):
+        return dict(exc)
+    if isinstance(exc, ValidationError):
+        return list(exc)
+
+    return str(exc)
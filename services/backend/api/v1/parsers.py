@@ -0,0 +1,16 @@
+from typing import Any
+
+import msgpack
+import orjson
+from django.http import HttpRequest
+from ninja.parser import Parser
+
+from api.v1.renderers import MSGPACK_CONTENT_TYPES
+
+
+class NegotiatingParser(Parser):
+    def parse_body(self, request: HttpRequest) -> Any:
+        if request.content_type in MSGPACK_CONTENT_TYPES:
+            return msgpack.unpackb(request.body)
+
+        return orjson.loads(request.body)
@@ -0,0 +1,121 @@
+from http import HTTPStatus as status
+from typing import Any
+
+import msgpack
+import orjson
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+JSON_CONTENT_TYPE = "application/json"
+
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = JSON_CONTENT_TYPE
+    # Datetimes fall back to NinjaJSONEncoder, so output matches the
+    # default JSONRenderer. Subclasses of str, int, dict and list such as
+    # SafeString are serialized like their base types, as json does.
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def __init__(self) -> None:
+        self.encoder = NinjaJSONEncoder()
+
+    def render(
+        self, request: HttpRequest, data: Any, *, response_status: int
+    ) -> bytes:
+        return orjson.dumps(
+            data, default=self.encoder.default, option=self.options
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MSGPACK_CONTENT_TYPES[0]
+    charset = None
+
+    def __init__(self) -> None:
+        self.encoder = NinjaJSONEncoder()
+
+    def render(
+        self, request: HttpRequest, data: Any, *, response_status: int
+    ) -> bytes:
+        return msgpack.packb(data, default=self.encoder.default)
+
+
+def get_accepted_quality(
+    request: HttpRequest, media_types: tuple[str, ...]
+) -> float:
+    for accepted in request.headers.get("Accept", "").split(","):
+        media_type, *params = (part.strip() for part in accepted.split(";"))
+        if media_type.lower() not in media_types:
+            continue
+
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value)
+                except ValueError:
+                    return 0.0
+
+        return 1.0
+
+    return 0.0
+
+
+class NegotiatingRenderer(BaseRenderer):
+    media_type = JSON_CONTENT_TYPE
+
+    def __init__(self) -> None:
+        self.json = ORJSONRenderer()
+        self.msgpack = MessagePackRenderer()
+
+    def select(self, request: HttpRequest) -> BaseRenderer:
+        # MessagePack is only sent to clients that ask for it explicitly,
+        # browsers and wildcard Accept headers keep getting JSON.
+        msgpack_quality = get_accepted_quality(request, MSGPACK_CONTENT_TYPES)
+
+        if msgpack_quality > 0 and msgpack_quality >= get_accepted_quality(
+            request, (JSON_CONTENT_TYPE,)
+        ):
+            return self.msgpack
+
+        return self.json
+
+    def get_content_type(self, request: HttpRequest) -> str:
+        renderer = self.select(request)
+
+        if renderer.charset:
+            return f"{renderer.media_type}; charset={renderer.charset}"
+
+        return renderer.media_type
+
+    def render(
+        self, request: HttpRequest, data: Any, *, response_status: int
+    ) -> bytes:
+        return self.select(request).render(
+            request, data, response_status=response_status
+        )
+
+    def negotiate(self, request: HttpRequest, response: HttpResponse) -> None:
+        response["Content-Type"] = self.get_content_type(request)
+        patch_vary_headers(response, ("Accept",))
+
+
+renderer = NegotiatingRenderer()
+
+
+def render_response(
+    request: HttpRequest, data: Any, response_status: int = status.OK
+) -> HttpResponse:
+    # Plain dicts and lists skip response schema validation, the shape is
+    # still documented by the operation's response schema.
+    response = HttpResponse(
+        renderer.render(request, data, response_status=response_status),
+        status=response_status,
+    )
+    renderer.negotiate(request, response)
+
+    return response
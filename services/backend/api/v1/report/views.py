@@ -8,9 +8,10 @@ from ninja import Router
 from api.v1 import schemas as global_schemas
 from api.v1.report import schemas
 from apps.campaign.models import Campaign, CampaignImpression, CampaignReport
-from apps.campaign.tasks import moderate_campaign_task
+from apps.campaign.tasks import schedule_campaign_moderation
 from apps.client.models import Client
 from config.errors import ForbiddenError
+from integrations.yandexai.moderation import YandexAIModerator
 
 router = Router(tags=["report"])
 
@@ -36,13 +37,17 @@ def submit_report(
     except CampaignImpression.DoesNotExist:
         raise ForbiddenError from None
 
-    report_instance = CampaignReport.objects.create(
+    # Reports on already moderated content resolve without an LLM call.
+    verdict = YandexAIModerator.get_cached_verdict(
+        (campaign.ad_title, campaign.ad_text)
+    )
+    CampaignReport.objects.create(
         campaign=campaign,
         client=client,
         message=report.message,
+        flagged_by_llm=verdict,
     )
-    moderate_campaign_task.delay(
-        report_instance.id, campaign.ad_title, campaign.ad_text
-    )
+    if verdict is None:
+        schedule_campaign_moderation(campaign.id)
 
     return status.OK, schemas.SubmitReportOut()
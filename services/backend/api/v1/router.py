@@ -1,8 +1,10 @@
 from functools import partial
+from typing import Any
 
+from django.http import HttpRequest, HttpResponse
 from ninja import NinjaAPI
 
-from api.v1 import handlers
+from api.v1 import handlers, parsers, renderers
 from api.v1.ads.views import router as ads_router
 from api.v1.advertisers.views import router as advertisers_router
 from api.v1.campaigns.views import router as compaigns_router
@@ -12,11 +14,33 @@ from api.v1.report.views import router as report_router
 from api.v1.stats.views import router as stats_router
 from api.v1.time.views import router as time_router
 
-router = NinjaAPI(
+
+class NegotiatingNinjaAPI(NinjaAPI):
+    renderer: renderers.NegotiatingRenderer
+
+    def create_response(
+        self,
+        request: HttpRequest,
+        data: Any,
+        *,
+        status: int | None = None,
+        temporal_response: HttpResponse | None = None,
+    ) -> HttpResponse:
+        response = super().create_response(
+            request, data, status=status, temporal_response=temporal_response
+        )
+        self.renderer.negotiate(request, response)
+
+        return response
+
+
+router = NegotiatingNinjaAPI(
     title="AdNova API",
     version="1",
     description="API docs for AdNova",
     openapi_url="/docs/openapi.json",
+    renderer=renderers.renderer,
+    parser=parsers.NegotiatingParser(),
 )
 
 
@@ -2,6 +2,7 @@ from http import HTTPStatus as status
 from typing import Any
 
 from ninja import Schema
+from pydantic import Field
 
 
 class BadRequestError(Schema):
@@ -22,3 +23,26 @@ class NotFoundError(Schema):
 
 class ConflictError(Schema):
     detail: Any
+
+
+class ImportLineError(Schema):
+    line: int
+    detail: Any
+
+
+class ImportChunk(Schema):
+    chunk: int
+    received: int
+    upserted: int
+    errors: list[ImportLineError]
+
+
+class ImportSummary(Schema):
+    received: int = 0
+    upserted: int = 0
+    rejected: int = 0
+    # Rejected records left out of the chunk errors.
+    unreported: int = 0
+    chunks: list[ImportChunk] = Field(default_factory=list)
+    # Why the import stopped, chunks above are committed anyway.
+    detail: str | None = None
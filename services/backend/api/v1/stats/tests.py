@@ -1,9 +1,21 @@
 import uuid
+import msgpack
 from django.test import TestCase, Client, override_settings
 from http import HTTPStatus as status
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from apps.campaign.models import Advertiser, Campaign
+from apps.client.models import Client as ClientModel
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class AdvertiserCampaignTestCase(TestCase):
     @override_settings(
         CACHES={
@@ -14,18 +26,20 @@ class AdvertiserCampaignTestCase(TestCase):
     )
     def setUp(self):
         self.client = Client()
-        self.advertiser = Advertiser.objects.create(name="Test Advertiser")
-        self.campaign = Campaign.objects.create(
-            advertiser=self.advertiser,
-            impressions_limit=0,
-            clicks_limit=0,
-            cost_per_impression=0,
-            cost_per_click=0,
-            ad_title="title",
-            ad_text="text",
-            start_date=0,
-            end_date=0,
-        )
+        # Versions are bumped once the changes are committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.advertiser = Advertiser.objects.create(name="Test Advertiser")
+            self.campaign = Campaign.objects.create(
+                advertiser=self.advertiser,
+                impressions_limit=0,
+                clicks_limit=0,
+                cost_per_impression=0,
+                cost_per_click=0,
+                ad_title="title",
+                ad_text="text",
+                start_date=0,
+                end_date=0,
+            )
 
         self.campaigns_prefix = "/stats/campaigns"
         self.advertisers_prefix = "/stats/advertisers"
@@ -131,3 +145,67 @@ class AdvertiserCampaignTestCase(TestCase):
 
         self.assertEqual(response.status_code, status.OK)
         self.assertIsInstance(response.json(), list)
+
+    def test_get_campaign_statistics_not_modified(self):
+        url = f"{self.campaigns_prefix}/{self.campaign.id}"
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(
+            any(
+                'FROM "campaign_' in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_get_statistics_etag_changes_on_impression(self):
+        urls = [
+            f"{self.campaigns_prefix}/{self.campaign.id}",
+            f"{self.advertisers_prefix}/{self.advertiser.id}",
+        ]
+        etags = [self.client.get(url)["ETag"] for url in urls]
+        client = ClientModel.objects.create(
+            login="client", age=20, location="City", gender="MALE"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.view(client)
+
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(response.status_code, status.OK)
+            self.assertNotEqual(response["ETag"], etag)
+            self.assertEqual(response.json()["impressions_count"], 1)
+
+    def test_get_daily_statistics_etag_changes_with_date(self):
+        url = f"{self.advertisers_prefix}/{self.advertiser.id}/campaigns/daily"
+        etag = self.client.get(url)["ETag"]
+
+        cache.set("current_date", 1)
+        self.addCleanup(cache.delete, "current_date")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_get_campaign_statistics_msgpack(self):
+        url = f"{self.campaigns_prefix}/{self.campaign.id}"
+        json_response = self.client.get(url, HTTP_ACCEPT="*/*")
+
+        response = self.client.get(url, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertIn("Accept", response["Vary"])
+        self.assertEqual(
+            msgpack.unpackb(response.content), json_response.json()
+        )
+        self.assertTrue(
+            json_response["Content-Type"].startswith("application/json")
+        )
+        self.assertNotEqual(response["ETag"], json_response["ETag"])
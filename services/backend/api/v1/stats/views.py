@@ -1,12 +1,14 @@
 from http import HTTPStatus as status
-from typing import Any
 from uuid import UUID
 
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from ninja import Router
+from ninja.decorators import decorate_view
 
 from api.v1 import schemas as global_schemas
+from api.v1.conditional import versioned
+from api.v1.renderers import render_response
 from api.v1.stats import schemas
 from apps.campaign.models import Advertiser, Campaign
 
@@ -17,61 +19,96 @@ router = Router(tags=["stats"])
     "/campaigns/{campaign_id}",
     response={
         status.OK: schemas.Stat,
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(
+        lambda campaign_id: [
+            Campaign.get_version_cache_key(campaign_id, "stats")
+        ]
+    )
+)
 def get_campaign_statistics(
     request: HttpRequest, campaign_id: UUID
-) -> tuple[status, dict[str, Any]]:
+) -> HttpResponse:
     campaign = get_object_or_404(Campaign, id=campaign_id)
 
-    return status.OK, campaign.get_statistics()
+    return render_response(request, campaign.get_statistics())
 
 
 @router.get(
     "/campaigns/{campaign_id}/daily",
     response={
         status.OK: list[schemas.DailyStat],
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(
+        lambda campaign_id: [
+            Campaign.get_version_cache_key(campaign_id, "stats"),
+            Campaign.get_version_cache_key(campaign_id),
+        ],
+        vary_on_date=True,
+    )
+)
 def get_daily_campaign_statistics(
     request: HttpRequest, campaign_id: UUID
-) -> tuple[status, list[dict[str, Any]]]:
+) -> HttpResponse:
     campaign = get_object_or_404(Campaign, id=campaign_id)
 
-    return status.OK, campaign.get_daily_statistics()
+    return render_response(request, campaign.get_daily_statistics())
 
 
 @router.get(
     "/advertisers/{advertiser_id}",
     response={
         status.OK: schemas.Stat,
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(
+        lambda advertiser_id: [
+            Advertiser.get_version_cache_key(advertiser_id, "stats")
+        ]
+    )
+)
 def get_advertiser_statistics(
     request: HttpRequest, advertiser_id: UUID
-) -> tuple[status, dict[str, Any]]:
+) -> HttpResponse:
     advertiser = get_object_or_404(Advertiser, id=advertiser_id)
 
-    return status.OK, advertiser.get_statistics()
+    return render_response(request, advertiser.get_statistics())
 
 
 @router.get(
     "/advertisers/{advertiser_id}/campaigns/daily",
     response={
         status.OK: list[schemas.DailyStat],
+        status.NOT_MODIFIED: None,
         status.BAD_REQUEST: global_schemas.BadRequestError,
         status.NOT_FOUND: global_schemas.NotFoundError,
     },
 )
+@decorate_view(
+    versioned(
+        lambda advertiser_id: [
+            Advertiser.get_version_cache_key(advertiser_id, "stats")
+        ],
+        vary_on_date=True,
+    )
+)
 def get_daily_advertiser_statistics(
     request: HttpRequest, advertiser_id: UUID
-) -> tuple[status, dict[str, Any]]:
+) -> HttpResponse:
     advertiser = get_object_or_404(Advertiser, id=advertiser_id)
 
-    return status.OK, advertiser.get_daily_statistics()
+    return render_response(request, advertiser.get_daily_statistics())
@@ -0,0 +1,95 @@
+import datetime
+import json
+import msgpack
+import uuid
+from decimal import Decimal
+
+from django.test import RequestFactory, SimpleTestCase
+from django.utils.safestring import SafeString
+from ninja import Schema
+from ninja.renderers import JSONRenderer
+
+from api.v1.renderers import NegotiatingRenderer, ORJSONRenderer
+
+
+class Item(Schema):
+    name: str
+    price: Decimal
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_matches_default_renderer(self):
+        request = RequestFactory().get("/")
+        data = {
+            "id": uuid.uuid4(),
+            "price": Decimal("1.10"),
+            "created_at": datetime.datetime(
+                2025, 1, 1, 12, 0, 0, 123456, tzinfo=datetime.UTC
+            ),
+            "item": Item(name="item", price=Decimal("2.5")),
+            "counts": {1: 2},
+            "values": [1, 2.5, None, True, "text"],
+            "safe": SafeString("<b>safe</b>"),
+        }
+
+        self.assertEqual(
+            json.loads(
+                ORJSONRenderer().render(request, data, response_status=200)
+            ),
+            json.loads(
+                JSONRenderer().render(request, data, response_status=200)
+            ),
+        )
+
+
+class NegotiatingRendererTest(SimpleTestCase):
+    def select(self, accept):
+        request = RequestFactory().get("/", HTTP_ACCEPT=accept)
+
+        return NegotiatingRenderer().get_content_type(request)
+
+    def test_defaults_to_json(self):
+        for accept in ("", "*/*", "text/html,*/*;q=0.8", "application/json"):
+            with self.subTest(accept=accept):
+                self.assertTrue(
+                    self.select(accept).startswith("application/json")
+                )
+
+    def test_selects_msgpack(self):
+        for accept in (
+            "application/msgpack",
+            "application/x-msgpack",
+            "application/json;q=0.5, application/msgpack",
+        ):
+            with self.subTest(accept=accept):
+                self.assertEqual(self.select(accept), "application/msgpack")
+
+    def test_prefers_json_by_quality(self):
+        self.assertTrue(
+            self.select(
+                "application/msgpack;q=0.5, application/json"
+            ).startswith("application/json")
+        )
+        self.assertTrue(
+            self.select("application/msgpack;q=0").startswith(
+                "application/json"
+            )
+        )
+
+    def test_msgpack_round_trip(self):
+        request = RequestFactory().get("/", HTTP_ACCEPT="application/msgpack")
+        data = {
+            "id": uuid.uuid4(),
+            "item": Item(name="item", price=Decimal("2.5")),
+        }
+
+        self.assertEqual(
+            msgpack.unpackb(
+                NegotiatingRenderer().render(
+                    request, data, response_status=200
+                )
+            ),
+            json.loads(
+                JSONRenderer().render(request, data, response_status=200)
+            ),
+        )
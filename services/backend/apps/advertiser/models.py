@@ -4,10 +4,10 @@ from uuid import UUID
 from django.core.cache import cache
 from django.db import models
 
-from apps.core.models import BaseModel
+from apps.core.models import VersionedModel
 
 
-class Advertiser(BaseModel):
+class Advertiser(VersionedModel):
     name = models.TextField()
 
     def __str__(self) -> str:
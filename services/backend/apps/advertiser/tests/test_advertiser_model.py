@@ -6,6 +6,13 @@ from apps.advertiser.models import Advertiser
 from apps.campaign.models import Campaign
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class AdvertiserModelTest(TestCase):
     def setUp(self) -> None:
         self.advertiser = Advertiser.objects.create(name="Test Advertiser")
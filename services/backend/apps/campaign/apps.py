@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from prometheus_client import REGISTRY
 
 
 class CampaignConfig(AppConfig):
     name = "apps.campaign"
     label = "campaign"
+
+    def ready(self) -> None:
+        from apps.campaign import signals  # noqa: F401, PLC0415
+        from apps.campaign.metrics import (  # noqa: PLC0415
+            CounterReconciliationCollector,
+        )
+
+        REGISTRY.register(CounterReconciliationCollector())
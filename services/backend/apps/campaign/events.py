@@ -0,0 +1,62 @@
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import celery.states
+from celery import current_app
+from django.conf import settings
+
+# Celery's Redis result backend publishes every state change on the task's
+# result key. Partial generations are published on a sibling channel.
+
+# Listeners block their thread, callers acquire a slot without blocking
+# and answer right away when none is free.
+waiters = threading.BoundedSemaphore(settings.AD_TEXT_RESULT_MAX_WAITERS)
+
+
+def get_partial_channel(task_id: str) -> bytes:
+    return current_app.backend.get_key_for_task(task_id, key="-partial")
+
+
+def publish_partial(task_id: str, text: str) -> None:
+    current_app.backend.client.publish(get_partial_channel(task_id), text)
+
+
+def get_task_meta(task_id: str) -> dict[str, Any]:
+    return current_app.backend.get_task_meta(task_id)
+
+
+def listen(task_id: str, timeout: float) -> Iterator[tuple[str, Any]]:
+    # Yields ("partial", text) while the task runs and ("result", meta)
+    # once it is ready, or stops when the timeout runs out.
+    backend = current_app.backend
+    result_channel = backend.get_key_for_task(task_id)
+    partial_channel = get_partial_channel(task_id)
+
+    pubsub = backend.client.pubsub(ignore_subscribe_messages=True)
+    try:
+        pubsub.subscribe(result_channel, partial_channel)
+
+        # Read after subscribing, so a result stored in between is not lost.
+        meta = get_task_meta(task_id)
+        if meta["status"] in celery.states.READY_STATES:
+            yield "result", meta
+            return
+
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            message = pubsub.get_message(timeout=remaining)
+            if message is None:
+                continue
+
+            if message["channel"] == partial_channel:
+                yield "partial", message["data"].decode()
+                continue
+
+            meta = backend.decode_result(message["data"])
+            if meta["status"] in celery.states.READY_STATES:
+                yield "result", meta
+                return
+    finally:
+        pubsub.close()
@@ -0,0 +1,170 @@
+import datetime as dt
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import IO, Any
+from urllib.parse import urlsplit
+from uuid import UUID
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.utils import timezone
+from minio import Minio
+from PIL import Image, ImageOps, features
+
+from apps.campaign.models import Campaign
+
+logger = settings.LOGGER
+
+UPLOADS_DIRECTORY = "uploads"
+
+
+def get_variant_formats() -> list[str]:
+    return [
+        image_format
+        for image_format in settings.AD_IMAGE_VARIANT_FORMATS
+        if features.check(image_format)
+    ]
+
+
+def render_variants(file: IO[bytes]) -> Iterator[tuple[dict[str, Any], bytes]]:
+    formats = get_variant_formats()
+
+    with Image.open(file) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+    rendered = set()
+
+    for width, height in settings.AD_IMAGE_VARIANT_SIZES:
+        # Variants fit into the ad slot keeping the aspect ratio and are
+        # never upscaled, small originals collapse into a single variant.
+        variant = image.copy()
+        variant.thumbnail((width, height))
+        variant.info = {}
+        if variant.size in rendered:
+            continue
+        rendered.add(variant.size)
+
+        for image_format in formats:
+            buffer = BytesIO()
+            variant.save(
+                buffer,
+                format=image_format,
+                quality=settings.AD_IMAGE_VARIANT_QUALITY,
+            )
+            yield (
+                {
+                    "size": f"{width}x{height}",
+                    "format": image_format,
+                    "width": variant.width,
+                    "height": variant.height,
+                },
+                buffer.getvalue(),
+            )
+
+
+def generate_ad_image_variants(image_name: str) -> None:
+    storage = Campaign.ad_image.field.storage
+    path = PurePosixPath(image_name)
+    variants = []
+
+    try:
+        with storage.open(image_name) as file:
+            for variant, content in render_variants(file):
+                name = (
+                    f"{path.parent}/variants/{path.stem}_"
+                    f"{variant['width']}x{variant['height']}"
+                    f".{variant['format']}"
+                )
+                # Names derive from the source, which may be shared.
+                variant["name"] = (
+                    name
+                    if storage.exists(name)
+                    else storage.save(name, ContentFile(content))
+                )
+                variants.append(variant)
+    except (OSError, Image.DecompressionBombError):
+        logger.warning("Can't generate variants of %s", image_name)
+
+    # Every campaign sharing the image gets the variants. The image could
+    # have been replaced or released in the meantime.
+    if not Campaign.objects.filter(ad_image=image_name).update(
+        ad_image_variants=variants
+    ):
+        for variant in variants:
+            storage.delete(variant["name"])
+
+
+def get_upload_url(name: str) -> str | None:
+    storage = Campaign.ad_image.field.storage
+    if getattr(storage, "client", None) is None:
+        return None
+
+    # Signed for the public endpoint, the internal one is not reachable by
+    # clients. With the region set signing doesn't touch the network.
+    url = urlsplit(settings.MINIO_STORAGE_MEDIA_URL)
+    public_client = Minio(
+        url.netloc,
+        access_key=settings.MINIO_STORAGE_ACCESS_KEY,
+        secret_key=settings.MINIO_STORAGE_SECRET_KEY,
+        secure=url.scheme == "https",
+        region=settings.MINIO_REGION,
+    )
+
+    return public_client.presigned_put_object(
+        settings.MINIO_STORAGE_MEDIA_BUCKET_NAME,
+        name,
+        expires=dt.timedelta(seconds=settings.AD_IMAGE_UPLOAD_URL_EXPIRES),
+    )
+
+
+def cleanup_ad_image_uploads() -> int:
+    # Finalized uploads are deleted right away. Anything older than twice
+    # the URL lifetime was never finalized.
+    storage = Campaign.ad_image.field.storage
+    cutoff = timezone.now() - dt.timedelta(
+        seconds=settings.AD_IMAGE_UPLOAD_URL_EXPIRES * 2
+    )
+    deleted = 0
+
+    if not storage.exists(UPLOADS_DIRECTORY):
+        return deleted
+
+    for directory in storage.listdir(UPLOADS_DIRECTORY)[0]:
+        prefix = f"{UPLOADS_DIRECTORY}/{directory}"
+        for name in storage.listdir(prefix)[1]:
+            object_key = f"{prefix}/{name}"
+            if storage.get_modified_time(object_key) < cutoff:
+                storage.delete(object_key)
+                deleted += 1
+
+    if deleted:
+        logger.info("Deleted %d abandoned ad image uploads", deleted)
+
+    return deleted
+
+
+def finalize_ad_image_upload(campaign_id: UUID, object_key: str) -> None:
+    storage = Campaign.ad_image.field.storage
+    campaign = None
+
+    try:
+        if storage.size(object_key) >= settings.AD_IMAGE_MAX_SIZE:
+            logger.warning("Uploaded ad image %s is too big", object_key)
+            return
+
+        with storage.open(object_key) as file:
+            with Image.open(file) as image:
+                image.verify()
+
+            campaign = Campaign.objects.get(id=campaign_id)
+            campaign.attach_ad_image(File(file, name=object_key))
+    except (OSError, SyntaxError, Campaign.DoesNotExist):
+        logger.warning("Rejected uploaded ad image %s", object_key)
+        return
+    finally:
+        storage.delete(object_key)
+
+    if not campaign.ad_image_variants:
+        generate_ad_image_variants(campaign.ad_image.name)
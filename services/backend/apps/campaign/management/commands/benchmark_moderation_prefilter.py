@@ -0,0 +1,136 @@
+import random
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.campaign.models import Campaign
+from integrations.yandexai.lexicon import get_verdict
+from integrations.yandexai.moderation import YandexAIModerator
+from integrations.yandexai.runtime import run
+
+CLEAN_TEMPLATES = (
+    "Скидки до {n}% на {item} только до конца недели!",
+    "Закажите {item} с доставкой за {n} минут",
+    "{item}: лучшие цены в городе, звоните!",
+    "Get {n}% off {item} today",
+)
+PROFANE_TEMPLATES = (
+    "{item} за {n} рублей, бля",
+    "Ты мудак, если не купишь {item}",
+    "{item} х у й н я, но дешево",
+    "6ля, какие {item}!",
+)
+# Harmful without profanity, the pre-filter must leave them to the LLM.
+HARMFUL_TEMPLATES = (
+    "Купи {item} или найдем и изобьем",
+    "{item} не для женщин, они тупые",
+    "Ты урод, если не купишь {item}",
+)
+ITEMS = ("телефоны", "пицца", "кроссовки", "ноутбуки", "цветы", "shoes")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how many moderation texts the local lexicon pre-filter "
+        "flags as profane without the LLM and the latency it saves. Every "
+        "other text still goes to the LLM. Uses campaign titles and texts "
+        "from the database, or a synthetic corpus."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Generate this many synthetic texts instead of campaigns.",
+        )
+        parser.add_argument("--limit", type=int, default=10_000)
+        parser.add_argument(
+            "--llm-latency",
+            type=float,
+            default=1.0,
+            help="Seconds per LLM round trip, used unless --measure-llm.",
+        )
+        parser.add_argument(
+            "--measure-llm",
+            type=int,
+            default=0,
+            help="Measure the round trip on this many texts sent to the LLM "
+            "with the configured backend.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["synthetic"]:
+            texts = self.generate_texts(options["synthetic"])
+            source = "synthetic"
+        else:
+            texts = [
+                text
+                for campaign in Campaign.objects.values_list(
+                    Campaign.ad_title.field.name, Campaign.ad_text.field.name
+                )[: options["limit"]]
+                for text in campaign
+            ]
+            source = "campaigns"
+            if not texts:
+                texts = self.generate_texts(options["limit"])
+                source = "synthetic, no campaigns found"
+
+        started_at = time.perf_counter()
+        verdicts = [get_verdict(text) for text in texts]
+        prefilter_time = (time.perf_counter() - started_at) / len(texts)
+
+        flagged = verdicts.count(True)
+        sent = len(texts) - flagged
+
+        llm_latency = options["llm_latency"]
+        if options["measure_llm"]:
+            samples = [
+                text
+                for text, verdict in zip(texts, verdicts, strict=True)
+                if verdict is None
+            ][: options["measure_llm"]]
+            if samples:
+                llm_latency = self.measure_llm(samples)
+
+        self.stdout.write(f"Texts: {len(texts)} ({source})")
+        self.stdout.write(f"  flagged locally:  {self.share(flagged, texts)}")
+        self.stdout.write(f"  sent to LLM:      {self.share(sent, texts)}")
+        self.stdout.write(
+            f"  pre-filter:       {prefilter_time * 1_000_000:.1f} us per text"
+        )
+        self.stdout.write(f"  LLM round trip:   {llm_latency * 1000:.0f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Hit rate {flagged / len(texts):.1%}, {flagged} LLM round "
+                f"trips and {flagged * llm_latency:.1f} s of latency saved."
+            )
+        )
+
+    def generate_texts(self, count: int) -> list[str]:
+        # Roughly what reports look like: mostly clean ads, some obvious
+        # profanity and a few harmful texts that need context.
+        templates = random.choices(
+            (CLEAN_TEMPLATES, PROFANE_TEMPLATES, HARMFUL_TEMPLATES),
+            weights=(70, 20, 10),
+            k=count,
+        )
+        return [
+            random.choice(group).format(
+                item=random.choice(ITEMS), n=random.randint(5, 90)
+            )
+            for group in templates
+        ]
+
+    def measure_llm(self, texts: list[str]) -> float:
+        moderator = YandexAIModerator()
+        started_at = time.perf_counter()
+
+        for text in texts:
+            run(moderator.arequest_moderation_verdict(text))
+
+        return (time.perf_counter() - started_at) / len(texts)
+
+    def share(self, count: int, texts: list[str]) -> str:
+        return f"{count} ({count / len(texts):.1%})"
@@ -0,0 +1,544 @@
+import csv
+import gzip
+import io
+import json
+import time
+from collections.abc import Callable, Generator, Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any
+from uuid import UUID
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import DatabaseError, connection, models, transaction
+
+from apps.advertiser.models import Advertiser
+from apps.client.models import Client
+from apps.core.cache import bump_versions
+from apps.core.models import VersionedModel
+from apps.mlscore.models import Mlscore
+
+FORMATS_BY_SUFFIX = {
+    ".csv": "csv",
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+}
+
+MAX_REPORTED_ERRORS = 10
+
+
+def parse_client(record: dict[str, Any]) -> tuple[Any, ...]:
+    age = int(record["age"])
+    gender = str(record["gender"])
+
+    if not 0 <= age <= 100:
+        err = f"age must be between 0 and 100, got {age}"
+        raise ValueError(err)
+    if gender not in Client.GenderChoices.values:
+        err = f"unknown gender {gender!r}"
+        raise ValueError(err)
+
+    return (
+        UUID(str(record["client_id"])),
+        str(record["login"]),
+        age,
+        str(record["location"]),
+        gender,
+    )
+
+
+def parse_advertiser(record: dict[str, Any]) -> tuple[Any, ...]:
+    return UUID(str(record["advertiser_id"])), str(record["name"])
+
+
+def parse_mlscore(record: dict[str, Any]) -> tuple[Any, ...]:
+    score = int(record["score"])
+
+    if score < 0:
+        err = f"score must be non-negative, got {score}"
+        raise ValueError(err)
+
+    return (
+        UUID(str(record["advertiser_id"])),
+        UUID(str(record["client_id"])),
+        score,
+    )
+
+
+def warm_mlscores(rows: Iterable[tuple[Any, ...]]) -> None:
+    Mlscore.cache_scores(
+        (client_id, advertiser_id, score)
+        for advertiser_id, client_id, score in rows
+    )
+
+
+@dataclass(frozen=True)
+class Target:
+    model: type[models.Model]
+    fields: tuple[str, ...]
+    unique_fields: tuple[str, ...]
+    parse: Callable[[dict[str, Any]], tuple[Any, ...]]
+    warm_cache: Callable[[Iterable[tuple[Any, ...]]], None] | None = None
+
+    def column(self, field: str) -> str:
+        return connection.ops.quote_name(
+            self.model._meta.get_field(field).column  # noqa: SLF001
+        )
+
+    def columns(self, fields: Iterable[str]) -> str:
+        return ", ".join(self.column(field) for field in fields)
+
+    def to_python(self, row: Iterable[Any]) -> tuple[Any, ...]:
+        # Raw rows hold database values, UUIDs are plain strings on SQLite.
+        return tuple(
+            self.model._meta.get_field(field).to_python(value)  # noqa: SLF001
+            for field, value in zip(self.fields, row, strict=True)
+        )
+
+    def to_db(self, fields: Iterable[str], row: Iterable[Any]) -> list[Any]:
+        return [
+            self.model._meta.get_field(field).get_db_prep_value(  # noqa: SLF001
+                value, connection
+            )
+            for field, value in zip(fields, row, strict=True)
+        ]
+
+
+TARGETS = {
+    "clients": Target(
+        model=Client,
+        fields=("id", "login", "age", "location", "gender"),
+        unique_fields=("id",),
+        parse=parse_client,
+    ),
+    "advertisers": Target(
+        model=Advertiser,
+        fields=("id", "name"),
+        unique_fields=("id",),
+        parse=parse_advertiser,
+    ),
+    "mlscores": Target(
+        model=Mlscore,
+        fields=("advertiser", "client", "score"),
+        unique_fields=("advertiser", "client"),
+        parse=parse_mlscore,
+        warm_cache=warm_mlscores,
+    ),
+}
+
+
+def batched(
+    iterable: Iterable[tuple[Any, ...]], size: int
+) -> Iterator[list[tuple[Any, ...]]]:
+    iterator = iter(iterable)
+
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def open_text(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+
+    return path.open(encoding="utf-8", newline="")
+
+
+def read_csv(path: Path) -> Iterator[dict[str, Any]]:
+    with open_text(path) as file:
+        yield from csv.DictReader(file)
+
+
+def decode_json_items(
+    decoder: json.JSONDecoder, buffer: str, *, final: bool
+) -> Generator[Any, None, int | None]:
+    # Yields the array items decoded from the buffer, returns where the
+    # next item starts or None after the closing bracket.
+    position = 0
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if buffer[position : position + 1] == "]":
+            return None
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return position
+
+        # A number at the end of the buffer may go on in the next chunk.
+        if end == len(buffer) and not final:
+            return position
+
+        yield item
+        position = end
+
+
+def iter_json_array(file: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    # Only the items being decoded are buffered, not the whole array.
+    decoder = json.JSONDecoder()
+    chunks = iter(partial(file.read, chunk_size), "")
+    buffer = ""
+
+    for chunk in chunks:
+        buffer = (buffer + chunk).lstrip()
+        if buffer:
+            break
+
+    if not buffer.startswith("["):
+        err = "JSON file must contain an array of records."
+        raise ValueError(err)
+    buffer = buffer[1:]
+
+    offset = 1
+    for chunk in chunks:
+        position = yield from decode_json_items(
+            decoder, buffer + chunk, final=False
+        )
+        if position is None:
+            return
+        buffer = (buffer + chunk)[position:]
+        offset += position
+
+    try:
+        yield from decode_json_items(decoder, buffer, final=True)
+    except json.JSONDecodeError as e:
+        err = f"{e.msg} (char {offset + e.pos})"
+        raise ValueError(err) from None
+
+
+def read_json(path: Path) -> Iterator[dict[str, Any]]:
+    with open_text(path) as file:
+        yield from iter_json_array(file)
+
+
+def read_ndjson(path: Path) -> Iterator[dict[str, Any]]:
+    with open_text(path) as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+
+            try:
+                yield json.loads(line.rstrip())
+            except json.JSONDecodeError as e:
+                err = f"{e.msg} (line {number} column {e.colno})"
+                raise ValueError(err) from None
+
+
+def read_parquet(path: Path) -> Iterator[dict[str, Any]]:
+    try:
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError:
+        err = (
+            "Reading parquet files requires pyarrow, "
+            "install the bulk-load extra."
+        )
+        raise CommandError(err) from None
+
+    for batch in pq.ParquetFile(path).iter_batches():
+        yield from batch.to_pylist()
+
+
+READERS = {
+    "csv": read_csv,
+    "json": read_json,
+    "ndjson": read_ndjson,
+    "parquet": read_parquet,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load clients, advertisers or ML scores from CSV, JSON, NDJSON "
+        "or Parquet files. On PostgreSQL rows are streamed with COPY into a "
+        "staging table and merged into the target table, on other "
+        "databases chunked upserts are used. Related cache keys are bumped "
+        "and warmed once the load is committed."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("target", choices=TARGETS)
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--format",
+            choices=READERS,
+            help="Input format, detected from the file suffix by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50_000,
+            help="Rows per COPY/upsert batch.",
+        )
+        parser.add_argument(
+            "--no-warm-cache",
+            action="store_false",
+            dest="warm_cache",
+            help="Skip warming the related cache keys.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        target = TARGETS[options["target"]]
+        path: Path = options["path"]
+        batch_size: int = options["batch_size"]
+
+        if not path.is_file():
+            err = f"File {path} does not exist."
+            raise CommandError(err)
+        if batch_size <= 0:
+            err = "--batch-size must be positive."
+            raise CommandError(err)
+
+        input_format = options["format"] or FORMATS_BY_SUFFIX.get(
+            Path(path.stem).suffix if path.suffix == ".gz" else path.suffix
+        )
+        if input_format is None:
+            err = f"Can't detect format of {path}, pass --format."
+            raise CommandError(err)
+
+        self.started_at = time.perf_counter()
+        self.skipped = 0
+
+        rows = self.parse_records(target, READERS[input_format](path))
+        warm_cache = target.warm_cache if options["warm_cache"] else None
+
+        try:
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    loaded = self.load_with_copy(
+                        target, rows, batch_size, warm_cache
+                    )
+                else:
+                    loaded = self.load_with_upsert(
+                        target, rows, batch_size, warm_cache
+                    )
+        except DatabaseError as e:
+            raise CommandError(str(e)) from e
+        except ValueError as e:
+            err = f"Can't read {path}: {e}"
+            raise CommandError(err) from e
+
+        elapsed = time.perf_counter() - self.started_at
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {loaded} {options['target']} in {elapsed:.2f}s "
+                f"({self.rate(loaded)} rows/s), "
+                f"skipped {self.skipped} invalid records."
+            )
+        )
+
+    def parse_records(
+        self, target: Target, records: Iterable[dict[str, Any]]
+    ) -> Iterator[tuple[Any, ...]]:
+        for number, record in enumerate(records, 1):
+            row = self.parse_record(target, number, record)
+            if row is not None:
+                yield row
+
+    def parse_record(
+        self, target: Target, number: int, record: dict[str, Any]
+    ) -> tuple[Any, ...] | None:
+        try:
+            return target.parse(record)
+        except (KeyError, TypeError, ValueError) as e:
+            self.skipped += 1
+            if self.skipped <= MAX_REPORTED_ERRORS:
+                self.stderr.write(f"Skipping record {number}: {e!r}")
+
+        return None
+
+    def load_with_copy(
+        self,
+        target: Target,
+        rows: Iterable[tuple[Any, ...]],
+        batch_size: int,
+        warm_cache: Callable[[Iterable[tuple[Any, ...]]], None] | None,
+    ) -> int:
+        opts = target.model._meta  # noqa: SLF001
+        table = connection.ops.quote_name(opts.db_table)
+        staging = connection.ops.quote_name(f"{opts.db_table}_staging")
+        columns = target.columns(target.fields)
+        unique_columns = target.columns(target.unique_fields)
+        update_columns = ", ".join(
+            f"{target.column(field)} = EXCLUDED.{target.column(field)}"
+            for field in target.fields
+            if field not in target.unique_fields
+        )
+
+        insert_columns, select_columns = columns, columns
+        if opts.pk.name not in target.fields:
+            pk_column = connection.ops.quote_name(opts.pk.column)
+            insert_columns = f"{pk_column}, {columns}"
+            select_columns = f"gen_random_uuid(), {columns}"
+
+        staged = 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {staging} AS "  # noqa: S608
+                f"SELECT {columns} FROM {table} WITH NO DATA"
+            )
+            cursor.execute(f"ALTER TABLE {staging} ADD COLUMN seq BIGSERIAL")
+
+            for batch in batched(rows, batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+                staged += len(batch)
+                self.stdout.write(
+                    f"Staged {staged} rows ({self.rate(staged)} rows/s)"
+                )
+
+            cursor.execute(
+                f"INSERT INTO {table} ({insert_columns}) "  # noqa: S608
+                f"SELECT DISTINCT ON ({unique_columns}) {select_columns} "
+                f"FROM {staging} ORDER BY {unique_columns}, seq DESC "
+                f"ON CONFLICT ({unique_columns}) DO UPDATE "
+                f"SET {update_columns}"
+            )
+            loaded = cursor.rowcount
+            self.stdout.write(
+                f"Merged {loaded} rows into {opts.db_table} "
+                f"({self.rate(staged)} rows/s)"
+            )
+
+        # Readers must not see new versions or warmed values before the
+        # rows are committed. The staging table outlives the transaction
+        # for that and is dropped afterwards, a rollback drops it anyway.
+        transaction.on_commit(
+            partial(self.refresh_caches, target, batch_size, warm_cache)
+        )
+
+        return loaded
+
+    def refresh_caches(
+        self,
+        target: Target,
+        batch_size: int,
+        warm_cache: Callable[[Iterable[tuple[Any, ...]]], None] | None,
+        *,
+        bump: bool = True,
+    ) -> None:
+        opts = target.model._meta  # noqa: SLF001
+        table = connection.ops.quote_name(opts.db_table)
+        staging = connection.ops.quote_name(f"{opts.db_table}_staging")
+        columns = target.columns(target.fields)
+        unique_columns = target.columns(target.unique_fields)
+
+        try:
+            if bump and issubclass(target.model, VersionedModel):
+                with connection.chunked_cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT DISTINCT {unique_columns} FROM {staging}"  # noqa: S608
+                    )
+                    while batch := cursor.fetchmany(batch_size):
+                        bump_versions(
+                            target.model.get_version_cache_key(
+                                target.model._meta.pk.to_python(pk)  # noqa: SLF001
+                            )
+                            for (pk,) in batch
+                        )
+
+            if warm_cache:
+                with connection.chunked_cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT {columns} FROM {table} "  # noqa: S608
+                        f"WHERE ({unique_columns}) IN "
+                        f"(SELECT {unique_columns} FROM {staging})"
+                    )
+                    while batch := cursor.fetchmany(batch_size):
+                        warm_cache(target.to_python(row) for row in batch)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+
+    def load_with_upsert(
+        self,
+        target: Target,
+        rows: Iterable[tuple[Any, ...]],
+        batch_size: int,
+        warm_cache: Callable[[Iterable[tuple[Any, ...]]], None] | None,
+    ) -> int:
+        attnames = [
+            target.model._meta.get_field(field).attname  # noqa: SLF001
+            for field in target.fields
+        ]
+        loaded = 0
+
+        if warm_cache:
+            # Only the keys of loaded rows are staged, the values are read
+            # back once committed, as on PostgreSQL.
+            opts = target.model._meta  # noqa: SLF001
+            staging = connection.ops.quote_name(f"{opts.db_table}_staging")
+            unique_columns = target.columns(target.unique_fields)
+            placeholders = ", ".join(["%s"] * len(target.unique_fields))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {staging} AS "  # noqa: S608
+                    f"SELECT {unique_columns} FROM "
+                    f"{connection.ops.quote_name(opts.db_table)} WHERE 1 = 0"
+                )
+
+        for batch in batched(rows, batch_size):
+            latest = {
+                tuple(
+                    row[target.fields.index(field)]
+                    for field in target.unique_fields
+                ): row
+                for row in batch
+            }
+            target.model.objects.bulk_upsert(
+                [
+                    target.model(**dict(zip(attnames, row, strict=True)))
+                    for row in latest.values()
+                ],
+                unique_fields=target.unique_fields,
+                batch_size=batch_size,
+            )
+            if warm_cache:
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        f"INSERT INTO {staging} ({unique_columns}) "  # noqa: S608
+                        f"VALUES ({placeholders})",
+                        [
+                            target.to_db(target.unique_fields, key)
+                            for key in latest
+                        ],
+                    )
+
+            loaded += len(latest)
+            self.stdout.write(
+                f"Upserted {loaded} rows ({self.rate(loaded)} rows/s)"
+            )
+
+        if warm_cache:
+            # Versions are bumped by bulk_upsert.
+            transaction.on_commit(
+                partial(
+                    self.refresh_caches,
+                    target,
+                    batch_size,
+                    warm_cache,
+                    bump=False,
+                )
+            )
+
+        return loaded
+
+    def rate(self, rows: int) -> int:
+        elapsed = time.perf_counter() - self.started_at
+        return round(rows / elapsed) if elapsed > 0 else rows
@@ -1,10 +1,29 @@
+import time
+from collections.abc import Callable
+from itertools import islice
 from typing import Any
 
-from django.core.management.base import BaseCommand
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import models
 
 from apps.campaign.models import Campaign
+from apps.core.cache import get_redis_client
 from apps.mlscore.models import Mlscore
 
+CHECKPOINT_CACHE_KEY = "init_cache_checkpoint"
+
+
+def warm_campaigns(rows: list[tuple[Any, ...]]) -> None:
+    Campaign.setup_cache_many(campaign_id for (campaign_id,) in rows)
+
+
+def warm_mlscores(rows: list[tuple[Any, ...]]) -> None:
+    Mlscore.cache_scores(
+        (client_id, advertiser_id, score)
+        for _, client_id, advertiser_id, score in rows
+    )
+
 
 class Command(BaseCommand):
     help = (
@@ -12,24 +31,117 @@ class Command(BaseCommand):
         "impressions, clicks, and ML scores."
     )
 
-    def handle(self, *args: Any, **kwargs: Any) -> None:
-        for campaign in Campaign.objects.all():
-            campaign.setup_cache()
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="Rows fetched and written to the cache per round trip.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue from the checkpoint of an interrupted run.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self.chunk_size = options["chunk_size"]
+
+        stages: list[tuple[str, models.QuerySet, Callable]] = [
+            (
+                "campaigns",
+                Campaign.objects.values_list(Campaign.id.field.name),
+                warm_campaigns,
+            ),
+            (
+                "mlscores",
+                Mlscore.objects.values_list(
+                    Mlscore.id.field.name,
+                    Mlscore.client.field.attname,
+                    Mlscore.advertiser.field.attname,
+                    Mlscore.score.field.name,
+                ),
+                warm_mlscores,
+            ),
+        ]
+        stage_names = [name for name, _, _ in stages]
+
+        checkpoint = (
+            cache.get(CHECKPOINT_CACHE_KEY) if options["resume"] else None
+        )
+        if checkpoint is None or checkpoint["stage"] not in stage_names:
+            checkpoint = {"stage": stage_names[0], "last_id": None}
+        else:
             self.stdout.write(
-                self.style.SUCCESS(
-                    f"Initialized cache for Campaign {campaign.id}: "
-                    f"{campaign.impressions_count} impressions, "
-                    f"{campaign.clicks_count} clicks."
-                )
+                f"Resuming {checkpoint['stage']} "
+                f"after {checkpoint['last_id']}."
             )
 
-        for mlscore in Mlscore.objects.all():
-            mlscore.setup_cache()
+        for name, queryset, warm in stages[
+            stage_names.index(checkpoint["stage"]) :
+        ]:
+            last_id = (
+                checkpoint["last_id"] if name == checkpoint["stage"] else None
+            )
+            self.run_stage(name, queryset, warm, last_id)
+
+        cache.delete(CHECKPOINT_CACHE_KEY)
+
+        self.delete_legacy_mlscore_keys()
+
+    def run_stage(
+        self,
+        name: str,
+        queryset: models.QuerySet,
+        warm: Callable[[list[tuple[Any, ...]]], None],
+        last_id: Any,
+    ) -> None:
+        if last_id is not None:
+            queryset = queryset.filter(id__gt=last_id)
+
+        total = queryset.count()
+        rows = queryset.order_by("id").iterator(chunk_size=self.chunk_size)
+        started_at = time.perf_counter()
+        done = 0
+
+        while chunk := list(islice(rows, self.chunk_size)):
+            warm(chunk)
+            done += len(chunk)
+            cache.set(
+                CHECKPOINT_CACHE_KEY,
+                {"stage": name, "last_id": chunk[-1][0]},
+                timeout=None,
+            )
+
+            elapsed = time.perf_counter() - started_at
+            self.stdout.write(
+                f"{name}: {done}/{total} "
+                f"({round(done / elapsed) if elapsed else done} rows/s)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Initialized cache for {done} {name} "
+                f"in {time.perf_counter() - started_at:.2f}s."
+            )
+        )
+
+    def delete_legacy_mlscore_keys(self) -> None:
+        redis = get_redis_client()
+        if redis is None:
+            return
+
+        keys = redis.scan_iter(
+            match=cache.make_key("mlscore_*_*"), count=self.chunk_size
+        )
+        deleted = 0
+
+        while chunk := list(islice(keys, self.chunk_size)):
+            deleted += redis.unlink(*chunk)
+
+        if deleted:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"Initialized cache for MLscore: "
-                    f"Client {mlscore.client_id}, "
-                    f"Advertiser {mlscore.advertiser_id}, "
-                    f"Score {mlscore.score}."
+                    f"Deleted {deleted} legacy per-pair ML score keys."
                 )
             )
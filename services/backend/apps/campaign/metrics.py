@@ -0,0 +1,56 @@
+from collections.abc import Iterator
+
+from django.core.cache import cache
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    Metric,
+)
+from prometheus_client.registry import Collector
+
+from apps.campaign.tasks import COUNTER_RECONCILIATION_STATS_CACHE_KEY
+
+
+class CounterReconciliationCollector(Collector):
+    def describe(self) -> list[Metric]:
+        # Stats live in the cache, skip reading them on registration.
+        return []
+
+    def collect(self) -> Iterator[Metric]:
+        stats = cache.get(COUNTER_RECONCILIATION_STATS_CACHE_KEY)
+        if stats is None:
+            return
+
+        drifted = GaugeMetricFamily(
+            "adnova_campaign_counter_drifted_campaigns",
+            "Campaigns whose cached counter differed from the database "
+            "during the last reconciliation run.",
+            labels=["counter"],
+        )
+        drift = GaugeMetricFamily(
+            "adnova_campaign_counter_drift",
+            "Absolute difference between cached counters and database "
+            "counts found during the last reconciliation run.",
+            labels=["counter"],
+        )
+        for counter in ("impressions", "clicks"):
+            drifted.add_metric([counter], stats[counter]["drifted"])
+            drift.add_metric([counter], stats[counter]["drift"])
+
+        yield drifted
+        yield drift
+        yield GaugeMetricFamily(
+            "adnova_campaign_counter_checked_campaigns",
+            "Campaigns checked during the last reconciliation run.",
+            value=stats["checked"],
+        )
+        yield CounterMetricFamily(
+            "adnova_campaign_counter_repairs",
+            "Cached counters repaired by reconciliation.",
+            value=stats["repaired_total"],
+        )
+        yield GaugeMetricFamily(
+            "adnova_campaign_counter_reconciled_timestamp_seconds",
+            "Unix time the last reconciliation run finished.",
+            value=stats["finished_at"],
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertiser', '0001_initial'),
+        ('campaign', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['advertiser', '-end_date', '-id'], name='campaign_advertiser_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0002_campaign_advertiser_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='ad_image_variants',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-19 09:43
+
+import apps.campaign.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign', '0003_campaign_ad_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='campaign',
+            name='ad_image',
+            field=models.ImageField(blank=True, db_index=True, max_length=256, null=True, upload_to=apps.campaign.models.Campaign.ad_image_directory_path),
+        ),
+    ]
@@ -1,11 +1,15 @@
+import hashlib
 import random
+from collections.abc import Iterable
 from decimal import ROUND_HALF_UP, Decimal
 from logging import Logger
+from pathlib import PurePosixPath
 from typing import Any, Self
 from uuid import UUID
 
 from django.conf import settings
 from django.core.cache import cache
+from django.core.files import File
 from django.core.validators import (
     MaxValueValidator,
     MinLengthValidator,
@@ -24,13 +28,18 @@ from apps.campaign.validators import (
     CampaignTargetingLocationValidator,
 )
 from apps.client.models import Client
-from apps.core.models import BaseModel
+from apps.core.cache import (
+    bump_versions_on_commit,
+    compare_and_set_counters,
+)
+from apps.core.models import BaseModel, VersionedModel, advisory_lock
+from apps.mlscore.models import Mlscore
 from config.errors import ConflictError, ForbiddenError
 
 logger: Logger = settings.LOGGER
 
 
-class Campaign(BaseModel):
+class Campaign(VersionedModel):
     class GenderChoices(models.TextChoices):
         MALE = "MALE", "MALE"
         FEMALE = "FEMALE", "FEMALE"
@@ -55,8 +64,10 @@ class Campaign(BaseModel):
         max_length=256,
         blank=True,
         null=True,
+        db_index=True,
         upload_to=ad_image_directory_path,
     )
+    ad_image_variants = models.JSONField(default=list, blank=True)
     start_date = models.PositiveIntegerField(db_index=True)
     end_date = models.PositiveIntegerField(db_index=True)
 
@@ -93,6 +104,14 @@ class Campaign(BaseModel):
         "end_date",
     )
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("advertiser", "-end_date", "-id"),
+                name="campaign_advertiser_keyset_idx",
+            ),
+        )
+
     def __str__(self) -> str:
         return self.ad_title
 
@@ -112,26 +131,203 @@ class Campaign(BaseModel):
         if created:
             self.setup_cache()
 
+    def attach_ad_image(self, file: File) -> None:
+        # Images are stored by content hash and shared between campaigns,
+        # so reused creatives are uploaded and rendered only once.
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        name = (
+            f"ad_images/{digest.hexdigest()}"
+            f"{PurePosixPath(file.name).suffix.lower()}"
+        )
+
+        if name == self.ad_image.name:
+            return
+
+        previous_name, previous_variants = (
+            self.ad_image.name,
+            self.ad_image_variants,
+        )
+
+        # Releases of the same blob wait until the reference is committed,
+        # so they either see it or finish deleting the blob before it is
+        # checked here.
+        with advisory_lock(name):
+            shared = (
+                Campaign.objects.filter(ad_image=name)
+                .exclude(ad_image_variants=[])
+                .values_list(Campaign.ad_image_variants.field.name, flat=True)
+                .first()
+            )
+
+            self.ad_image = name
+            self.ad_image_variants = shared or []
+            self.save()
+
+            storage = Campaign.ad_image.field.storage
+            if not storage.exists(name):
+                saved_name = storage.save(name, file)
+                if saved_name != name:
+                    storage.delete(saved_name)
+
+        # Released after the lock above is gone, so two campaigns swapping
+        # images can't wait on each other.
+        Campaign.release_ad_image(previous_name, previous_variants, self.id)
+
+    def delete_ad_image(self, save: bool = True) -> None:
+        name, variants = self.ad_image.name, self.ad_image_variants
+
+        self.ad_image = None
+        self.ad_image_variants = []
+        if save:
+            self.save()
+
+        Campaign.release_ad_image(name, variants, self.id)
+
+    @staticmethod
+    def release_ad_image(
+        name: str | None, variants: list[dict[str, Any]], campaign_id: UUID
+    ) -> None:
+        if not name:
+            return
+
+        with advisory_lock(name):
+            if (
+                Campaign.objects.filter(ad_image=name)
+                .exclude(id=campaign_id)
+                .exists()
+            ):
+                return
+
+            storage = Campaign.ad_image.field.storage
+            for variant in variants:
+                storage.delete(variant["name"])
+            storage.delete(name)
+
+    def get_version_cache_keys(self) -> list[str]:
+        return [
+            *super().get_version_cache_keys(),
+            *self.get_stats_version_cache_keys(),
+            Advertiser.get_version_cache_key(self.advertiser_id, "campaigns"),
+        ]
+
+    def get_stats_version_cache_keys(self) -> list[str]:
+        return [
+            self.get_version_cache_key(self.id, "stats"),
+            Advertiser.get_version_cache_key(self.advertiser_id, "stats"),
+        ]
+
     def setup_cache(self) -> None:
-        cache.add(
-            f"campaign_{self.id}_impressions_count", self.impressions.count()
+        self.setup_cache_many([self.id])
+
+    @classmethod
+    def setup_cache_many(cls, campaign_ids: Iterable[UUID]) -> None:
+        campaign_ids = list(campaign_ids)
+        impressions, clicks = cls.get_counts_many(campaign_ids)
+
+        cache.set_many(
+            {
+                **{
+                    cls.get_impressions_cache_key(campaign_id): (
+                        impressions.get(campaign_id, 0)
+                    )
+                    for campaign_id in campaign_ids
+                },
+                **{
+                    cls.get_clicks_cache_key(campaign_id): clicks.get(
+                        campaign_id, 0
+                    )
+                    for campaign_id in campaign_ids
+                },
+            }
+        )
+
+    @classmethod
+    def reconcile_cache_many(
+        cls, campaign_ids: Iterable[UUID]
+    ) -> dict[str, Any]:
+        campaign_ids = list(campaign_ids)
+        keys = (cls.get_impressions_cache_key, cls.get_clicks_cache_key)
+        # The cache is read before the counts, so an increment landing
+        # after the cache read changes the cached value from the expected
+        # one and the compare-and-set skips that key instead of overwriting
+        # it. Rows are inserted before the increment, the next pass fixes
+        # a key whose increment was still in flight.
+        cached = cache.get_many(
+            [
+                get_key(campaign_id)
+                for get_key in keys
+                for campaign_id in campaign_ids
+            ]
+        )
+        impressions, clicks = cls.get_counts_many(campaign_ids)
+        counters = (
+            ("impressions", keys[0], impressions),
+            ("clicks", keys[1], clicks),
+        )
+
+        stats: dict[str, Any] = {}
+        expected: dict[str, int | None] = {}
+        values: dict[str, int] = {}
+
+        for counter, get_key, counts in counters:
+            drifted = drift = 0
+
+            for campaign_id in campaign_ids:
+                key = get_key(campaign_id)
+                count = counts.get(campaign_id, 0)
+
+                if cached.get(key) != count:
+                    expected[key] = cached.get(key)
+                    values[key] = count
+                    drifted += 1
+                    drift += abs(count - (cached.get(key) or 0))
+
+            stats[counter] = {"drifted": drifted, "drift": drift}
+
+        stats["checked"] = len(campaign_ids)
+        stats["repaired"] = compare_and_set_counters(expected, values)
+
+        return stats
+
+    @staticmethod
+    def get_counts_many(
+        campaign_ids: list[UUID],
+    ) -> tuple[dict[UUID, int], dict[UUID, int]]:
+        impressions = dict(
+            CampaignImpression.objects.filter(campaign_id__in=campaign_ids)
+            .values_list(CampaignImpression.campaign.field.attname)
+            .annotate(total=models.Count("id"))
+            .order_by()
         )
-        cache.add(f"campaign_{self.id}_clicks_count", self.clicks.count())
-        cache.set(
-            f"campaign_{self.id}_impressions_count", self.impressions.count()
+        clicks = dict(
+            CampaignClick.objects.filter(campaign_id__in=campaign_ids)
+            .values_list(CampaignClick.campaign.field.attname)
+            .annotate(total=models.Count("id"))
+            .order_by()
         )
-        cache.set(f"campaign_{self.id}_clicks_count", self.clicks.count())
+
+        return impressions, clicks
+
+    @staticmethod
+    def get_impressions_cache_key(campaign_id: UUID) -> str:
+        return f"campaign_{campaign_id}_impressions_count"
+
+    @staticmethod
+    def get_clicks_cache_key(campaign_id: UUID) -> str:
+        return f"campaign_{campaign_id}_clicks_count"
 
     def inc_views(self) -> None:
         try:
-            cache.incr(f"campaign_{self.id}_impressions_count", 1)
+            cache.incr(self.get_impressions_cache_key(self.id), 1)
         except ValueError:
             self.setup_cache()
             logger.warning("Seems that %s missing caches", self.campaign_id)
 
     def inc_clicks(self) -> None:
         try:
-            cache.incr(f"campaign_{self.id}_clicks_count", 1)
+            cache.incr(self.get_clicks_cache_key(self.id), 1)
         except ValueError:
             self.setup_cache()
             logger.warning("Seems that %s missing caches", self.campaign_id)
@@ -163,11 +359,11 @@ class Campaign(BaseModel):
 
     @property
     def impressions_count(self) -> int:
-        return cache.get(f"campaign_{self.id}_impressions_count", 0)
+        return cache.get(self.get_impressions_cache_key(self.id), 0)
 
     @property
     def clicks_count(self) -> int:
-        return cache.get(f"campaign_{self.id}_clicks_count", 0)
+        return cache.get(self.get_clicks_cache_key(self.id), 0)
 
     def view(self, client: Client) -> None:
         try:
@@ -178,6 +374,7 @@ class Campaign(BaseModel):
                 date=cache.get("current_date", default=0),
             )
             self.inc_views()
+            bump_versions_on_commit(self.get_stats_version_cache_keys())
         except ConflictError:
             pass
 
@@ -195,6 +392,7 @@ class Campaign(BaseModel):
                 date=cache.get("current_date", default=0),
             )
             self.inc_clicks()
+            bump_versions_on_commit(self.get_stats_version_cache_keys())
         except ConflictError:
             pass
 
@@ -331,6 +529,9 @@ class Campaign(BaseModel):
             return None
 
         campaign_ids = [c.id for c in campaigns]
+        ml_scores = Mlscore.get_cached_scores(
+            client.id, (c.advertiser_id for c in campaigns)
+        )
 
         client_impressions = CampaignImpression.objects.filter(
             client=client, campaign_id__in=campaign_ids
@@ -365,9 +566,7 @@ class Campaign(BaseModel):
                 if campaign_impressions_count >= impressions_limit:
                     continue
 
-            ml_score = cache.get(
-                f"mlscore_{client.id}_{campaign.advertiser_id}", 0
-            )
+            ml_score = ml_scores.get(campaign.advertiser_id, 0)
             ml_values.append(ml_score)
 
             if has_impression:
@@ -429,6 +628,7 @@ class Campaign(BaseModel):
                 Campaign.ad_title.field.name,
                 Campaign.ad_text.field.name,
                 Campaign.ad_image.field.name,
+                Campaign.ad_image_variants.field.name,
                 Campaign.cost_per_impression.field.name,
                 Campaign.cost_per_click.field.name,
             ).get(id=campaign.id)
@@ -0,0 +1,25 @@
+from functools import partial
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.campaign.models import Campaign
+
+
+@receiver(post_delete, sender=Campaign)
+def release_ad_image(
+    sender: type[Campaign], instance: Campaign, **kwargs: Any
+) -> None:
+    # Every delete path frees the image, cascades and queryset deletes
+    # included. Released once committed, so a rolled back delete keeps it.
+    if instance.ad_image:
+        transaction.on_commit(
+            partial(
+                Campaign.release_ad_image,
+                instance.ad_image.name,
+                instance.ad_image_variants,
+                instance.id,
+            )
+        )
@@ -1,38 +1,220 @@
-import contextlib
-from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import time
+from typing import Any
+from uuid import UUID, uuid4
 
-from celery import shared_task
+import celery.states
+from celery import Task, shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 
-from apps.campaign.models import CampaignReport
+from apps.campaign import events
+from apps.campaign.images import (
+    cleanup_ad_image_uploads,
+    finalize_ad_image_upload,
+    generate_ad_image_variants,
+)
+from apps.campaign.models import Campaign, CampaignReport
 from integrations.yandexai.generators.ad_text import YandexAIAdTextGenerator
 from integrations.yandexai.moderation import YandexAIModerator
 
+COUNTER_RECONCILIATION_LOCK_CACHE_KEY = "counter_reconciliation_lock"
+COUNTER_RECONCILIATION_CURSOR_CACHE_KEY = "counter_reconciliation_cursor"
+COUNTER_RECONCILIATION_STATS_CACHE_KEY = "counter_reconciliation_stats"
 
-@shared_task
-def generate_ad_text_task(advertiser_name: str, ad_title: str) -> str | None:
-    return YandexAIAdTextGenerator().generate_ad_text(
-        advertiser_name, ad_title
+
+def get_ad_text_generation_cache_key(
+    advertiser_name: str, ad_title: str
+) -> str:
+    prompt_hash = hashlib.sha256(
+        json.dumps([advertiser_name, ad_title]).encode()
+    ).hexdigest()
+    return f"ad_text_generation_{prompt_hash}"
+
+
+def enqueue_ad_text_generation(
+    advertiser_name: str, ad_title: str
+) -> tuple[str, dict[str, Any]]:
+    # Identical prompts share one task while it runs and its result for
+    # a while after, so repeated requests don't reach the model. Returns
+    # the task ID with its current meta.
+    cache_key = get_ad_text_generation_cache_key(advertiser_name, ad_title)
+    task_id = str(uuid4())
+
+    if not cache.add(
+        cache_key, task_id, timeout=settings.AD_TEXT_GENERATION_CACHE_TIMEOUT
+    ):
+        existing_task_id = cache.get(cache_key)
+        if existing_task_id is not None:
+            meta = events.get_task_meta(existing_task_id)
+            if meta["status"] not in celery.states.PROPAGATE_STATES:
+                return existing_task_id, meta
+
+        cache.set(
+            cache_key,
+            task_id,
+            timeout=settings.AD_TEXT_GENERATION_CACHE_TIMEOUT,
+        )
+
+    try:
+        generate_ad_text_task.apply_async(
+            (advertiser_name, ad_title), task_id=task_id
+        )
+    except Exception:
+        cache.delete(cache_key)
+        raise
+
+    return task_id, {"status": celery.states.PENDING, "result": None}
+
+
+@shared_task(bind=True)
+def generate_ad_text_task(
+    self: Task, advertiser_name: str, ad_title: str
+) -> str | None:
+    ad_text = YandexAIAdTextGenerator().generate_ad_text(
+        advertiser_name,
+        ad_title,
+        on_partial=lambda text: events.publish_partial(self.request.id, text),
     )
 
+    # Failed generations are retried by the next request.
+    if ad_text is None:
+        cache.delete(
+            get_ad_text_generation_cache_key(advertiser_name, ad_title)
+        )
+
+    return ad_text
+
 
 @shared_task(ignore_result=True)
-def moderate_campaign_task(
-    report_id: int, ad_title: str, ad_text: str
-) -> None:
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        future_text = executor.submit(
-            YandexAIModerator().get_moderation_verdict, ad_text
-        )
-        future_title = executor.submit(
-            YandexAIModerator().get_moderation_verdict, ad_title
+def process_ad_image_task(image_name: str) -> None:
+    generate_ad_image_variants(image_name)
+
+
+@shared_task(ignore_result=True)
+def finalize_ad_image_upload_task(campaign_id: str, object_key: str) -> None:
+    finalize_ad_image_upload(campaign_id, object_key)
+
+
+@shared_task(ignore_result=True)
+def cleanup_ad_image_uploads_task() -> None:
+    cleanup_ad_image_uploads()
+
+
+def get_moderation_scheduled_cache_key(campaign_id: UUID | str) -> str:
+    return f"moderation_scheduled_{campaign_id}"
+
+
+def schedule_campaign_moderation(campaign_id: UUID) -> None:
+    # Reports within the debounce window share one moderation run. The
+    # marker outlives the window, so a backed up queue doesn't get
+    # duplicates, and expires eventually if the task is lost.
+    cache_key = get_moderation_scheduled_cache_key(campaign_id)
+    if not cache.add(
+        cache_key, 1, timeout=settings.MODERATION_DEBOUNCE_SECONDS * 10
+    ):
+        return
+
+    try:
+        moderate_campaign_reports_task.apply_async(
+            (str(campaign_id),), countdown=settings.MODERATION_DEBOUNCE_SECONDS
         )
+    except Exception:
+        cache.delete(cache_key)
+        raise
+
+
+@shared_task(ignore_result=True)
+def moderate_campaign_reports_task(campaign_id: str) -> None:
+    # Reports submitted from now on schedule the next run.
+    cache.delete(get_moderation_scheduled_cache_key(campaign_id))
+
+    campaign = (
+        Campaign.objects.filter(id=campaign_id)
+        .only(Campaign.ad_title.field.name, Campaign.ad_text.field.name)
+        .first()
+    )
+    if campaign is None:
+        return
+
+    # Celery closes connections after every task, but the llm worker runs
+    # a hundred threads and the LLM call is slow. Don't hold a connection
+    # through it, the update below opens a new one.
+    if not connection.in_atomic_block:
+        connection.close()
+
+    verdicts = YandexAIModerator().get_moderation_verdicts(
+        [campaign.ad_title, campaign.ad_text]
+    )
+
+    if not any(verdicts) and None in verdicts:
+        # The LLM is unavailable, reports stay pending until a later run
+        # gets every verdict.
+        schedule_campaign_moderation(campaign.id)
+        return
+
+    CampaignReport.objects.filter(
+        campaign_id=campaign_id, flagged_by_llm__isnull=True
+    ).update(flagged_by_llm=any(verdicts))
+
+
+@shared_task(ignore_result=True)
+def reconcile_campaign_counters_task() -> None:
+    if not cache.add(
+        COUNTER_RECONCILIATION_LOCK_CACHE_KEY,
+        1,
+        timeout=settings.COUNTER_RECONCILIATION_INTERVAL * 5,
+    ):
+        return
 
-        ad_text_verdict = future_text.result()
-        ad_title_verdict = future_title.result()
+    try:
+        last_id = cache.get(COUNTER_RECONCILIATION_CURSOR_CACHE_KEY)
+        queryset = Campaign.objects.order_by("id").values_list("id", flat=True)
+        stats = {
+            "impressions": {"drifted": 0, "drift": 0},
+            "clicks": {"drifted": 0, "drift": 0},
+            "checked": 0,
+            "repaired": 0,
+        }
 
-    overall_verdict = ad_title_verdict or ad_text_verdict
+        for _ in range(settings.COUNTER_RECONCILIATION_MAX_CHUNKS):
+            campaign_ids = list(
+                (
+                    queryset.filter(id__gt=last_id)
+                    if last_id is not None
+                    else queryset
+                )[: settings.COUNTER_RECONCILIATION_CHUNK_SIZE]
+            )
+            if not campaign_ids:
+                last_id = None
+                break
 
-    with contextlib.suppress(CampaignReport.DoesNotExist):
-        report = CampaignReport.objects.get(id=report_id)
-        report.flagged_by_llm = overall_verdict
-        report.save()
+            chunk_stats = Campaign.reconcile_cache_many(campaign_ids)
+            for counter in ("impressions", "clicks"):
+                for field in ("drifted", "drift"):
+                    stats[counter][field] += chunk_stats[counter][field]
+            stats["checked"] += chunk_stats["checked"]
+            stats["repaired"] += chunk_stats["repaired"]
+
+            last_id = campaign_ids[-1]
+            if len(campaign_ids) < settings.COUNTER_RECONCILIATION_CHUNK_SIZE:
+                last_id = None
+                break
+
+        previous = cache.get(COUNTER_RECONCILIATION_STATS_CACHE_KEY) or {}
+        stats["repaired_total"] = (
+            previous.get("repaired_total", 0) + stats["repaired"]
+        )
+        stats["finished_at"] = time.time()
+
+        cache.set_many(
+            {
+                COUNTER_RECONCILIATION_CURSOR_CACHE_KEY: last_id,
+                COUNTER_RECONCILIATION_STATS_CACHE_KEY: stats,
+            },
+            timeout=None,
+        )
+    finally:
+        cache.delete(COUNTER_RECONCILIATION_LOCK_CACHE_KEY)
@@ -0,0 +1,250 @@
+import datetime as dt
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from api.v1.ads.schemas import Advertisment
+from apps.advertiser.models import Advertiser
+from apps.campaign import images
+from apps.campaign.models import Campaign
+from apps.campaign.tasks import (
+    cleanup_ad_image_uploads_task,
+    finalize_ad_image_upload_task,
+    process_ad_image_task,
+)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    },
+    AD_IMAGE_VARIANT_SIZES=((300, 250), (728, 90), (1000, 1000)),
+    AD_IMAGE_VARIANT_FORMATS=("webp",),
+)
+class AdImageVariantsTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        # A fresh in-memory storage for every test.
+        storages = override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.InMemoryStorage",
+                },
+            }
+        )
+        storages.enable()
+        self.addCleanup(storages.disable)
+        self.advertiser = Advertiser.objects.create(name="Advertiser")
+        self.campaign = self.create_campaign()
+        self.storage = Campaign.ad_image.field.storage
+
+    def create_campaign(self) -> Campaign:
+        return Campaign.objects.create(
+            advertiser=self.advertiser,
+            impressions_limit=10,
+            clicks_limit=5,
+            cost_per_impression=1,
+            cost_per_click=2,
+            ad_title="Title",
+            ad_text="Text",
+            start_date=0,
+            end_date=10,
+        )
+
+    def render(
+        self, size: tuple[int, int] = (600, 400), color: str = "red"
+    ) -> bytes:
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "Camera"
+        Image.new("RGB", size, color).save(buffer, format="JPEG", exif=exif)
+
+        return buffer.getvalue()
+
+    def upload(
+        self,
+        campaign: Campaign | None = None,
+        size: tuple[int, int] = (600, 400),
+        color: str = "red",
+    ) -> str:
+        campaign = campaign or self.campaign
+        campaign.attach_ad_image(
+            ContentFile(self.render(size, color), name="ad.JPG")
+        )
+
+        return campaign.ad_image.name
+
+    def process(self, image_name: str) -> None:
+        process_ad_image_task(image_name)
+        self.campaign.refresh_from_db()
+
+    def test_generates_variants(self) -> None:
+        image_name = self.upload()
+
+        self.process(image_name)
+
+        self.assertEqual(
+            [
+                (variant["size"], variant["width"], variant["height"])
+                for variant in self.campaign.ad_image_variants
+            ],
+            [
+                ("300x250", 300, 200),
+                ("728x90", 135, 90),
+                ("1000x1000", 600, 400),
+            ],
+        )
+        for variant in self.campaign.ad_image_variants:
+            self.assertTrue(variant["name"].startswith("ad_images/variants/"))
+            with (
+                self.storage.open(variant["name"]) as file,
+                Image.open(file) as image,
+            ):
+                self.assertEqual(image.format, "WEBP")
+                self.assertNotIn("exif", image.info)
+
+    def test_small_image_is_not_upscaled(self) -> None:
+        image_name = self.upload(size=(100, 100))
+
+        self.process(image_name)
+
+        self.assertEqual(len(self.campaign.ad_image_variants), 2)
+
+    def test_replaced_image_drops_variants(self) -> None:
+        image_name = self.upload()
+        self.upload(color="blue")
+
+        self.process(image_name)
+
+        self.assertEqual(self.campaign.ad_image_variants, [])
+        self.assertFalse(self.storage.exists(image_name))
+        self.assertFalse(self.storage.exists("ad_images/variants"))
+
+    def test_delete_ad_image_deletes_variants(self) -> None:
+        self.process(self.upload())
+        names = [
+            variant["name"] for variant in self.campaign.ad_image_variants
+        ]
+
+        self.campaign.delete_ad_image()
+        self.campaign.refresh_from_db()
+
+        self.assertFalse(self.campaign.ad_image)
+        self.assertEqual(self.campaign.ad_image_variants, [])
+        for name in names:
+            self.assertFalse(self.storage.exists(name))
+
+    def test_advertisment_exposes_variant_urls(self) -> None:
+        self.process(self.upload())
+
+        variants = Advertisment.from_orm(self.campaign).ad_image_variants
+
+        self.assertEqual(len(variants), 3)
+        self.assertEqual(
+            variants[0].url,
+            self.storage.url(self.campaign.ad_image_variants[0]["name"]),
+        )
+
+    def test_same_content_is_stored_once(self) -> None:
+        image_name = self.upload()
+        self.process(image_name)
+        other = self.create_campaign()
+
+        self.assertEqual(self.upload(other), image_name)
+        self.assertTrue(image_name.startswith("ad_images/"))
+        self.assertTrue(image_name.endswith(".jpg"))
+        self.assertEqual(len(self.storage.listdir("ad_images")[1]), 1)
+        self.assertEqual(
+            other.ad_image_variants, self.campaign.ad_image_variants
+        )
+
+    def test_shared_image_is_deleted_with_last_reference(self) -> None:
+        image_name = self.upload()
+        self.process(image_name)
+        other = self.create_campaign()
+        self.upload(other)
+
+        self.campaign.delete_ad_image()
+
+        self.assertTrue(self.storage.exists(image_name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+
+        self.assertFalse(self.storage.exists(image_name))
+        self.assertEqual(self.storage.listdir("ad_images/variants"), ([], []))
+
+    def test_cascade_delete_releases_image(self) -> None:
+        image_name = self.upload()
+        self.process(image_name)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.advertiser.delete()
+
+        self.assertTrue(self.storage.exists(image_name))
+
+        for callback in callbacks:
+            callback()
+
+        self.assertFalse(self.storage.exists(image_name))
+        self.assertEqual(self.storage.listdir("ad_images/variants"), ([], []))
+
+    def test_finalize_upload(self) -> None:
+        object_key = f"uploads/{self.campaign.id}/upload.jpg"
+        self.storage.save(object_key, ContentFile(self.render()))
+
+        finalize_ad_image_upload_task(str(self.campaign.id), object_key)
+        self.campaign.refresh_from_db()
+
+        self.assertTrue(self.campaign.ad_image.name.startswith("ad_images/"))
+        self.assertTrue(self.storage.exists(self.campaign.ad_image.name))
+        self.assertEqual(len(self.campaign.ad_image_variants), 3)
+        self.assertFalse(self.storage.exists(object_key))
+
+    def test_finalize_invalid_upload(self) -> None:
+        object_key = f"uploads/{self.campaign.id}/upload.jpg"
+        self.storage.save(object_key, ContentFile(b"not an image"))
+
+        finalize_ad_image_upload_task(str(self.campaign.id), object_key)
+        self.campaign.refresh_from_db()
+
+        self.assertFalse(self.campaign.ad_image)
+        self.assertFalse(self.storage.exists(object_key))
+
+    @override_settings(AD_IMAGE_UPLOAD_URL_EXPIRES=900)
+    def test_cleanup_abandoned_uploads(self) -> None:
+        object_key = f"uploads/{self.campaign.id}/upload.jpg"
+        self.storage.save(object_key, ContentFile(self.render()))
+
+        cleanup_ad_image_uploads_task()
+
+        self.assertTrue(self.storage.exists(object_key))
+
+        later = images.timezone.now() + dt.timedelta(seconds=1801)
+        with mock.patch.object(images.timezone, "now", return_value=later):
+            cleanup_ad_image_uploads_task()
+
+        self.assertFalse(self.storage.exists(object_key))
+
+    @override_settings(
+        MINIO_STORAGE_MEDIA_URL="https://media.example.com/adnova-media",
+        MINIO_STORAGE_MEDIA_BUCKET_NAME="adnova-media",
+        MINIO_STORAGE_ACCESS_KEY="access",
+        MINIO_STORAGE_SECRET_KEY="secret",  # noqa: S106
+    )
+    def test_upload_url_is_signed_for_public_endpoint(self) -> None:
+        with mock.patch.object(self.storage, "client", create=True):
+            url = images.get_upload_url("uploads/upload.jpg")
+
+        self.assertTrue(
+            url.startswith(
+                "https://media.example.com/adnova-media/uploads/upload.jpg?"
+            )
+        )
+        self.assertIn("X-Amz-Signature=", url)
@@ -0,0 +1,139 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from apps.advertiser.models import Advertiser
+from apps.campaign.management.commands import bulk_load
+from apps.client.models import Client
+from apps.mlscore.models import Mlscore
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class BulkLoadCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def call(self, *args: str) -> str:
+        stdout = StringIO()
+        call_command("bulk_load", *args, stdout=stdout, stderr=StringIO())
+        return stdout.getvalue()
+
+    def test_load_clients_from_csv(self) -> None:
+        client_id = uuid4()
+        source = self.path / "clients.csv"
+        source.write_text(
+            "client_id,login,age,location,gender\n"
+            f"{client_id},first,20,City,MALE\n"
+            f"{uuid4()},invalid,200,City,MALE\n"
+            f"{client_id},last,21,City,FEMALE\n"
+        )
+
+        output = self.call("clients", str(source))
+
+        self.assertIn("skipped 1 invalid records", output)
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertEqual(Client.objects.get(id=client_id).login, "last")
+
+    def test_load_mlscores_from_ndjson_warms_cache(self) -> None:
+        advertiser = Advertiser.objects.create(name="Advertiser")
+        client = Client.objects.create(
+            login="client", age=20, location="City", gender="MALE"
+        )
+        Mlscore.objects.create(advertiser=advertiser, client=client, score=1)
+        cache.clear()
+        source = self.path / "scores.ndjson"
+        source.write_text(
+            json.dumps(
+                {
+                    "client_id": str(client.id),
+                    "advertiser_id": str(advertiser.id),
+                    "score": 42,
+                }
+            )
+        )
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.call("mlscores", str(source))
+
+        self.assertEqual(
+            Mlscore.get_cached_scores(client.id, [advertiser.id]), {}
+        )
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(Mlscore.objects.get().score, 42)
+        self.assertEqual(
+            Mlscore.get_cached_scores(client.id, [advertiser.id]),
+            {advertiser.id: 42},
+        )
+
+    def test_load_advertisers_from_json(self) -> None:
+        advertiser_id = uuid4()
+        source = self.path / "advertisers.json"
+        source.write_text(
+            json.dumps([{"advertiser_id": str(advertiser_id), "name": "New"}])
+        )
+
+        self.call("advertisers", str(source))
+
+        self.assertEqual(Advertiser.objects.get(id=advertiser_id).name, "New")
+
+    def test_load_json_in_small_reads(self) -> None:
+        advertisers = [
+            {"advertiser_id": str(uuid4()), "name": f"Advertiser {index}"}
+            for index in range(20)
+        ]
+        source = self.path / "advertisers.json"
+        source.write_text(json.dumps(advertisers, indent=2))
+
+        with source.open() as file:
+            records = list(bulk_load.iter_json_array(file, chunk_size=7))
+
+        self.assertEqual(records, advertisers)
+
+    def test_load_truncated_json(self) -> None:
+        source = self.path / "advertisers.json"
+        source.write_text('[{"name": "First"}, {"advertiser_id": "')
+
+        with self.assertRaisesMessage(
+            CommandError, "Unterminated string starting at (char 38)"
+        ):
+            self.call("advertisers", str(source))
+
+    def test_load_malformed_ndjson(self) -> None:
+        source = self.path / "advertisers.ndjson"
+        source.write_text('{"name": "First"}\n\n{"name": \n')
+
+        with self.assertRaisesMessage(
+            CommandError, "Expecting value (line 3 column 9)"
+        ):
+            self.call("advertisers", str(source))
+
+    def test_unknown_format(self) -> None:
+        source = self.path / "clients.txt"
+        source.write_text("")
+
+        with self.assertRaises(CommandError):
+            self.call("clients", str(source))
+
+    def test_missing_file(self) -> None:
+        with self.assertRaises(CommandError):
+            self.call("clients", str(self.path / "missing.csv"))
@@ -0,0 +1,225 @@
+from http import HTTPStatus as status
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.advertiser.models import Advertiser
+from apps.campaign.models import Campaign, CampaignImpression, CampaignReport
+from apps.campaign.tasks import moderate_campaign_reports_task
+from apps.client.models import Client
+from integrations.yandexai.moderation import (
+    MODERATION_PROMPT_VERSION,
+    YandexAIModerator,
+    get_verdict_cache_key,
+)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    },
+    MODERATION_PREFILTER_ENABLED=False,
+)
+class CampaignModerationTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.campaign = Campaign.objects.create(
+            advertiser=Advertiser.objects.create(name="Advertiser"),
+            impressions_limit=10,
+            clicks_limit=5,
+            cost_per_impression=1,
+            cost_per_click=2,
+            ad_title="Title",
+            ad_text="Text",
+            start_date=0,
+            end_date=10,
+        )
+        self.clients = [
+            Client.objects.create(
+                login=f"client{i}", age=20, location="City", gender="MALE"
+            )
+            for i in range(3)
+        ]
+        CampaignImpression.objects.bulk_create(
+            CampaignImpression(
+                campaign=self.campaign, client=client, price=1, date=0
+            )
+            for client in self.clients
+        )
+        patcher = mock.patch.object(
+            YandexAIModerator,
+            "arequest_moderation_verdict",
+            new=mock.AsyncMock(side_effect=lambda text: text == "Bad"),
+        )
+        self.request_verdict = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit_report(self, client: Client) -> CampaignReport:
+        response = self.client.post(
+            f"/report/{self.campaign.id}",
+            data={"client_id": str(client.id), "message": "spam"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, status.OK)
+
+        return CampaignReport.objects.get(
+            campaign=self.campaign, client=client
+        )
+
+    def test_verdict_cache_key(self) -> None:
+        self.assertIn(MODERATION_PROMPT_VERSION, get_verdict_cache_key("a"))
+        self.assertNotEqual(
+            get_verdict_cache_key("a"), get_verdict_cache_key("b")
+        )
+
+    def test_verdict_is_cached(self) -> None:
+        moderator = YandexAIModerator()
+
+        self.assertTrue(moderator.get_moderation_verdict("Bad"))
+        self.assertTrue(moderator.get_moderation_verdict("Bad"))
+        self.assertFalse(moderator.get_moderation_verdict("Text"))
+
+        self.assertEqual(self.request_verdict.call_count, 2)
+
+    def test_verdicts_are_requested_once_per_text(self) -> None:
+        verdicts = YandexAIModerator().get_moderation_verdicts(
+            ["Text", "Bad", "Text"]
+        )
+
+        self.assertEqual(verdicts, [False, True, False])
+        self.assertEqual(self.request_verdict.call_count, 2)
+
+    def test_failed_verdict_is_not_cached(self) -> None:
+        self.request_verdict.side_effect = None
+        self.request_verdict.return_value = None
+
+        self.assertIsNone(YandexAIModerator().get_moderation_verdict("Text"))
+        self.assertIsNone(YandexAIModerator.get_cached_verdict(["Text"]))
+
+    def test_get_cached_verdict(self) -> None:
+        moderator = YandexAIModerator()
+        moderator.get_moderation_verdict("Text")
+
+        self.assertIsNone(
+            YandexAIModerator.get_cached_verdict(["Text", "Bad"])
+        )
+        self.assertFalse(YandexAIModerator.get_cached_verdict(["Text"]))
+
+        moderator.get_moderation_verdict("Bad")
+
+        self.assertTrue(YandexAIModerator.get_cached_verdict(["Text", "Bad"]))
+
+    @mock.patch.object(moderate_campaign_reports_task, "apply_async")
+    def test_reports_are_coalesced(self, apply_async: mock.MagicMock) -> None:
+        reports = [self.submit_report(client) for client in self.clients]
+
+        self.assertEqual(
+            [report.flagged_by_llm for report in reports], [None] * 3
+        )
+        apply_async.assert_called_once_with(
+            (str(self.campaign.id),), countdown=30
+        )
+
+        moderate_campaign_reports_task(str(self.campaign.id))
+
+        self.assertEqual(self.request_verdict.call_count, 2)
+        self.assertEqual(
+            list(
+                CampaignReport.objects.values_list("flagged_by_llm", flat=True)
+            ),
+            [False] * 3,
+        )
+
+    @mock.patch.object(moderate_campaign_reports_task, "apply_async")
+    def test_reports_stay_pending_while_llm_is_unavailable(
+        self, apply_async: mock.MagicMock
+    ) -> None:
+        report = self.submit_report(self.clients[0])
+        self.request_verdict.side_effect = None
+        self.request_verdict.return_value = None
+
+        moderate_campaign_reports_task(str(self.campaign.id))
+
+        report.refresh_from_db()
+        self.assertIsNone(report.flagged_by_llm)
+        self.assertEqual(apply_async.call_count, 2)
+
+        self.request_verdict.side_effect = lambda text: text == "Bad"
+        moderate_campaign_reports_task(str(self.campaign.id))
+
+        report.refresh_from_db()
+        self.assertFalse(report.flagged_by_llm)
+
+    @mock.patch("apps.campaign.tasks.connection", in_atomic_block=False)
+    @mock.patch.object(moderate_campaign_reports_task, "apply_async")
+    def test_connection_is_released_before_llm_call(
+        self, apply_async: mock.MagicMock, connection: mock.MagicMock
+    ) -> None:
+        report = self.submit_report(self.clients[0])
+        closed = []
+        self.request_verdict.side_effect = lambda text: bool(
+            closed.append(connection.close.called)
+        )
+
+        moderate_campaign_reports_task(str(self.campaign.id))
+
+        self.assertEqual(closed, [True, True])
+        report.refresh_from_db()
+        self.assertFalse(report.flagged_by_llm)
+
+    @mock.patch.object(moderate_campaign_reports_task, "apply_async")
+    def test_reports_after_run_are_scheduled_again(
+        self, apply_async: mock.MagicMock
+    ) -> None:
+        self.submit_report(self.clients[0])
+        moderate_campaign_reports_task(str(self.campaign.id))
+        cache.delete_many(
+            [get_verdict_cache_key("Title"), get_verdict_cache_key("Text")]
+        )
+
+        report = self.submit_report(self.clients[1])
+
+        self.assertIsNone(report.flagged_by_llm)
+        self.assertEqual(apply_async.call_count, 2)
+
+    @mock.patch.object(moderate_campaign_reports_task, "apply_async")
+    def test_report_on_moderated_campaign_resolves_instantly(
+        self, apply_async: mock.MagicMock
+    ) -> None:
+        moderate_campaign_reports_task(str(self.campaign.id))
+
+        report = self.submit_report(self.clients[0])
+
+        self.assertFalse(report.flagged_by_llm)
+        apply_async.assert_not_called()
+
+    @override_settings(MODERATION_PREFILTER_ENABLED=True)
+    def test_prefilter_skips_llm_for_obvious_texts(self) -> None:
+        verdicts = YandexAIModerator().get_moderation_verdicts(
+            ["Лучшие цены", "Это х у й н я", "Убить время"]
+        )
+
+        self.assertEqual(verdicts, [False, True, False])
+        self.assertEqual(
+            sorted(
+                call.args[0] for call in self.request_verdict.call_args_list
+            ),
+            ["Лучшие цены", "Убить время"],
+        )
+
+    @override_settings(MODERATION_PREFILTER_ENABLED=True)
+    @mock.patch.object(moderate_campaign_reports_task, "apply_async")
+    def test_report_on_profane_campaign_resolves_instantly(
+        self, apply_async: mock.MagicMock
+    ) -> None:
+        self.campaign.ad_text = "Купи, бля"
+        self.campaign.save()
+
+        report = self.submit_report(self.clients[0])
+
+        self.assertTrue(report.flagged_by_llm)
+        apply_async.assert_not_called()
+        self.request_verdict.assert_not_called()
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from prometheus_client import CollectorRegistry
+
+from apps.advertiser.models import Advertiser
+from apps.campaign.metrics import CounterReconciliationCollector
+from apps.campaign.models import Campaign, CampaignClick, CampaignImpression
+from apps.campaign.tasks import (
+    COUNTER_RECONCILIATION_CURSOR_CACHE_KEY,
+    COUNTER_RECONCILIATION_STATS_CACHE_KEY,
+    reconcile_campaign_counters_task,
+)
+from apps.client.models import Client
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    },
+    COUNTER_RECONCILIATION_CHUNK_SIZE=2,
+    COUNTER_RECONCILIATION_MAX_CHUNKS=1,
+)
+class CounterReconciliationTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        advertiser = Advertiser.objects.create(name="Advertiser")
+        client = Client.objects.create(
+            login="client", age=20, location="City", gender="MALE"
+        )
+        self.campaigns = sorted(
+            (
+                Campaign.objects.create(
+                    advertiser=advertiser,
+                    impressions_limit=10,
+                    clicks_limit=5,
+                    cost_per_impression=1,
+                    cost_per_click=2,
+                    ad_title=f"Campaign {i}",
+                    ad_text="Text",
+                    start_date=0,
+                    end_date=10,
+                )
+                for i in range(3)
+            ),
+            key=lambda campaign: campaign.id,
+        )
+        for model in (CampaignImpression, CampaignClick):
+            model.objects.create(
+                campaign=self.campaigns[0], client=client, price=1, date=0
+            )
+        Campaign.setup_cache_many(c.id for c in self.campaigns)
+
+    def test_reconcile_repairs_drift(self) -> None:
+        first = self.campaigns[0]
+        cache.set(Campaign.get_impressions_cache_key(first.id), 5)
+        cache.delete(Campaign.get_clicks_cache_key(first.id))
+
+        stats = Campaign.reconcile_cache_many(c.id for c in self.campaigns)
+
+        self.assertEqual(stats["impressions"], {"drifted": 1, "drift": 4})
+        self.assertEqual(stats["clicks"], {"drifted": 1, "drift": 1})
+        self.assertEqual(stats["checked"], 3)
+        self.assertEqual(stats["repaired"], 2)
+        self.assertEqual(first.impressions_count, 1)
+        self.assertEqual(first.clicks_count, 1)
+
+    def test_task_walks_campaigns_in_chunks(self) -> None:
+        last = self.campaigns[-1]
+        cache.set(Campaign.get_clicks_cache_key(last.id), 3)
+
+        reconcile_campaign_counters_task()
+
+        self.assertEqual(
+            cache.get(COUNTER_RECONCILIATION_CURSOR_CACHE_KEY),
+            self.campaigns[1].id,
+        )
+        self.assertEqual(last.clicks_count, 3)
+
+        reconcile_campaign_counters_task()
+
+        stats = cache.get(COUNTER_RECONCILIATION_STATS_CACHE_KEY)
+        self.assertIsNone(cache.get(COUNTER_RECONCILIATION_CURSOR_CACHE_KEY))
+        self.assertEqual(last.clicks_count, 0)
+        self.assertEqual(stats["checked"], 1)
+        self.assertEqual(stats["repaired_total"], 1)
+
+    def test_collector_exposes_stats(self) -> None:
+        registry = CollectorRegistry()
+        registry.register(CounterReconciliationCollector())
+
+        self.assertIsNone(
+            registry.get_sample_value("adnova_campaign_counter_repairs_total")
+        )
+
+        cache.set(Campaign.get_impressions_cache_key(self.campaigns[0].id), 0)
+        reconcile_campaign_counters_task()
+
+        self.assertEqual(
+            registry.get_sample_value("adnova_campaign_counter_repairs_total"),
+            1,
+        )
+        self.assertEqual(
+            registry.get_sample_value(
+                "adnova_campaign_counter_drifted_campaigns",
+                {"counter": "impressions"},
+            ),
+            1,
+        )
@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.advertiser.models import Advertiser
+from apps.campaign.management.commands.init_cache import (
+    CHECKPOINT_CACHE_KEY,
+)
+from apps.campaign.models import Campaign, CampaignClick, CampaignImpression
+from apps.client.models import Client
+from apps.mlscore.models import Mlscore
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class InitCacheCommandTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.advertiser = Advertiser.objects.create(name="Advertiser")
+        self.client_obj = Client.objects.create(
+            login="client", age=20, location="City", gender="MALE"
+        )
+        self.campaigns = [
+            Campaign.objects.create(
+                advertiser=self.advertiser,
+                impressions_limit=10,
+                clicks_limit=5,
+                cost_per_impression=1,
+                cost_per_click=2,
+                ad_title=f"Campaign {i}",
+                ad_text="Text",
+                start_date=0,
+                end_date=10,
+            )
+            for i in range(3)
+        ]
+        CampaignImpression.objects.create(
+            campaign=self.campaigns[0],
+            client=self.client_obj,
+            price=1,
+            date=0,
+        )
+        CampaignClick.objects.create(
+            campaign=self.campaigns[0],
+            client=self.client_obj,
+            price=2,
+            date=0,
+        )
+        Mlscore.objects.create(
+            advertiser=self.advertiser, client=self.client_obj, score=7
+        )
+        cache.clear()
+
+    def call(self, *args: str) -> str:
+        stdout = StringIO()
+        call_command("init_cache", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_init_cache(self) -> None:
+        self.call("--chunk-size", "2")
+
+        self.assertEqual(self.campaigns[0].impressions_count, 1)
+        self.assertEqual(self.campaigns[0].clicks_count, 1)
+        self.assertEqual(
+            cache.get(
+                Campaign.get_impressions_cache_key(self.campaigns[1].id)
+            ),
+            0,
+        )
+        self.assertEqual(
+            Mlscore.get_cached_scores(
+                self.client_obj.id, [self.advertiser.id]
+            ),
+            {self.advertiser.id: 7},
+        )
+        self.assertIsNone(cache.get(CHECKPOINT_CACHE_KEY))
+
+    def test_resume_skips_finished_rows(self) -> None:
+        first, *rest = sorted(self.campaigns, key=lambda c: c.id)
+        cache.set(
+            CHECKPOINT_CACHE_KEY, {"stage": "campaigns", "last_id": first.id}
+        )
+
+        output = self.call("--resume")
+
+        self.assertIn("Resuming campaigns", output)
+        self.assertIsNone(
+            cache.get(Campaign.get_impressions_cache_key(first.id))
+        )
+        for campaign in rest:
+            self.assertIsNotNone(
+                cache.get(Campaign.get_impressions_cache_key(campaign.id))
+            )
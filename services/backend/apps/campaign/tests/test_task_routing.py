@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from apps.campaign import tasks
+from config.celery import app
+
+
+class TaskRoutingTest(SimpleTestCase):
+    def route(self, name: str) -> tuple[str, int | None]:
+        options = app.amqp.router.route({}, name)
+        return options["queue"].name, options.get("priority")
+
+    def test_llm_tasks_are_isolated(self) -> None:
+        self.assertEqual(
+            self.route(tasks.generate_ad_text_task.name), ("llm", 0)
+        )
+        self.assertEqual(
+            self.route(tasks.moderate_campaign_reports_task.name), ("llm", 6)
+        )
+
+    def test_bookkeeping_tasks_use_default_queue(self) -> None:
+        self.assertEqual(
+            self.route(tasks.reconcile_campaign_counters_task.name),
+            ("default", 0),
+        )
+
+    def test_image_tasks_use_media_queue(self) -> None:
+        for task in (
+            tasks.process_ad_image_task,
+            tasks.finalize_ad_image_upload_task,
+            tasks.cleanup_ad_image_uploads_task,
+        ):
+            with self.subTest(task=task.name):
+                self.assertEqual(self.route(task.name)[0], "media")
+
+    def test_every_task_is_routed(self) -> None:
+        for name in app.tasks:
+            if name.startswith("apps."):
+                with self.subTest(name=name):
+                    self.assertIn(name, app.conf.task_routes)
@@ -3,10 +3,10 @@ from uuid import UUID
 from django.core.validators import MaxValueValidator
 from django.db import models
 
-from apps.core.models import BaseModel
+from apps.core.models import VersionedModel
 
 
-class Client(BaseModel):
+class Client(VersionedModel):
     class GenderChoices(models.TextChoices):
         MALE = "MALE", "MALE"
         FEMALE = "FEMALE", "FEMALE"
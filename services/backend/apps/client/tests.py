@@ -1,8 +1,15 @@
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from apps.client.models import Client
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class ClientModelTest(TestCase):
     def setUp(self):
         self.client = Client.objects.create(
@@ -9,5 +9,9 @@ class CoreConfig(AppConfig):
     label = "core"
 
     def ready(self) -> None:
+        from apps.core.health import register_health_checks  # noqa: PLC0415
+
+        register_health_checks()
+
         with contextlib.suppress(Exception):
             cache.add("current_date", 0, timeout=None)
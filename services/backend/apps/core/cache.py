@@ -0,0 +1,104 @@
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis import Redis
+
+COMPARE_AND_SET_SCRIPT = """
+local updated = 0
+for i, key in ipairs(KEYS) do
+    local current = redis.call("GET", key)
+    if (current or "") == ARGV[2 * i - 1] then
+        redis.call("SET", key, ARGV[2 * i])
+        updated = updated + 1
+    end
+end
+return updated
+"""
+
+BUMP_VERSIONS_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call("EXISTS", key) == 1 then
+        redis.call("INCR", key)
+    else
+        redis.call("SET", key, ARGV[1])
+    end
+end
+"""
+
+
+def get_redis_client(alias: str = "default") -> Redis | None:
+    try:
+        return get_redis_connection(alias)
+    except NotImplementedError:
+        return None
+
+
+def compare_and_set_counters(
+    expected: dict[str, int | None], values: dict[str, int]
+) -> int:
+    if not values:
+        return 0
+
+    redis = get_redis_client()
+
+    if redis is None:
+        current = cache.get_many(values.keys())
+        updated = {
+            key: value
+            for key, value in values.items()
+            if current.get(key) == expected.get(key)
+        }
+        cache.set_many(updated)
+        return len(updated)
+
+    args: list[Any] = []
+    for key, value in values.items():
+        old_value = expected.get(key)
+        args.extend(("" if old_value is None else str(old_value), value))
+
+    return redis.eval(
+        COMPARE_AND_SET_SCRIPT,
+        len(values),
+        *(cache.make_key(key) for key in values),
+        *args,
+    )
+
+
+def init_versions(keys: Iterable[str]) -> None:
+    # Versions start from the current time, so a version lost with the
+    # cache can't be issued again for a different object state.
+    for key in keys:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_versions(keys: Iterable[str]) -> None:
+    keys = list(keys)
+    if not keys:
+        return
+
+    redis = get_redis_client()
+
+    if redis is None:
+        for key in keys:
+            if not cache.add(key, time.time_ns(), timeout=None):
+                cache.incr(key)
+        return
+
+    redis.eval(
+        BUMP_VERSIONS_SCRIPT,
+        len(keys),
+        *(cache.make_key(key) for key in keys),
+        time.time_ns(),
+    )
+
+
+def bump_versions_on_commit(keys: Iterable[str]) -> None:
+    # A version bumped before the commit could be paired with the old data
+    # by a concurrent read and served as a strong ETag for stale content.
+    keys = list(keys)
+    if keys:
+        transaction.on_commit(lambda: bump_versions(keys))
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from health_check.backends import BaseHealthCheckBackend
+from health_check.contrib.celery.backends import CeleryHealthCheck
+from health_check.contrib.celery_ping import backends as celery_ping
+from health_check.exceptions import ServiceUnavailable, ServiceWarning
+from health_check.plugins import plugin_dir
+from health_check.storage import backends as storage
+
+
+class CachedHealthCheckMixin(BaseHealthCheckBackend):
+    # Checks of external dependencies run in a background thread at most
+    # once per refresh interval across all processes. Probes only read the
+    # last result from the cache, so they are cheap and never wait on the
+    # dependency.
+    def get_cache_key(self) -> str:
+        return f"health_check_{self.identifier()}"
+
+    def check_status(self) -> None:
+        cache_key = self.get_cache_key()
+
+        try:
+            state = cache.get(cache_key)
+            if (
+                state is None
+                or time.time() - state["checked_at"]
+                >= settings.HEALTH_CHECK_REFRESH_INTERVAL
+            ) and cache.add(
+                f"{cache_key}_refresh",
+                1,
+                timeout=settings.HEALTH_CHECK_REFRESH_INTERVAL,
+            ):
+                threading.Thread(
+                    target=type(self)().refresh,
+                    name=f"health-check-{self.identifier()}",
+                    daemon=True,
+                ).start()
+        except Exception as e:  # noqa: BLE001
+            self.add_error(ServiceUnavailable("Cached status unavailable"), e)
+            return
+
+        if state is None:
+            self.add_error(ServiceWarning("Not checked yet"))
+            return
+
+        for error_class, message in state["errors"]:
+            self.add_error(error_class(message))
+
+    def refresh(self) -> None:
+        try:
+            super().check_status()
+        except Exception as e:  # noqa: BLE001
+            self.add_error(ServiceUnavailable("Unknown error"), e)
+        finally:
+            connections.close_all()
+
+        cache.set(
+            self.get_cache_key(),
+            {
+                "errors": [
+                    (type(error), str(error.message)) for error in self.errors
+                ],
+                "checked_at": time.time(),
+            },
+            timeout=settings.HEALTH_CHECK_CACHE_TTL,
+        )
+
+
+class DefaultFileStorageHealthCheck(
+    CachedHealthCheckMixin, storage.DefaultFileStorageHealthCheck
+):
+    pass
+
+
+class CeleryPingHealthCheck(
+    CachedHealthCheckMixin, celery_ping.CeleryPingHealthCheck
+):
+    pass
+
+
+def register_health_checks() -> None:
+    from celery import current_app  # noqa: PLC0415
+
+    plugin_dir.register(DefaultFileStorageHealthCheck)
+    plugin_dir.register(CeleryPingHealthCheck)
+
+    # A round trip through every queue, each has its own workers.
+    queues = {
+        current_app.conf.task_default_queue,
+        *(route["queue"] for route in current_app.conf.task_routes.values()),
+    }
+    for queue in sorted(queues):
+        plugin_dir.register(
+            type(
+                f"CeleryHealthCheck{queue.title()}",
+                (CachedHealthCheckMixin, CeleryHealthCheck),
+                {"queue": queue},
+            )
+        )
@@ -0,0 +1,120 @@
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import RequestFactory
+from ninja.renderers import JSONRenderer
+from pydantic import TypeAdapter
+
+from api.v1.campaigns import schemas as campaign_schemas
+from api.v1.campaigns import utils as campaign_utils
+from api.v1.renderers import ORJSONRenderer
+from api.v1.stats import schemas as stats_schemas
+from apps.campaign.models import Campaign
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare CPU time per response of schema validation with the "
+        "default JSON renderer and plain dicts with the orjson renderer, "
+        "for campaign lists and daily statistics. Uses synthetic data."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--campaigns", type=int, default=1_000)
+        parser.add_argument("--days", type=int, default=1_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self.request = RequestFactory().get("/")
+        self.repeat = options["repeat"]
+
+        advertiser_id = uuid4()
+        campaigns = [
+            Campaign(
+                id=uuid4(),
+                advertiser_id=advertiser_id,
+                impressions_limit=random.randint(100, 1_000),
+                clicks_limit=random.randint(0, 100),
+                cost_per_impression=random.random(),
+                cost_per_click=random.random(),
+                ad_title=f"Campaign {i}",
+                ad_text="Text " * 50,
+                start_date=0,
+                end_date=random.randint(0, 100),
+                gender=random.choice([None, *Campaign.GenderChoices.values]),
+            )
+            for i in range(options["campaigns"])
+        ]
+        daily_stats = [
+            Campaign._calculate_metrics(  # noqa: SLF001
+                {"total": random.randint(1, 1_000), "spent": random.random()},
+                {"total": random.randint(0, 100), "spent": random.random()},
+            )
+            | {"date": day}
+            for day in range(options["days"])
+        ]
+
+        self.compare(
+            f"Campaign list ({len(campaigns)} items)",
+            lambda: self.render_validated(
+                list[campaign_schemas.CampaignOut],
+                [campaign_utils.normalize_campaign(c) for c in campaigns],
+            ),
+            lambda: ORJSONRenderer().render(
+                self.request,
+                [campaign_utils.campaign_to_dict(c) for c in campaigns],
+                response_status=200,
+            ),
+        )
+        self.compare(
+            f"Daily statistics ({len(daily_stats)} items)",
+            lambda: self.render_validated(
+                list[stats_schemas.DailyStat], daily_stats
+            ),
+            lambda: ORJSONRenderer().render(
+                self.request, daily_stats, response_status=200
+            ),
+        )
+
+    def render_validated(self, response_type: Any, data: Any) -> Any:
+        # Same steps as ninja's response handling: validate the result
+        # against the response schema, dump it and render with json.
+        adapter = TypeAdapter(response_type)
+        result = adapter.dump_python(
+            adapter.validate_python(data, from_attributes=True)
+        )
+        return JSONRenderer().render(self.request, result, response_status=200)
+
+    def compare(
+        self,
+        name: str,
+        default: Callable[[], Any],
+        fast: Callable[[], Any],
+    ) -> None:
+        default_time = self.measure(default)
+        fast_time = self.measure(fast)
+
+        self.stdout.write(name)
+        self.stdout.write(
+            f"  schema + json:  {default_time * 1000:.2f} ms CPU"
+        )
+        self.stdout.write(f"  dict + orjson:  {fast_time * 1000:.2f} ms CPU")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  {default_time / fast_time:.1f}x less CPU per response, "
+                f"{(default_time - fast_time) * 1000:.2f} ms saved."
+            )
+        )
+
+    def measure(self, render: Callable[[], Any]) -> float:
+        render()
+        started_at = time.process_time()
+
+        for _ in range(self.repeat):
+            render()
+
+        return (time.process_time() - started_at) / self.repeat
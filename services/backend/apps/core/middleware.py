@@ -0,0 +1,114 @@
+import gzip
+from collections.abc import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Ordered by preference. Levels favour speed, repetitive JSON compresses
+# well even at low levels.
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {}
+
+if zstandard is not None:
+    COMPRESSORS["zstd"] = lambda content: zstandard.compress(content, 3)
+
+if brotli is not None:
+    COMPRESSORS["br"] = lambda content: brotli.compress(content, quality=4)
+
+COMPRESSORS["gzip"] = lambda content: gzip.compress(
+    content, compresslevel=6, mtime=0
+)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    qualities = {}
+
+    for accepted in header.split(","):
+        coding, *params = (part.strip() for part in accepted.split(";"))
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        qualities[coding.lower()] = quality
+
+    return qualities
+
+
+def select_encoding(header: str) -> str | None:
+    qualities = parse_accept_encoding(header)
+    wildcard = qualities.get("*", 0.0)
+    selected, selected_quality = None, 0.0
+
+    for encoding in COMPRESSORS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > selected_quality:
+            selected, selected_quality = encoding, quality
+
+    return selected
+
+
+def get_min_size(path: str) -> int | None:
+    for prefix, min_size in sorted(
+        settings.COMPRESSION_ROUTES.items(),
+        key=lambda route: len(route[0]),
+        reverse=True,
+    ):
+        if path == prefix or path.startswith(f"{prefix.rstrip('/')}/"):
+            return min_size
+
+    return settings.COMPRESSION_MIN_SIZE
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        min_size = get_min_size(request.path_info)
+
+        if (
+            min_size is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < min_size
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = select_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        compressed = COMPRESSORS[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = encoding
+
+        # The body differs byte for byte from the uncompressed variant.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = f"W/{etag}"
+
+        return response
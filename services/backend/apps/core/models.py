@@ -1,15 +1,64 @@
 import uuid
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
 from typing import Any
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models, transaction
 
+from apps.core.cache import bump_versions_on_commit
 from config.errors import ConflictError
 
 
+@contextmanager
+def advisory_lock(key: str) -> Iterator[None]:
+    # Serializes transactions working on the same key until they commit.
+    # Other databases already serialize writers.
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+                    [key],
+                )
+        yield
+
+
+class BaseQuerySet(models.QuerySet):
+    def bulk_upsert(
+        self,
+        objs: Iterable[models.Model],
+        unique_fields: Sequence[str] = ("id",),
+        batch_size: int | None = None,
+    ) -> list[models.Model]:
+        update_fields = [
+            field.name
+            for field in self.model._meta.concrete_fields  # noqa: SLF001
+            if not field.primary_key and field.name not in unique_fields
+        ]
+
+        objs = self.bulk_create(
+            objs,
+            batch_size=batch_size or settings.BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+
+        if issubclass(self.model, VersionedModel):
+            bump_versions_on_commit(
+                key for obj in objs for key in obj.get_version_cache_keys()
+            )
+
+        return objs
+
+
 class BaseModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    objects = BaseQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
@@ -46,3 +95,36 @@ class BaseModel(models.Model):
                 self.validate_constraints()
             except ValidationError as e:
                 raise ConflictError(e) from None
+
+
+class VersionedModel(BaseModel):
+    class Meta:
+        abstract = True
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        super().save(*args, **kwargs)
+
+        bump_versions_on_commit(self.get_version_cache_keys())
+
+    def delete(self, *args: Any, **kwargs: Any) -> tuple[int, dict[str, int]]:
+        keys = self.get_version_cache_keys()
+        deleted = super().delete(*args, **kwargs)
+
+        bump_versions_on_commit(keys)
+
+        return deleted
+
+    @classmethod
+    def get_version_cache_key(
+        cls, object_id: Any, scope: str | None = None
+    ) -> str:
+        name = (
+            f"{cls._meta.model_name}_{scope}"
+            if scope
+            else cls._meta.model_name
+        )
+
+        return f"{name}_{object_id}_version"
+
+    def get_version_cache_keys(self) -> list[str]:
+        return [self.get_version_cache_key(self.pk)]
@@ -0,0 +1,170 @@
+import gzip
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from health_check.backends import BaseHealthCheckBackend
+from health_check.exceptions import ServiceUnavailable, ServiceWarning
+
+from apps.core import health, middleware
+from apps.core.health import CachedHealthCheckMixin
+from apps.core.models import advisory_lock
+from apps.core.middleware import CompressionMiddleware, select_encoding
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100, COMPRESSION_ROUTES={"/ads": None})
+class CompressionMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.content = b'{"impressions_count": 0, "clicks_count": 0}' * 50
+
+    def process(self, path, content, accept_encoding="gzip"):
+        request = self.factory.get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        response = HttpResponse(content, content_type="application/json")
+        response["ETag"] = '"etag"'
+
+        return CompressionMiddleware(lambda _: response)(request)
+
+    def test_compresses_large_response(self):
+        response = self.process("/stats/campaigns", self.content)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"etag"')
+        self.assertEqual(
+            response["Content-Length"], str(len(response.content))
+        )
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_skips_small_response(self):
+        response = self.process("/stats/campaigns", b"{}")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Vary"))
+
+    def test_skips_excluded_route(self):
+        for path in ("/ads", "/ads/campaign/click"):
+            with self.subTest(path=path):
+                response = self.process(path, self.content)
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+
+        response = self.process("/advertisers", self.content)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    @override_settings(COMPRESSION_ROUTES={"/stats": 10_000})
+    def test_route_min_size(self):
+        response = self.process("/stats/campaigns", self.content)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_skips_without_accepted_encoding(self):
+        for accept_encoding in ("", "identity", "gzip;q=0"):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.process(
+                    "/stats/campaigns", self.content, accept_encoding
+                )
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_select_encoding(self):
+        compressors = {"zstd": bytes, "br": bytes, "gzip": bytes}
+
+        with mock.patch.object(middleware, "COMPRESSORS", compressors):
+            self.assertEqual(
+                select_encoding("gzip, deflate, br, zstd"), "zstd"
+            )
+            self.assertEqual(select_encoding("gzip, br"), "br")
+            self.assertEqual(select_encoding("gzip, br;q=0.5"), "gzip")
+            self.assertEqual(select_encoding("*"), "zstd")
+            self.assertEqual(select_encoding("*, zstd;q=0"), "br")
+            self.assertIsNone(select_encoding("deflate"))
+
+
+class FailingHealthCheck(BaseHealthCheckBackend):
+    def check_status(self):
+        self.add_error(ServiceUnavailable("Down"))
+
+
+class CachedFailingHealthCheck(CachedHealthCheckMixin, FailingHealthCheck):
+    pass
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    },
+    HEALTH_CHECK_REFRESH_INTERVAL=30,
+    HEALTH_CHECK_CACHE_TTL=300,
+)
+class CachedHealthCheckTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(health.threading, "Thread")
+        self.thread = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def check(self):
+        health_check = CachedFailingHealthCheck()
+        health_check.check_status()
+
+        return health_check
+
+    def test_first_check_schedules_refresh(self):
+        health_check = self.check()
+
+        self.assertEqual(len(health_check.errors), 1)
+        self.assertIsInstance(health_check.errors[0], ServiceWarning)
+        self.thread.assert_called_once()
+        self.thread.return_value.start.assert_called_once()
+
+    def test_refresh_lock(self):
+        self.check()
+        self.check()
+
+        self.thread.assert_called_once()
+
+    def test_reports_cached_errors(self):
+        CachedFailingHealthCheck().refresh()
+
+        health_check = self.check()
+
+        self.assertEqual(len(health_check.errors), 1)
+        self.assertIsInstance(health_check.errors[0], ServiceUnavailable)
+        self.assertEqual(health_check.errors[0].message, "Down")
+        self.thread.assert_not_called()
+
+    def test_stale_state_schedules_refresh(self):
+        CachedFailingHealthCheck().refresh()
+
+        with mock.patch.object(
+            health.time, "time", return_value=time.time() + 60
+        ):
+            health_check = self.check()
+
+        self.assertEqual(len(health_check.errors), 1)
+        self.thread.assert_called_once()
+
+
+class AdvisoryLockTest(SimpleTestCase):
+    databases = {"default"}
+
+    def test_takes_transaction_lock_on_postgresql(self):
+        with (
+            mock.patch.object(connection, "vendor", "postgresql"),
+            mock.patch.object(connection, "cursor") as cursor,
+            advisory_lock("ad_images/image.png"),
+        ):
+            self.assertTrue(connection.in_atomic_block)
+
+        cursor.return_value.__enter__.return_value.execute.assert_called_once_with(
+            "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+            ["ad_images/image.png"],
+        )
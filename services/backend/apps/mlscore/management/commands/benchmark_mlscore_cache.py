@@ -0,0 +1,146 @@
+import random
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from redis.client import Pipeline
+
+from apps.core.cache import get_redis_client
+
+PIPELINE_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Redis memory usage and lookup latency of ML scores stored "
+        "as one key per (client, advertiser) pair and as one hash per "
+        "client. Uses synthetic data under a temporary key prefix."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--clients", type=int, default=10_000)
+        parser.add_argument("--advertisers", type=int, default=30)
+        parser.add_argument("--lookups", type=int, default=1_000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        redis = get_redis_client()
+        if redis is None:
+            err = "Default cache must be backed by Redis."
+            raise CommandError(err)
+
+        self.redis = redis
+        self.prefix = cache.make_key(f"mlscore_benchmark_{uuid4().hex}")
+        self.client_ids = [str(uuid4()) for _ in range(options["clients"])]
+        self.advertiser_ids = [
+            str(uuid4()) for _ in range(options["advertisers"])
+        ]
+        scores = options["clients"] * options["advertisers"]
+
+        try:
+            keys_memory = self.measure_memory(self.write_keys)
+            keys_latency = self.measure_latency(
+                self.read_keys, options["lookups"]
+            )
+            self.cleanup()
+
+            hashes_memory = self.measure_memory(self.write_hashes)
+            hashes_latency = self.measure_latency(
+                self.read_hashes, options["lookups"]
+            )
+            encoding = redis.object(
+                "encoding", f"{self.prefix}:hash:{self.client_ids[0]}"
+            )
+        finally:
+            self.cleanup()
+
+        self.report("Per-pair keys", keys_memory, keys_latency, scores)
+        self.report("Per-client hashes", hashes_memory, hashes_latency, scores)
+        self.stdout.write(f"Hash encoding: {encoding}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Hashes use {hashes_memory / max(keys_memory, 1):.1%} "
+                "of per-pair keys memory."
+            )
+        )
+
+    def write_keys(self, pipeline: Pipeline) -> Iterator[None]:
+        for client_id in self.client_ids:
+            for advertiser_id in self.advertiser_ids:
+                pipeline.set(
+                    f"{self.prefix}:key:{client_id}_{advertiser_id}",
+                    random.randint(0, 10_000),
+                )
+                yield
+
+    def write_hashes(self, pipeline: Pipeline) -> Iterator[None]:
+        for client_id in self.client_ids:
+            pipeline.hset(
+                f"{self.prefix}:hash:{client_id}",
+                mapping={
+                    advertiser_id: random.randint(0, 10_000)
+                    for advertiser_id in self.advertiser_ids
+                },
+            )
+            yield
+
+    def read_keys(self, client_id: str) -> None:
+        for advertiser_id in self.advertiser_ids:
+            self.redis.get(f"{self.prefix}:key:{client_id}_{advertiser_id}")
+
+    def read_hashes(self, client_id: str) -> None:
+        self.redis.hmget(
+            f"{self.prefix}:hash:{client_id}", self.advertiser_ids
+        )
+
+    def measure_memory(
+        self, write: Callable[[Pipeline], Iterator[None]]
+    ) -> int:
+        before = self.used_memory()
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for number, _ in enumerate(write(pipeline), 1):
+            if number % PIPELINE_SIZE == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        return self.used_memory() - before
+
+    def measure_latency(
+        self, read: Callable[[str], None], lookups: int
+    ) -> float:
+        started_at = time.perf_counter()
+
+        for _ in range(lookups):
+            read(random.choice(self.client_ids))
+
+        return (time.perf_counter() - started_at) / lookups
+
+    def used_memory(self) -> int:
+        return self.redis.info("memory")["used_memory"]
+
+    def cleanup(self) -> None:
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for number, key in enumerate(
+            self.redis.scan_iter(match=f"{self.prefix}:*", count=1000), 1
+        ):
+            pipeline.delete(key)
+            if number % PIPELINE_SIZE == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+    def report(
+        self, layout: str, memory: int, latency: float, scores: int
+    ) -> None:
+        self.stdout.write(
+            f"{layout}: {memory / 1024 / 1024:.2f} MiB, "
+            f"{memory / max(scores, 1):.1f} bytes/score, "
+            f"{latency * 1000:.3f} ms per client lookup"
+        )
@@ -1,10 +1,14 @@
-from typing import Any
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any, Self
+from uuid import UUID
 
 from django.core.cache import cache
 from django.db import models
 
 from apps.advertiser.models import Advertiser
 from apps.client.models import Client
+from apps.core.cache import get_redis_client
 from apps.core.models import BaseModel
 
 
@@ -30,8 +34,71 @@ class Mlscore(BaseModel):
         self.setup_cache()
 
     def setup_cache(self) -> None:
-        cache.add(f"mlscore_{self.client_id}_{self.advertiser_id}", self.score)
-        cache.set(f"mlscore_{self.client_id}_{self.advertiser_id}", self.score)
+        self.cache_scores([(self.client_id, self.advertiser_id, self.score)])
+
+    @classmethod
+    def setup_cache_many(cls, mlscores: Iterable[Self]) -> None:
+        cls.cache_scores(
+            (mlscore.client_id, mlscore.advertiser_id, mlscore.score)
+            for mlscore in mlscores
+        )
+
+    @staticmethod
+    def get_cache_key(client_id: UUID) -> str:
+        return f"mlscore_{client_id}"
+
+    @classmethod
+    def cache_scores(cls, scores: Iterable[tuple[UUID, UUID, int]]) -> None:
+        scores_by_client: dict[UUID, dict[str, int]] = defaultdict(dict)
+
+        for client_id, advertiser_id, score in scores:
+            scores_by_client[client_id][str(advertiser_id)] = score
+
+        if not scores_by_client:
+            return
+
+        redis = get_redis_client()
+
+        if redis is None:
+            for client_id, mapping in scores_by_client.items():
+                key = cls.get_cache_key(client_id)
+                cache.set(key, {**cache.get(key, {}), **mapping})
+            return
+
+        pipeline = redis.pipeline(transaction=False)
+        for client_id, mapping in scores_by_client.items():
+            pipeline.hset(
+                cache.make_key(cls.get_cache_key(client_id)), mapping=mapping
+            )
+        pipeline.execute()
+
+    @classmethod
+    def get_cached_scores(
+        cls, client_id: UUID, advertiser_ids: Iterable[UUID]
+    ) -> dict[UUID, int]:
+        advertiser_ids = list(dict.fromkeys(advertiser_ids))
+
+        if not advertiser_ids:
+            return {}
+
+        key = cls.get_cache_key(client_id)
+        redis = get_redis_client()
+
+        if redis is None:
+            scores = cache.get(key, {})
+            values = [scores.get(str(id_)) for id_ in advertiser_ids]
+        else:
+            values = redis.hmget(
+                cache.make_key(key), [str(id_) for id_ in advertiser_ids]
+            )
+
+        return {
+            advertiser_id: int(value)
+            for advertiser_id, value in zip(
+                advertiser_ids, values, strict=True
+            )
+            if value is not None
+        }
 
     class Meta:
         unique_together = (
@@ -6,6 +6,13 @@ from apps.client.models import Client
 from apps.mlscore.models import Mlscore
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
 class MlscoreModelTest(TestCase):
     def setUp(self):
         self.advertiser = Advertiser.objects.create(name="Test Advertiser")
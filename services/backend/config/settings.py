@@ -42,6 +42,64 @@ YANDEX_CLOUD_FOLDER_ID = env("YANDEX_CLOUD_FOLDER_ID", default=None)
 
 YANDEX_CLOUD_API_KEY = env("YANDEX_CLOUD_API_KEY", default=None)
 
+# Per process, requests from all worker threads share the limit. Every
+# call holds its worker thread until it returns, so the llm worker is
+# started with the same number of threads.
+YANDEX_CLOUD_MAX_CONCURRENCY = env(
+    "DJANGO_YANDEX_CLOUD_MAX_CONCURRENCY", int, default=100
+)
+
+# integrations.yandexai.backends.StubBackend answers offline after
+# DJANGO_YANDEX_CLOUD_STUB_LATENCY seconds.
+YANDEX_CLOUD_BACKEND = env(
+    "DJANGO_YANDEX_CLOUD_BACKEND",
+    default="integrations.yandexai.backends.YandexAIBackend",
+)
+
+YANDEX_CLOUD_STUB_LATENCY = env(
+    "DJANGO_YANDEX_CLOUD_STUB_LATENCY", float, default=0.0
+)
+
+YANDEX_CLOUD_TIMEOUT = env("DJANGO_YANDEX_CLOUD_TIMEOUT", float, default=30.0)
+
+YANDEX_CLOUD_BREAKER_FAILURE_THRESHOLD = env(
+    "DJANGO_YANDEX_CLOUD_BREAKER_FAILURE_THRESHOLD", int, default=5
+)
+
+YANDEX_CLOUD_BREAKER_FAILURE_WINDOW = env(
+    "DJANGO_YANDEX_CLOUD_BREAKER_FAILURE_WINDOW", int, default=60
+)
+
+YANDEX_CLOUD_BREAKER_RECOVERY_TIMEOUT = env(
+    "DJANGO_YANDEX_CLOUD_BREAKER_RECOVERY_TIMEOUT", int, default=30
+)
+
+MODERATION_DEBOUNCE_SECONDS = env(
+    "DJANGO_MODERATION_DEBOUNCE_SECONDS", int, default=30
+)
+
+MODERATION_PREFILTER_ENABLED = env(
+    "DJANGO_MODERATION_PREFILTER_ENABLED", default=True
+)
+
+MODERATION_VERDICT_CACHE_TIMEOUT = env(
+    "DJANGO_MODERATION_VERDICT_CACHE_TIMEOUT", int, default=30 * 24 * 60 * 60
+)
+
+AD_TEXT_GENERATION_CACHE_TIMEOUT = env(
+    "DJANGO_AD_TEXT_GENERATION_CACHE_TIMEOUT", int, default=10 * 60
+)
+
+AD_TEXT_RESULT_MAX_WAIT = env(
+    "DJANGO_AD_TEXT_RESULT_MAX_WAIT", int, default=30
+)
+
+# Per process. Every waiter holds a web server thread, keep it below the
+# number of threads so other requests are still served.
+AD_TEXT_RESULT_MAX_WAITERS = env(
+    "DJANGO_AD_TEXT_RESULT_MAX_WAITERS", int, default=8
+)
+
 YANDEX_CLOUD_INTEGRATION_ENABLED = (
     YANDEX_CLOUD_FOLDER_ID and YANDEX_CLOUD_API_KEY
 )
@@ -49,8 +107,22 @@ YANDEX_CLOUD_INTEGRATION_ENABLED = (
 
 # Register healthchecks
 
+# Storage and Celery checks are registered by apps.core with cached
+# results, like the YandexAI one.
 plugin_dir.register(YandexAIHealthCheck)
 
+HEALTH_CHECK = {
+    "DISABLE_THREADING": False,
+    # Cached checks warn until their first refresh completes.
+    "WARNINGS_AS_ERRORS": False,
+}
+
+HEALTH_CHECK_REFRESH_INTERVAL = env(
+    "DJANGO_HEALTH_CHECK_REFRESH_INTERVAL", int, default=30
+)
+
+HEALTH_CHECK_CACHE_TTL = env("DJANGO_HEALTH_CHECK_CACHE_TTL", int, default=300)
+
 
 # Caching
 
@@ -81,6 +153,78 @@ CELERY_TASK_SEND_SENT_EVENT = True
 
 CELERY_TASK_TRACK_STARTED = True
 
+# Slow LLM calls and image processing get their own queues, so they can't
+# starve bookkeeping tasks. Each queue is consumed by its own worker, see
+# compose.yaml.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+
+CELERY_TASK_ROUTES = {
+    "apps.campaign.tasks.generate_ad_text_task": {
+        "queue": "llm",
+        "priority": 0,
+    },
+    "apps.campaign.tasks.moderate_campaign_reports_task": {
+        "queue": "llm",
+        "priority": 6,
+    },
+    "apps.campaign.tasks.process_ad_image_task": {
+        "queue": "media",
+        "priority": 3,
+    },
+    "apps.campaign.tasks.finalize_ad_image_upload_task": {
+        "queue": "media",
+        "priority": 0,
+    },
+    "apps.campaign.tasks.cleanup_ad_image_uploads_task": {
+        "queue": "media",
+        "priority": 6,
+    },
+    "apps.campaign.tasks.reconcile_campaign_counters_task": {
+        "queue": "default",
+        "priority": 0,
+    },
+}
+
+CELERY_TASK_DEFAULT_PRIORITY = 3
+
+# With Redis 0 is the highest priority.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+
+# Long tasks must not sit behind each other in a worker's prefetch buffer,
+# workers raise it per queue.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+COUNTER_RECONCILIATION_INTERVAL = env(
+    "DJANGO_COUNTER_RECONCILIATION_INTERVAL", int, default=60
+)
+
+COUNTER_RECONCILIATION_CHUNK_SIZE = env(
+    "DJANGO_COUNTER_RECONCILIATION_CHUNK_SIZE", int, default=1000
+)
+
+COUNTER_RECONCILIATION_MAX_CHUNKS = env(
+    "DJANGO_COUNTER_RECONCILIATION_MAX_CHUNKS", int, default=10
+)
+
+AD_IMAGE_UPLOAD_CLEANUP_INTERVAL = env(
+    "DJANGO_AD_IMAGE_UPLOAD_CLEANUP_INTERVAL", int, default=3600
+)
+
+CELERY_BEAT_SCHEDULE = {
+    "reconcile-campaign-counters": {
+        "task": "apps.campaign.tasks.reconcile_campaign_counters_task",
+        "schedule": COUNTER_RECONCILIATION_INTERVAL,
+    },
+    "cleanup-ad-image-uploads": {
+        "task": "apps.campaign.tasks.cleanup_ad_image_uploads_task",
+        "schedule": AD_IMAGE_UPLOAD_CLEANUP_INTERVAL,
+    },
+}
+
 
 # Database
 
@@ -93,6 +237,8 @@ DATABASES = {"default": {**DB_URI, "CONN_MAX_AGE": 50}}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+BULK_BATCH_SIZE = env("DJANGO_BULK_BATCH_SIZE", int, default=1000)
+
 
 # Password validation
 
@@ -173,6 +319,24 @@ MINIO_STORAGE_MEDIA_URL = (
 
 MINIO_STORAGE_DEFAULT_ACL = "public-read"
 
+# Upload URLs are signed locally for the public endpoint, the region must
+# match the bucket's.
+MINIO_REGION = env("MINIO_REGION", default="us-east-1")
+
+# Variants are fitted into these ad slots, formats missing from the Pillow
+# build are skipped.
+AD_IMAGE_VARIANT_SIZES = ((300, 250), (320, 50), (728, 90), (160, 600))
+
+AD_IMAGE_VARIANT_FORMATS = ("webp", "avif")
+
+AD_IMAGE_VARIANT_QUALITY = 80
+
+AD_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+
+AD_IMAGE_UPLOAD_URL_EXPIRES = env(
+    "DJANGO_AD_IMAGE_UPLOAD_URL_EXPIRES", int, default=900
+)
+
 STORAGES = {
     "default": {
         "BACKEND": "minio_storage.storage.MinioMediaStorage",
@@ -294,6 +458,7 @@ INTERNAL_IPS = env(
 MIDDLEWARE = [
     "silk.middleware.SilkyMiddleware",
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "apps.core.middleware.CompressionMiddleware",
     "django_guid.middleware.guid_middleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -311,6 +476,14 @@ USE_X_FORWARDED_PORT = False
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+COMPRESSION_MIN_SIZE = env("DJANGO_COMPRESSION_MIN_SIZE", int, default=1024)
+
+# Minimum response size per path prefix, None disables compression.
+COMPRESSION_ROUTES: dict[str, int | None] = {
+    # Latency-critical and small, compressing costs more than it saves.
+    "/ads": None,
+}
+
 
 # Logging
 
@@ -445,10 +618,7 @@ INSTALLED_APPS = [
     "health_check",
     "health_check.db",
     "health_check.cache",
-    "health_check.storage",
     "health_check.contrib.migrations",
-    "health_check.contrib.celery",
-    "health_check.contrib.celery_ping",
     # Third-party apps
     "corsheaders",
     "django_extensions",
@@ -669,6 +839,8 @@ SILKY_MAX_REQUEST_BODY_SIZE = 128
 
 SILKY_INTERCEPT_PERCENT = 25
 
+SILKY_IGNORE_PATHS = ["/clients/import"]
+
 SILKY_META = True
 
 SILKY_DYNAMIC_PROFILING = [
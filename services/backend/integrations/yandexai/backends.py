@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+from collections.abc import AsyncIterator
+from typing import Any
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from yandex_cloud_ml_sdk.exceptions import AioRpcError, YCloudMLError
+
+from integrations.yandexai.clients import get_async_sdk, get_sdk
+
+Messages = list[dict[str, str]]
+
+COMPLETION_MODEL = "yandexgpt-lite"
+
+
+class YandexAIBackend:
+    def get_model(self, **config: Any) -> Any:
+        return (
+            get_async_sdk()
+            .models.completions(COMPLETION_MODEL, model_version="latest")
+            .configure(**config)
+        )
+
+    async def complete(self, messages: Messages, **config: Any) -> str:
+        operation = await self.get_model(**config).run_deferred(messages)
+        result = await operation.wait()
+
+        return result.alternatives[0].text
+
+    async def stream(
+        self, messages: Messages, **config: Any
+    ) -> AsyncIterator[str]:
+        # Every streamed result holds the whole text generated so far, the
+        # last one is final.
+        async for result in self.get_model(**config).run_stream(messages):
+            yield result.alternatives[0].text
+
+    def ping(self) -> bool:
+        try:
+            return bool(
+                get_sdk()
+                .models.completions(COMPLETION_MODEL, model_version="latest")
+                .tokenize("ping")
+            )
+        except (YCloudMLError, AioRpcError):
+            return False
+
+
+class StubBackend:
+    # Deterministic offline backend for load tests and benchmarks. The
+    # answer depends only on the messages and arrives after a configured
+    # latency.
+    def get_text(self, messages: Messages) -> str:
+        digest = hashlib.sha256(
+            "\n".join(message["text"] for message in messages).encode()
+        ).hexdigest()
+        return f"Stub completion {digest[:16]}. Try it today!"
+
+    async def complete(self, messages: Messages, **config: Any) -> str:
+        await asyncio.sleep(settings.YANDEX_CLOUD_STUB_LATENCY)
+        return self.get_text(messages)
+
+    async def stream(
+        self, messages: Messages, **config: Any
+    ) -> AsyncIterator[str]:
+        words = self.get_text(messages).split()
+        for index in range(1, len(words) + 1):
+            await asyncio.sleep(
+                settings.YANDEX_CLOUD_STUB_LATENCY / len(words)
+            )
+            yield " ".join(words[:index])
+
+    def ping(self) -> bool:
+        return True
+
+
+def get_backend() -> YandexAIBackend | StubBackend:
+    return import_string(settings.YANDEX_CLOUD_BACKEND)()
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+class CircuitBreaker:
+    # State lives in the shared cache, so every process and worker stops
+    # calling the API together. After enough failures within the window
+    # the circuit opens and calls fail fast. Once the recovery timeout
+    # passes a single probe is let through, its outcome closes or reopens
+    # the circuit.
+    def __init__(self, name: str) -> None:
+        self.open_key = f"circuit_breaker_{name}_open"
+        self.tripped_key = f"circuit_breaker_{name}_tripped"
+        self.probe_key = f"circuit_breaker_{name}_probe"
+        self.failures_key = f"circuit_breaker_{name}_failures"
+
+    def is_open(self) -> bool:
+        return cache.get(self.open_key) is not None
+
+    def allow(self) -> bool:
+        state = cache.get_many([self.open_key, self.tripped_key])
+
+        if self.open_key in state:
+            return False
+        if self.tripped_key in state:
+            return cache.add(
+                self.probe_key,
+                1,
+                timeout=settings.YANDEX_CLOUD_BREAKER_RECOVERY_TIMEOUT,
+            )
+
+        return True
+
+    def record_success(self) -> None:
+        if cache.get(self.tripped_key) is not None:
+            cache.delete_many(
+                [self.tripped_key, self.probe_key, self.failures_key]
+            )
+
+    def record_failure(self) -> None:
+        if cache.get(self.tripped_key) is not None:
+            self.open()
+            return
+
+        cache.add(
+            self.failures_key,
+            0,
+            timeout=settings.YANDEX_CLOUD_BREAKER_FAILURE_WINDOW,
+        )
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            # The window expired in between.
+            failures = 1
+
+        if failures >= settings.YANDEX_CLOUD_BREAKER_FAILURE_THRESHOLD:
+            self.open()
+
+    def open(self) -> None:
+        cache.set(
+            self.open_key,
+            1,
+            timeout=settings.YANDEX_CLOUD_BREAKER_RECOVERY_TIMEOUT,
+        )
+        cache.set(self.tripped_key, 1, timeout=None)
+        cache.delete_many([self.probe_key, self.failures_key])
+
+
+breaker = CircuitBreaker("yandexai")
@@ -0,0 +1,53 @@
+import os
+import threading
+from typing import Generic, TypeVar
+
+from django.conf import settings
+from yandex_cloud_ml_sdk import AsyncYCloudML, YCloudML
+
+SDK = TypeVar("SDK", YCloudML, AsyncYCloudML)
+
+
+class SDKRegistry(Generic[SDK]):
+    # One SDK per process and credentials, so gRPC channels and auth
+    # tokens stay warm between tasks. Forked children start empty, channels
+    # must not be shared across processes.
+    def __init__(self, sdk_class: type[SDK]) -> None:
+        self.sdk_class = sdk_class
+        self.reset()
+
+    def reset(self) -> None:
+        self.lock = threading.Lock()
+        self.sdks: dict[tuple[str | None, str | None], SDK] = {}
+
+    def get(self) -> SDK:
+        key = (settings.YANDEX_CLOUD_FOLDER_ID, settings.YANDEX_CLOUD_API_KEY)
+        sdk = self.sdks.get(key)
+
+        if sdk is None:
+            with self.lock:
+                sdk = self.sdks.get(key)
+                if sdk is None:
+                    sdk = self.sdks[key] = self.sdk_class(
+                        folder_id=key[0], auth=key[1]
+                    )
+
+        return sdk
+
+
+registry = SDKRegistry(YCloudML)
+
+# Only used from the runtime event loop, see integrations.yandexai.runtime.
+async_registry = SDKRegistry(AsyncYCloudML)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset)
+    os.register_at_fork(after_in_child=async_registry.reset)
+
+
+def get_sdk() -> YCloudML:
+    return registry.get()
+
+
+def get_async_sdk() -> AsyncYCloudML:
+    return async_registry.get()
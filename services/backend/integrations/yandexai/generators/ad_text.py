@@ -1,9 +1,10 @@
 # ruff: noqa: E501, W291
+import asyncio
 import logging
+from collections.abc import Callable
 
-from django.conf import settings
-from yandex_cloud_ml_sdk import YCloudML
-from yandex_cloud_ml_sdk.exceptions import YCloudMLError
+from integrations.yandexai.backends import get_backend
+from integrations.yandexai.runtime import call, run
 
 logger = logging.getLogger(__name__)
 
@@ -27,36 +28,48 @@ AD_PROMPT_TEMPLATE = """
 
 
 class YandexAIAdTextGenerator:
-    def __init__(self) -> None:
-        self.sdk = YCloudML(
-            folder_id=settings.YANDEX_CLOUD_FOLDER_ID,
-            auth=settings.YANDEX_CLOUD_API_KEY,
-        )
-
     def generate_ad_text(
-        self, advertiser_name: str, ad_title: str
+        self,
+        advertiser_name: str,
+        ad_title: str,
+        on_partial: Callable[[str], None] | None = None,
     ) -> str | None:
-        try:
-            prompt = AD_PROMPT_TEMPLATE.format(
-                advertiser_name=advertiser_name, ad_title=ad_title
-            )
+        return run(
+            self.agenerate_ad_text(advertiser_name, ad_title, on_partial)
+        )
 
-            promise = (
-                self.sdk.models.completions(
-                    "yandexgpt-lite", model_version="latest"
-                )
-                .configure(max_tokens=400, temperature=1.0)
-                .run_deferred([{"role": "user", "text": prompt}])
-            )
+    async def agenerate_ad_text(
+        self,
+        advertiser_name: str,
+        ad_title: str,
+        on_partial: Callable[[str], None] | None = None,
+    ) -> str | None:
+        prompt = AD_PROMPT_TEMPLATE.format(
+            advertiser_name=advertiser_name, ad_title=ad_title
+        )
 
-            result = promise.wait()
-            logger.debug("Generated ad text: %s", result)
+        async def generate() -> str | None:
+            text = None
+            async for text in get_backend().stream(
+                [{"role": "user", "text": prompt}],
+                max_tokens=400,
+                temperature=1.0,
+            ):
+                if on_partial is not None:
+                    # Publishing blocks, keep it off the shared loop.
+                    await asyncio.to_thread(
+                        on_partial, self._clean_response(text)
+                    )
+            return text
 
-            return self._clean_response(result.alternatives[0].text)
+        text = await call(generate())
+        logger.debug("Generated ad text: %s", text)
 
-        except YCloudMLError:
+        if text is None:
             return None
 
+        return self._clean_response(text)
+
     def _clean_response(self, text: str) -> str:
         cleaned = text.strip()
         cleaned = cleaned.replace('"', "")
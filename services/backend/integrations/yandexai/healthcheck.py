@@ -1,27 +1,26 @@
-from django.conf import settings
 from health_check.backends import BaseHealthCheckBackend
-from yandex_cloud_ml_sdk import YCloudML
-from yandex_cloud_ml_sdk.exceptions import YCloudMLError
 
+from apps.core.health import CachedHealthCheckMixin
+from integrations.yandexai.backends import get_backend
+from integrations.yandexai.breaker import breaker
 
-class YandexAIHealthCheck(BaseHealthCheckBackend):
+
+class YandexAIPingHealthCheck(BaseHealthCheckBackend):
     critical_service = False
 
     def check_status(self) -> None:
-        try:
-            sdk = YCloudML(
-                folder_id=settings.YANDEX_CLOUD_FOLDER_ID,
-                auth=settings.YANDEX_CLOUD_API_KEY,
-            )
-            result = sdk.models.completions(
-                "yandexgpt-lite", model_version="latest"
-            ).tokenize("ping")
-
-            if not result:
-                self.add_error("YandexAI API is unaccessible")
-
-        except YCloudMLError:
+        if not get_backend().ping():
+            self.add_error("YandexAI API is unaccessible")
+
+
+class YandexAIHealthCheck(CachedHealthCheckMixin, YandexAIPingHealthCheck):
+    def check_status(self) -> None:
+        # An open circuit already means the API is failing.
+        if breaker.is_open():
             self.add_error("YandexAI API is unaccessible")
+            return
+
+        super().check_status()
 
     def identifier(self) -> str:
         return self.__class__.__name__
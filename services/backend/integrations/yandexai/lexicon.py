@@ -0,0 +1,78 @@
+# ruff: noqa: RUF003
+import re
+import unicodedata
+
+# Latin look-alikes, digits and symbols commonly used to disguise Cyrillic
+# letters.
+HOMOGLYPHS = str.maketrans(
+    {
+        "a": "а",
+        "b": "в",
+        "c": "с",
+        "e": "е",
+        "h": "н",
+        "k": "к",
+        "m": "м",
+        "o": "о",
+        "p": "р",
+        "t": "т",
+        "x": "х",
+        "y": "у",
+        "u": "и",
+        "z": "з",
+        "ё": "е",
+        "0": "о",
+        "3": "з",
+        "4": "ч",
+        "6": "б",
+        "@": "а",
+        "$": "с",
+    }
+)
+
+WORD_RE = re.compile(r"[\w@$]+")
+CYRILLIC_RE = re.compile(r"[а-яё]")
+# Single letters separated by whitespace: "х у й". Punctuation between
+# letters is left alone, it separates prices, sizes and initials such as
+# "х у.е.", "х/у/е" or "Х. У. Ё.".
+SPACED_RE = re.compile(r"\b(?:\w\s+){2,}\w\b")
+REPEATED_RE = re.compile(r"(\w)\1+")
+
+# Whole words that are profane in any context, matched against normalized
+# text. Ambiguous forms such as "сука" and "суки" (boughs) or "ебитда"
+# stay out.
+PROFANITY_RE = re.compile(
+    r"\b(?:"
+    r"(?:за|на|по|от|вы|до|раз|рас|об|под|пере|при)?ху[йеёяию]\w*"
+    r"|(?:за|на|по|от|вы|до|раз|рас|съ|подъ|у|при)?[её]б"
+    r"(?:ат\w*|ал\w*|ан\w*|ну\w*|л[оиа]\w*|уч\w*|у|ут|ет|ёт|и|ись)"
+    r"|(?:рас|за|от|с|вы|по)?пизд\w*"
+    r"|бля|бляд\w*|блят\w*"
+    r"|муда[кч]\w*"
+    r"|пид[оа]р\w*"
+    r"|гандон\w*|залуп\w*|шлюх\w*"
+    r"|fuck\w*|shit|shitty|bitch\w*|cunt\w*"
+    r")\b"
+)
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = SPACED_RE.sub(lambda match: re.sub(r"\s", "", match[0]), text)
+
+    # Only Cyrillic words are mapped, Latin words and numbers stay as they
+    # are.
+    return " ".join(
+        REPEATED_RE.sub(
+            r"\1",
+            word.translate(HOMOGLYPHS) if CYRILLIC_RE.search(word) else word,
+        )
+        for word in WORD_RE.findall(text)
+    )
+
+
+def get_verdict(text: str) -> bool | None:
+    # True for unambiguous profanity. Anything else, including insults,
+    # threats and discrimination without profanity, needs context and is
+    # left to the LLM.
+    return True if PROFANITY_RE.search(normalize(text)) else None
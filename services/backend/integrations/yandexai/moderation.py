@@ -1,9 +1,15 @@
 # ruff: noqa: E501
+import asyncio
+import hashlib
 import logging
+from collections.abc import Iterable
 
 from django.conf import settings
-from yandex_cloud_ml_sdk import YCloudML
-from yandex_cloud_ml_sdk.exceptions import YCloudMLError
+from django.core.cache import cache
+
+from integrations.yandexai import lexicon
+from integrations.yandexai.backends import COMPLETION_MODEL, get_backend
+from integrations.yandexai.runtime import call, run
 
 logger = logging.getLogger(__name__)
 
@@ -22,35 +28,110 @@ MODERATION_PROMPT = """
 3. Дискриминация: расизм, сексизм, ксенофобия, гомофобия
 """.strip()
 
+# Verdicts are cached per prompt and model, changing either invalidates
+# them.
+MODERATION_PROMPT_VERSION = hashlib.sha256(
+    f"{COMPLETION_MODEL}:{MODERATION_PROMPT}".encode()
+).hexdigest()[:16]
+
+
+def get_verdict_cache_key(text: str) -> str:
+    text_hash = hashlib.sha256(text.encode()).hexdigest()
+    return f"moderation_verdict_{MODERATION_PROMPT_VERSION}_{text_hash}"
+
 
 class YandexAIModerator:
-    def __init__(self) -> None:
-        self.sdk = YCloudML(
-            folder_id=settings.YANDEX_CLOUD_FOLDER_ID,
-            auth=settings.YANDEX_CLOUD_API_KEY,
-        )
+    @staticmethod
+    def get_prefilter_verdict(text: str) -> bool | None:
+        # Unambiguous profanity is flagged locally. Nothing is declared
+        # clean without the LLM, so the result is True or None.
+        if not settings.MODERATION_PREFILTER_ENABLED:
+            return None
 
-    def get_moderation_verdict(self, text: str) -> bool:
-        try:
-            promise = (
-                self.sdk.models.completions(
-                    "yandexgpt-lite", model_version="latest"
-                )
-                .configure(max_tokens=500, temperature=0.1)
-                .run_deferred(
-                    [
-                        {"role": "system", "text": MODERATION_PROMPT},
-                        {"role": "user", "text": text},
-                    ]
+        return lexicon.get_verdict(text)
+
+    @staticmethod
+    def get_cached_verdict(texts: Iterable[str]) -> bool | None:
+        texts = list(texts)
+        if any(
+            YandexAIModerator.get_prefilter_verdict(text) for text in texts
+        ):
+            return True
+
+        keys = [get_verdict_cache_key(text) for text in texts]
+        verdicts = cache.get_many(keys)
+
+        if any(verdicts.values()):
+            return True
+        if len(verdicts) == len(set(keys)):
+            return False
+
+        return None
+
+    def get_moderation_verdict(self, text: str) -> bool | None:
+        return self.get_moderation_verdicts([text])[0]
+
+    def get_moderation_verdicts(self, texts: list[str]) -> list[bool | None]:
+        # None when the LLM couldn't be reached for that text.
+        prefiltered = {
+            text: self.get_prefilter_verdict(text) for text in texts
+        }
+        keys = {
+            text: get_verdict_cache_key(text)
+            for text, verdict in prefiltered.items()
+            if verdict is None
+        }
+        verdicts = cache.get_many(keys.values()) if keys else {}
+
+        # Uncached texts are moderated concurrently on the shared runtime.
+        missing = [text for text, key in keys.items() if key not in verdicts]
+        if missing:
+            requested = dict(
+                zip(
+                    (keys[text] for text in missing),
+                    run(self.arequest_moderation_verdicts(missing)),
+                    strict=True,
                 )
             )
-            result = promise.wait()
-            logger.debug("Moderation API response: %s", result)
+            cache.set_many(
+                {
+                    key: verdict
+                    for key, verdict in requested.items()
+                    if verdict is not None
+                },
+                timeout=settings.MODERATION_VERDICT_CACHE_TIMEOUT,
+            )
+            verdicts.update(requested)
 
-            return self._normalize_response(result.alternatives[0].text)
+        return [
+            verdicts[keys[text]] if text in keys else prefiltered[text]
+            for text in texts
+        ]
 
-        except YCloudMLError:
-            return False
+    async def arequest_moderation_verdicts(
+        self, texts: list[str]
+    ) -> list[bool | None]:
+        return await asyncio.gather(
+            *(self.arequest_moderation_verdict(text) for text in texts)
+        )
+
+    async def arequest_moderation_verdict(self, text: str) -> bool | None:
+        response = await call(
+            get_backend().complete(
+                [
+                    {"role": "system", "text": MODERATION_PROMPT},
+                    {"role": "user", "text": text},
+                ],
+                max_tokens=500,
+                temperature=0.1,
+            )
+        )
+        logger.debug("Moderation API response: %s", response)
+
+        if response is None:
+            return None
+
+        return self._normalize_response(response)
 
     def _normalize_response(self, text: str) -> bool:
         clean_verdict = text.strip().lower().split("\n")[0]
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from django.conf import settings
+from yandex_cloud_ml_sdk.exceptions import AioRpcError, YCloudMLError
+
+from integrations.yandexai.breaker import breaker
+
+T = TypeVar("T")
+
+
+class LLMRuntime:
+    # A per-process event loop in a background thread that owns the SDK
+    # clients and the semaphore. run() still blocks the calling thread
+    # until the call finishes, so the number of calls in flight is bounded
+    # by the caller threads as well, the llm worker runs as many threads
+    # as YANDEX_CLOUD_MAX_CONCURRENCY allows.
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.semaphore: asyncio.Semaphore | None = None
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        if self.loop is None:
+            with self.lock:
+                if self.loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever,
+                        name="yandexai-runtime",
+                        daemon=True,
+                    ).start()
+                    self.semaphore = asyncio.Semaphore(
+                        settings.YANDEX_CLOUD_MAX_CONCURRENCY
+                    )
+                    self.loop = loop
+
+        return self.loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop()).result()
+
+
+runtime = LLMRuntime()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=runtime.reset)
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    return runtime.run(coro)
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    runtime.get_loop()
+    return runtime.semaphore
+
+
+async def call(coro: Coroutine[Any, Any, T]) -> T | None:
+    # Fails fast while the circuit is open. Errors and slow responses
+    # count as failures and return None. The breaker state lives in the
+    # cache, it is read and written in a thread so the loop keeps serving
+    # other calls.
+    if not await asyncio.to_thread(breaker.allow):
+        coro.close()
+        return None
+
+    try:
+        async with get_semaphore():
+            result = await asyncio.wait_for(
+                coro, settings.YANDEX_CLOUD_TIMEOUT
+            )
+    except (YCloudMLError, AioRpcError, asyncio.TimeoutError):
+        await asyncio.to_thread(breaker.record_failure)
+        return None
+
+    await asyncio.to_thread(breaker.record_success)
+    return result
@@ -0,0 +1,304 @@
+import asyncio
+import os
+import threading
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from yandex_cloud_ml_sdk.exceptions import YCloudMLError
+
+from integrations.yandexai.backends import StubBackend
+from integrations.yandexai.breaker import CircuitBreaker, breaker
+from integrations.yandexai.clients import get_sdk, registry
+from integrations.yandexai.generators.ad_text import YandexAIAdTextGenerator
+from integrations.yandexai.healthcheck import YandexAIHealthCheck
+from integrations.yandexai.lexicon import get_verdict, normalize
+from integrations.yandexai.moderation import YandexAIModerator
+from integrations.yandexai.runtime import call, get_semaphore, run, runtime
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
+class SDKRegistryTest(SimpleTestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_sdk_is_reused(self):
+        self.assertIs(get_sdk(), get_sdk())
+
+    def test_sdk_per_credentials(self):
+        sdk = get_sdk()
+
+        with override_settings(YANDEX_CLOUD_API_KEY="other"):
+            self.assertIsNot(get_sdk(), sdk)
+
+        self.assertIs(get_sdk(), sdk)
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child_starts_empty(self):
+        get_sdk()
+        read, write = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            os.write(write, b"0" if registry.sdks else b"1")
+            os._exit(0)
+
+        os.close(write)
+        os.waitpid(pid, 0)
+        with os.fdopen(read, "rb") as pipe:
+            self.assertEqual(pipe.read(), b"1")
+
+
+@override_settings(YANDEX_CLOUD_MAX_CONCURRENCY=2)
+class LLMRuntimeTest(SimpleTestCase):
+    def setUp(self):
+        runtime.reset()
+        self.addCleanup(runtime.reset)
+        self.addCleanup(self.stop_loop)
+
+    def stop_loop(self):
+        if runtime.loop is not None:
+            runtime.loop.call_soon_threadsafe(runtime.loop.stop)
+
+    def test_run_returns_result(self):
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        self.assertEqual(run(add(1, 2)), 3)
+
+    def test_run_propagates_exception(self):
+        async def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            run(fail())
+
+    def test_semaphore_limits_concurrency(self):
+        in_flight = max_in_flight = 0
+
+        async def request():
+            nonlocal in_flight, max_in_flight
+            async with get_semaphore():
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        async def requests():
+            await asyncio.gather(*(request() for _ in range(10)))
+
+        run(requests())
+
+        self.assertEqual(max_in_flight, 2)
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child_starts_without_loop(self):
+        runtime.get_loop()
+        read, write = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            os.write(write, b"0" if runtime.loop else b"1")
+            os._exit(0)
+
+        os.close(write)
+        os.waitpid(pid, 0)
+        with os.fdopen(read, "rb") as pipe:
+            self.assertEqual(pipe.read(), b"1")
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    YANDEX_CLOUD_BREAKER_FAILURE_THRESHOLD=2,
+    YANDEX_CLOUD_BREAKER_RECOVERY_TIMEOUT=30,
+)
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker("test")
+
+    def test_opens_after_failures(self):
+        self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.is_open())
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_does_not_reset_closed_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.is_open())
+
+    def test_single_probe_after_recovery_timeout(self):
+        self.breaker.open()
+        cache.delete(self.breaker.open_key)
+
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        self.breaker.open()
+        cache.delete(self.breaker.open_key)
+        self.breaker.allow()
+
+        self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.is_open())
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    YANDEX_CLOUD_BACKEND="integrations.yandexai.backends.StubBackend",
+    YANDEX_CLOUD_BREAKER_FAILURE_THRESHOLD=1,
+    YANDEX_CLOUD_TIMEOUT=0.05,
+)
+class StubBackendTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        runtime.reset()
+        self.addCleanup(runtime.reset)
+        self.addCleanup(self.stop_loop)
+
+    def stop_loop(self):
+        if runtime.loop is not None:
+            runtime.loop.call_soon_threadsafe(runtime.loop.stop)
+
+    def test_completion_is_deterministic(self):
+        messages = [{"role": "user", "text": "Hello"}]
+
+        self.assertEqual(
+            run(StubBackend().complete(messages)),
+            run(StubBackend().complete(messages)),
+        )
+        self.assertNotEqual(
+            run(StubBackend().complete(messages)),
+            run(StubBackend().complete([{"role": "user", "text": "Bye"}])),
+        )
+
+    def test_stream_ends_with_completion(self):
+        messages = [{"role": "user", "text": "Hello"}]
+
+        async def collect():
+            return [text async for text in StubBackend().stream(messages)]
+
+        texts = run(collect())
+
+        self.assertGreater(len(texts), 1)
+        self.assertEqual(texts[-1], run(StubBackend().complete(messages)))
+
+    def test_pipeline_runs_offline(self):
+        partials = []
+
+        ad_text = YandexAIAdTextGenerator().generate_ad_text(
+            "Advertiser", "Title", on_partial=partials.append
+        )
+
+        self.assertTrue(ad_text.startswith("Stub completion"))
+        self.assertEqual(partials[-1], ad_text)
+        self.assertEqual(
+            YandexAIModerator().get_moderation_verdicts(["Text"]), [False]
+        )
+
+    def test_blocking_io_runs_off_the_loop(self):
+        threads = []
+
+        def record(*args):
+            threads.append(threading.current_thread().name)
+            return True
+
+        with (
+            mock.patch.object(breaker, "allow", side_effect=record),
+            mock.patch.object(breaker, "record_success", side_effect=record),
+        ):
+            YandexAIAdTextGenerator().generate_ad_text(
+                "Advertiser", "Title", on_partial=record
+            )
+
+        self.assertGreater(len(threads), 2)
+        self.assertNotIn("yandexai-runtime", threads)
+
+    @override_settings(YANDEX_CLOUD_STUB_LATENCY=1)
+    def test_slow_calls_open_circuit(self):
+        self.assertIsNone(
+            YandexAIAdTextGenerator().generate_ad_text("Advertiser", "Title")
+        )
+        self.assertTrue(breaker.is_open())
+
+        health_check = YandexAIHealthCheck()
+        health_check.check_status()
+
+        self.assertTrue(health_check.errors)
+
+    def test_open_circuit_fails_fast(self):
+        breaker.open()
+
+        async def request():
+            raise AssertionError
+
+        self.assertIsNone(run(call(request())))
+
+    def test_errors_are_failures(self):
+        async def request():
+            raise YCloudMLError
+
+        self.assertIsNone(run(call(request())))
+        self.assertTrue(breaker.is_open())
+
+
+class LexiconTest(SimpleTestCase):
+    def test_normalize(self):
+        for text, normalized in (
+            ("х у й", "хуй"),
+            ("х.у.й", "х у й"),
+            ("xуйня", "хуйня"),
+            ("6ля", "бля"),
+            ("ееебааать", "ебать"),
+            ("iPhone 15", "iphone 15"),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(normalize(text), normalized)
+
+    def test_profanity(self):
+        for text in ("Ты мудак", "п и з д е ц", "6ля буду", "пиzдец", "Fuck"):
+            with self.subTest(text=text):
+                self.assertTrue(get_verdict(text))
+
+    def test_not_profane_is_left_to_llm(self):
+        for text in (
+            "Лучшие цены на телефоны!",
+            "Свежий хлеб и сукно",
+            "Сухие суки деревьев",
+            "с сука",
+            "Ботинок соскользнул с сука",
+            "Цена: х у.е. за штуку",
+            "Размер х/у/е",
+            "Х. У. Ё.",
+            "ЕБИТДА компании выросла",
+            "Бляха-муха, какие цены!",
+            "Убить время с нами",
+            "ты урод",
+            "Я тебя найду и изобью, если не заплатишь",
+            "Все женщины тупые и должны сидеть дома",
+            "Гомосексуалисты — больные люди",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(get_verdict(text))
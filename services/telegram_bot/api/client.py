@@ -56,17 +56,24 @@ class AdNovaClient:
         return schemas.CampaignOut.model_validate(response.json())
 
     async def list_campaigns(
-        self, advertiser_id: str, page: int = 1, size: int = 1000
+        self, advertiser_id: str, size: int = 100
     ) -> list[schemas.CampaignOut]:
-        params = {"page": page, "size": size}
-        response = await self.client.get(
-            f"/advertisers/{advertiser_id}/campaigns", params=params
-        )
-        self._handle_response(response)
-        return [
-            schemas.CampaignOut.model_validate(item)
-            for item in response.json()
-        ]
+        params = {"size": size}
+        campaigns = []
+
+        while True:
+            response = await self.client.get(
+                f"/advertisers/{advertiser_id}/campaigns", params=params
+            )
+            self._handle_response(response)
+            campaigns.extend(
+                schemas.CampaignOut.model_validate(item)
+                for item in response.json()
+            )
+
+            if "X-Next-Cursor" not in response.headers:
+                return campaigns
+            params["cursor"] = response.headers["X-Next-Cursor"]
 
     async def get_campaign(
         self, advertiser_id: str, campaign_id: str
@@ -161,8 +168,13 @@ class AdNovaClient:
         return schemas.GenerateAdTextResult.model_validate(response.json())
 
     async def get_generate_ad_text_result(
-        self, task_id: str
+        self, task_id: str, wait: int = 0
     ) -> schemas.GenerateAdTextResult:
-        response = await self.client.get(f"/generate/ad_text/{task_id}/result")
+        # With wait the backend holds the request until the result is ready.
+        response = await self.client.get(
+            f"/generate/ad_text/{task_id}/result",
+            params={"wait": wait},
+            timeout=wait + 5,
+        )
         self._handle_response(response)
         return schemas.GenerateAdTextResult.model_validate(response.json())